@@ -0,0 +1,196 @@
+"""Compile the lookup assets into compact, pre-parsed, precompressed JSON.
+
+Every source in ASSETS is parsed once by its own parser (BOM, ';' and
+header quirks handled there) and written as minified JSON plus a gzip copy
+whose file names carry the content hash, e.g. profesi.3f9c1a2b.json(.gz).
+manifest.json in the output directory maps each asset to its current files
+and the SHA-256 of its source, so unchanged sources are skipped on the next
+run. For every compiled asset the report compares parsing the raw source
+with loading the compiled JSON, and the raw size with the compiled and
+gzip sizes.
+
+CSV tables are stored column-wise ({"columns": [...], "rows": [[...]]});
+sls_metadata.json becomes the hierarchical index of build_sls_metadata.py.
+The app does not load the compiled files yet, so the default output
+directory assets/compiled/ is gitignored and not listed in pubspec.yaml.
+
+    python build_assets.py                 # compile changed assets
+    python build_assets.py --force         # recompile everything
+    python build_assets.py --output build/assets
+"""
+
+import argparse
+import csv
+import glob
+import gzip
+import hashlib
+import json
+import os
+import re
+import time
+
+from build_sls_metadata import build_index as build_sls_index, dedupe, iter_records
+from kbli_index import read_kbli_csv
+
+DEFAULT_OUTPUT = 'assets/compiled'
+MANIFEST_NAME = 'manifest.json'
+# Bump when a parser or the output format changes, so every asset is rebuilt
+COMPILER_VERSION = 1
+TIMING_RUNS = 3
+
+
+def parse_profesi(path):
+    with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f, delimiter=';')
+        # Header "nama@1" -> "nama"
+        columns = [re.sub(r'@\d+$', '', c.strip()) for c in next(reader)]
+        rows = [[v.strip() for v in row] for row in reader if any(v.strip() for v in row)]
+    return {'columns': columns, 'rows': rows}
+
+
+def parse_kbli(path):
+    return {'columns': ['kode', 'judul', 'kategori', 'bukan_cakupan_se', 'deskripsi'],
+            'rows': read_kbli_csv(path)}
+
+
+def parse_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def parse_sls_metadata(path):
+    records, _, _ = dedupe(iter_records(path))
+    return build_sls_index(records)
+
+
+# (name, source glob, parser)
+ASSETS = (
+    ('profesi', 'assets/csv/*lookup_profesi*.csv', parse_profesi),
+    ('kbli', 'assets/csv/*KBLI*.csv', parse_kbli),
+    ('anomali_field_options', 'assets/json/anomali_field_options.json', parse_json),
+    ('sls_metadata', 'assets/json/sls_metadata.json', parse_sls_metadata),
+)
+
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _best_ms(fn, *args):
+    best = None
+    for _ in range(TIMING_RUNS):
+        t0 = time.perf_counter()
+        fn(*args)
+        ms = (time.perf_counter() - t0) * 1000
+        best = ms if best is None else min(best, ms)
+    return round(best, 3)
+
+
+def _load_compiled_file(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def read_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {'version': COMPILER_VERSION, 'assets': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('version') != COMPILER_VERSION:
+        return {'version': COMPILER_VERSION, 'assets': {}}
+    return manifest
+
+
+def load_compiled(name, out_dir=DEFAULT_OUTPUT):
+    """Decoded data of a compiled asset, located through the manifest."""
+    entry = read_manifest(out_dir)['assets'][name]
+    return _load_compiled_file(os.path.join(out_dir, entry['file']))
+
+
+def compile_asset(name, source, parse, out_dir, previous=None):
+    """Parse, write the hashed .json/.json.gz pair and return the manifest entry."""
+    data = parse(source)
+    payload = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    digest = hashlib.sha256(payload).hexdigest()
+    file_name = f"{name}.{digest[:8]}.json"
+    path = os.path.join(out_dir, file_name)
+    with open(path, 'wb') as f:
+        f.write(payload)
+    # mtime=0 keeps the gzip bytes identical for identical content
+    gz = gzip.compress(payload, compresslevel=9, mtime=0)
+    with open(path + '.gz', 'wb') as f:
+        f.write(gz)
+
+    # Remove the files of the previous build of this asset
+    if previous and previous.get('file') != file_name:
+        for old in (previous['file'], previous['file'] + '.gz'):
+            old_path = os.path.join(out_dir, old)
+            if os.path.exists(old_path):
+                os.remove(old_path)
+
+    return {
+        'source': source,
+        'source_sha256': sha256_file(source),
+        'file': file_name,
+        'sha256': digest,
+        'bytes_source': os.path.getsize(source),
+        'bytes': len(payload),
+        'bytes_gz': len(gz),
+        'parse_ms_source': _best_ms(parse, source),
+        'load_ms': _best_ms(_load_compiled_file, path),
+    }
+
+
+def build_assets(out_dir=DEFAULT_OUTPUT, force=False):
+    """Compile every changed asset and rewrite the manifest. Returns the manifest."""
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = read_manifest(out_dir)
+    assets = manifest['assets']
+
+    print(f"{'asset':<24}{'status':<11}{'source':>10}{'json':>10}{'gz':>9}{'parse ms':>10}{'load ms':>9}")
+    for name, pattern, parse in ASSETS:
+        sources = sorted(glob.glob(pattern))
+        if not sources:
+            print(f"{name:<24}missing    no file matches {pattern}")
+            continue
+        source = sources[0]
+        previous = assets.get(name)
+        unchanged = (
+            not force and previous is not None
+            and previous['source'] == source
+            and previous['source_sha256'] == sha256_file(source)
+            and os.path.exists(os.path.join(out_dir, previous['file']))
+        )
+        if unchanged:
+            entry, status = previous, 'unchanged'
+        else:
+            entry, status = compile_asset(name, source, parse, out_dir, previous), 'compiled'
+            assets[name] = entry
+        print(f"{name:<24}{status:<11}{entry['bytes_source']:>10}{entry['bytes']:>10}{entry['bytes_gz']:>9}"
+              f"{entry['parse_ms_source']:>10.2f}{entry['load_ms']:>9.2f}")
+
+    with open(os.path.join(out_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+
+    entries = list(assets.values())
+    if entries:
+        source = sum(e['bytes_source'] for e in entries)
+        gz = sum(e['bytes_gz'] for e in entries)
+        parse_ms = sum(e['parse_ms_source'] for e in entries)
+        load_ms = sum(e['load_ms'] for e in entries)
+        print(f"Total: {source} -> {gz} bytes gzipped ({1 - gz / source:.1%} smaller), "
+              f"parse {parse_ms:.1f} ms -> load {load_ms:.1f} ms")
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile lookup assets into pre-parsed JSON.")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="output directory (default: %(default)s)")
+    parser.add_argument('--force', action='store_true', help="recompile unchanged assets too")
+    args = parser.parse_args()
+    build_assets(args.output, args.force)
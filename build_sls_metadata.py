@@ -0,0 +1,172 @@
+"""Build sls_metadata.json from the SLS GeoJSON properties.
+
+Reads idsls, nmsls, nmdesa, nmkec and kode_pos (the same properties
+optimize_geojson.py keeps), drops duplicate idsls and writes:
+
+  * sls_metadata.json        flat list, deduplicated (format the app already reads)
+  * --index PATH             optionally, a hierarchical form keyed by the
+                             14-digit code, kab (4) -> kec (3) -> desa (3) -> sls (4):
+
+    {"version": 1, "count": 429, "wilayah": {"7372": {"011": {
+        "nmkec": "BACUKIKI BARAT",
+        "desa": {"001": {"nmdesa": "LUMPUE", "kode_pos": "91123",
+                         "sls": {"0009": "RT 002 RW 004", ...}}}}}},
+     "lainnya": {}}
+
+The nesting is the prefix index: resolving an idsls is four dict lookups,
+and kec/desa names are stored once instead of on every SLS. An SLS whose
+nmkec, nmdesa or kode_pos differs from its kec/desa entry gets those fields
+in the desa's "override" map; ids that are not 14 digits go to "lainnya".
+The app does not read the index yet, so it is only written on request and
+never into assets/json/ (which is bundled); the build always checks that
+every record resolves back to itself through it.
+
+Input can be a GeoJSON FeatureCollection or an existing flat metadata list:
+    python build_sls_metadata.py assets/geojson/final_sls.geojson
+    python build_sls_metadata.py assets/json/sls_metadata.json
+    python build_sls_metadata.py assets/geojson/final_sls.geojson --index /tmp/sls_metadata_index.json
+"""
+
+import argparse
+import json
+
+from geojson_stream import iter_features
+
+FIELDS = ('idsls', 'nmsls', 'nmdesa', 'nmkec', 'kode_pos')
+DEFAULT_FLAT = 'assets/json/sls_metadata.json'
+INDEX_VERSION = 1
+
+
+def _text(value):
+    return '' if value is None else str(value)
+
+
+def iter_records(input_path):
+    """Metadata dicts from a GeoJSON file (streamed) or a flat JSON list."""
+    with open(input_path, 'r', encoding='utf-8') as f:
+        head = f.read(4096).lstrip()
+    if head.startswith('['):
+        with open(input_path, 'r', encoding='utf-8') as f:
+            items = json.load(f)
+    else:
+        items = (feature.get('properties') or {} for feature in iter_features(input_path))
+    for item in items:
+        yield {k: _text(item.get(k)) for k in FIELDS}
+
+
+def dedupe(records):
+    """Unique records by idsls, first occurrence wins. Returns (records, duplicates, conflicts)."""
+    seen = {}
+    duplicates = 0
+    conflicts = []
+    for record in records:
+        idsls = record['idsls']
+        if not idsls:
+            continue
+        if idsls in seen:
+            duplicates += 1
+            if seen[idsls] != record:
+                conflicts.append(idsls)
+            continue
+        seen[idsls] = record
+    return list(seen.values()), duplicates, conflicts
+
+
+def build_index(records):
+    wilayah = {}
+    lainnya = {}
+    for r in records:
+        idsls = r['idsls']
+        if len(idsls) != 14 or not idsls.isdigit():
+            lainnya[idsls] = {k: r[k] for k in FIELDS if k != 'idsls'}
+            continue
+        kab, kec, desa, sls = idsls[:4], idsls[4:7], idsls[7:10], idsls[10:]
+        kec_entry = wilayah.setdefault(kab, {}).setdefault(kec, {'nmkec': r['nmkec'], 'desa': {}})
+        desa_entry = kec_entry['desa'].setdefault(
+            desa, {'nmdesa': r['nmdesa'], 'kode_pos': r['kode_pos'], 'sls': {}})
+        desa_entry['sls'][sls] = r['nmsls']
+        beda = {k: r[k] for k, shared in (('nmkec', kec_entry['nmkec']), ('nmdesa', desa_entry['nmdesa']),
+                                          ('kode_pos', desa_entry['kode_pos'])) if r[k] != shared}
+        if beda:
+            desa_entry.setdefault('override', {})[sls] = beda
+    # Sorted keys keep the generated file stable between runs
+    return {
+        'version': INDEX_VERSION,
+        'count': len(records),
+        'wilayah': _sorted(wilayah),
+        'lainnya': dict(sorted(lainnya.items())),
+    }
+
+
+def _sorted(value):
+    if isinstance(value, dict):
+        return {k: _sorted(value[k]) for k in sorted(value)}
+    return value
+
+
+def lookup(index, idsls):
+    """Flat metadata dict for idsls from a loaded index, or None."""
+    idsls = _text(idsls)
+    if idsls in index.get('lainnya', {}):
+        return {'idsls': idsls, **index['lainnya'][idsls]}
+    try:
+        kec = index['wilayah'][idsls[:4]][idsls[4:7]]
+        desa = kec['desa'][idsls[7:10]]
+        sls = idsls[10:]
+        nmsls = desa['sls'][sls]
+    except (KeyError, TypeError):
+        return None
+    if len(idsls) != 14:
+        return None
+    record = {
+        'idsls': idsls,
+        'nmsls': nmsls,
+        'nmdesa': desa['nmdesa'],
+        'nmkec': kec['nmkec'],
+        'kode_pos': desa['kode_pos'],
+    }
+    record.update(desa.get('override', {}).get(sls, {}))
+    return record
+
+
+def iter_index(index):
+    """All flat records back from an index (kab/kec/desa/sls order)."""
+    for kab, kecs in index['wilayah'].items():
+        for kec, kec_entry in kecs.items():
+            for desa, desa_entry in kec_entry['desa'].items():
+                for sls in desa_entry['sls']:
+                    yield lookup(index, kab + kec + desa + sls)
+    for idsls in index.get('lainnya', {}):
+        yield lookup(index, idsls)
+
+
+def build_sls_metadata(input_path, flat_path=DEFAULT_FLAT, index_path=None):
+    records, duplicates, conflicts = dedupe(iter_records(input_path))
+    print(f"{len(records)} unique SLS, {duplicates} duplicate entries dropped.")
+    if conflicts:
+        print(f"Warning: {len(conflicts)} idsls with conflicting duplicates (first kept), e.g. {conflicts[:5]}")
+
+    index = build_index(records)
+    # Round-trip check: every record must resolve to itself through the index
+    bad = [r['idsls'] for r in records if lookup(index, r['idsls']) != r]
+    if bad:
+        raise SystemExit(f"Index lookup mismatch for {len(bad)} idsls, e.g. {bad[:5]}")
+
+    if flat_path:
+        with open(flat_path, 'w', encoding='utf-8') as f:
+            json.dump(records, f, ensure_ascii=False, separators=(',', ':'))
+        print(f"Wrote {flat_path}")
+    if index_path:
+        with open(index_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+        print(f"Wrote {index_path}")
+    return index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build deduplicated and indexed SLS metadata.")
+    parser.add_argument('input', help="SLS GeoJSON or an existing flat sls_metadata.json")
+    parser.add_argument('--flat', default=DEFAULT_FLAT, help="flat output (default: %(default)s)")
+    parser.add_argument('--index', help="also write the indexed form here (keep it out of assets/json/)")
+    args = parser.parse_args()
+    build_sls_metadata(args.input, args.flat, args.index)
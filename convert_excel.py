@@ -1,12 +1,13 @@
-import pandas as pd
 import json
 import os
 
+from excel_cache import read_excel_cached
+
 input_path = "assets/excel/[7372] Parepare (Sudah GC).xlsx"
 output_path = "assets/json/parepare_comparison.json"
 
 try:
-    df = pd.read_excel(input_path)
+    df = read_excel_cached(input_path)
     
     # Convert all columns to string to avoid serialization issues
     df = df.astype(str)
@@ -0,0 +1,99 @@
+"""Cache for pd.read_excel results.
+
+read_excel_cached() has the same call shape as pd.read_excel. The parsed
+DataFrame is stored as a pickle keyed by the SHA-256 of the workbook, the
+sheet, every read option (header, skiprows, dtype, ...) and the pandas
+version, so only the first run on a workbook pays for openpyxl. Pickle is
+used instead of Parquet because it gives back exactly the same frame (NaN
+stays NaN in object columns, dtypes are unchanged) and needs no extra
+dependency.
+
+The cache lives in $EXCEL_CACHE_DIR, by default ~/.cache/direktori/excel.
+
+    python excel_cache.py info
+    python excel_cache.py clear
+"""
+
+import argparse
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'direktori', 'excel')
+
+
+def cache_dir():
+    return os.environ.get('EXCEL_CACHE_DIR') or DEFAULT_CACHE_DIR
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _option_text(value):
+    # str / numpy dtypes / callables have no JSON form; their name is stable
+    return getattr(value, '__name__', None) or repr(value)
+
+
+def cache_key(path, sheet_name=0, **options):
+    parts = {
+        'file': file_sha256(path),
+        'sheet': sheet_name,
+        'options': options,
+        'pandas': pd.__version__,
+    }
+    text = json.dumps(parts, sort_keys=True, default=_option_text)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def read_excel_cached(path, sheet_name=0, **options):
+    """pd.read_excel(path, sheet_name, **options), served from the cache when
+    the same workbook was read with the same options before."""
+    directory = cache_dir()
+    cache_path = os.path.join(directory, cache_key(path, sheet_name, **options) + '.pkl')
+    if os.path.exists(cache_path):
+        try:
+            return pd.read_pickle(cache_path)
+        except Exception:
+            # Unreadable entry (e.g. interrupted write): parse again below
+            pass
+
+    df = pd.read_excel(path, sheet_name=sheet_name, **options)
+    os.makedirs(directory, exist_ok=True)
+    # Write then rename so parallel runs never see a half-written pickle
+    tmp = f"{cache_path}.{os.getpid()}.tmp"
+    pd.to_pickle(df, tmp)
+    os.replace(tmp, cache_path)
+    return df
+
+
+def clear_cache():
+    """Delete all cached frames; returns the number of files removed."""
+    directory = cache_dir()
+    if not os.path.isdir(directory):
+        return 0
+    removed = 0
+    for name in os.listdir(directory):
+        if name.endswith('.pkl') or name.endswith('.tmp'):
+            os.remove(os.path.join(directory, name))
+            removed += 1
+    return removed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parsed Excel cache.")
+    parser.add_argument('command', choices=('info', 'clear'))
+    args = parser.parse_args()
+    if args.command == 'clear':
+        print(f"Removed {clear_cache()} cached frames from {cache_dir()}")
+    else:
+        directory = cache_dir()
+        files = [os.path.join(directory, n) for n in os.listdir(directory)
+                 if n.endswith('.pkl')] if os.path.isdir(directory) else []
+        print(f"{cache_dir()}: {len(files)} cached frames, {sum(map(os.path.getsize, files))} bytes")
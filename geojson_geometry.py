@@ -0,0 +1,250 @@
+"""NumPy geometry stage for the SLS GeoJSON tools.
+
+All rings of a feature are flattened into one (n, d) array (d = 2, or 3 with
+Z), quantized in bulk to an integer grid of 10**-precision units (the same
+values as round(x, precision)), consecutive duplicate vertices are dropped,
+and rings are optionally simplified with Douglas-Peucker or
+Visvalingam-Whyatt using a tolerance in metres. Simplification never turns a
+ring into fewer than 4 vertices (or a line into fewer than 2); rings that
+would collapse keep their unsimplified vertices.
+"""
+
+import heapq
+
+import numpy as np
+
+DEFAULT_PRECISION = 6
+# Metres per degree of latitude; longitude is scaled by cos(latitude)
+METERS_PER_DEGREE = 111320.0
+
+# Nesting depth of the list of rings/lines inside `coordinates`, per type
+_RING_DEPTH = {
+    'LineString': 0,
+    'MultiPoint': 0,
+    'Polygon': 1,
+    'MultiLineString': 1,
+    'MultiPolygon': 2,
+}
+_MIN_VERTICES = {
+    'LineString': 2,
+    'MultiLineString': 2,
+    'Polygon': 4,
+    'MultiPolygon': 4,
+}
+
+
+def _collect_rings(coords, depth, out):
+    if depth == 0:
+        out.append(coords)
+    else:
+        for part in coords:
+            _collect_rings(part, depth - 1, out)
+
+
+def _rebuild(coords, depth, rings):
+    if depth == 0:
+        return next(rings)
+    return [_rebuild(part, depth - 1, rings) for part in coords]
+
+
+def flatten_rings(rings):
+    """One (n, d) float array for all rings plus the start offset of each ring.
+
+    d is the position size: 2, or more when positions carry Z (and M). A
+    geometry whose positions do not all have the same size raises ValueError
+    instead of being padded or cut to 2-D.
+    """
+    lengths = np.fromiter((len(r) for r in rings), dtype=np.int64, count=len(rings))
+    offsets = np.zeros(len(rings) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    if offsets[-1] == 0:
+        return np.zeros((0, 2)), offsets
+    try:
+        flat = np.array([v for r in rings for v in r], dtype=np.float64)
+    except ValueError:
+        raise ValueError("positions of different sizes (2-D mixed with 3-D) in one geometry") from None
+    if flat.ndim != 2 or flat.shape[1] < 2:
+        raise ValueError("every position needs at least 2 coordinates")
+    return flat, offsets
+
+
+def quantize(arr, precision=DEFAULT_PRECISION):
+    """Snap coordinates to an int64 grid of 10**-precision degrees.
+
+    The result is the same as round(x, precision) * 10**precision for every
+    value: round() rounds the exact binary value, while arr * 10**precision
+    carries a rounding error of up to one ulp. The multiply is only trusted
+    where that error cannot change the nearest integer; values that land
+    within a few ulps of .5 (typically inputs with one more decimal ending
+    in 5) are redone with round().
+    """
+    scale = 10.0 ** precision
+    scaled = np.asarray(arr, dtype=np.float64) * scale
+    q = np.rint(scaled)
+    frac = np.abs(scaled - np.trunc(scaled))
+    tol = 4 * np.finfo(np.float64).eps * np.maximum(np.abs(scaled), 1.0)
+    near_half = np.abs(frac - 0.5) <= tol
+    if near_half.any():
+        q[near_half] = [np.rint(round(float(v), precision) * scale) for v in np.asarray(arr, dtype=np.float64)[near_half]]
+    return q.astype(np.int64)
+
+
+def dequantize(q, precision=DEFAULT_PRECISION):
+    # Integer / 10**p is correctly rounded, so the floats print as short decimals
+    return q / 10.0 ** precision
+
+
+def dedupe_mask(q, offsets):
+    """Boolean mask keeping the first vertex of each ring and every vertex
+    that differs from the one before it."""
+    keep = np.ones(len(q), dtype=bool)
+    if len(q) > 1:
+        keep[1:] = np.any(q[1:] != q[:-1], axis=1)
+    keep[offsets[:-1][offsets[:-1] < len(q)]] = True
+    return keep
+
+
+def _ring_counts(mask, offsets):
+    """Number of True values of `mask` inside each ring."""
+    csum = np.concatenate(([0], np.cumsum(mask)))
+    return csum[offsets[1:]] - csum[offsets[:-1]]
+
+
+def to_metres(arr):
+    """Local equirectangular projection (metres) around the array's mean latitude."""
+    lat0 = np.radians(arr[:, 1].mean()) if len(arr) else 0.0
+    return np.column_stack((arr[:, 0] * METERS_PER_DEGREE * np.cos(lat0), arr[:, 1] * METERS_PER_DEGREE))
+
+
+def simplify_dp(xy, tolerance):
+    """Douglas-Peucker keep-mask for an (n, 2) array in metres."""
+    n = len(xy)
+    keep = np.zeros(n, dtype=bool)
+    if n < 3:
+        keep[:] = True
+        return keep
+    keep[0] = keep[-1] = True
+    # Closed ring: split at the vertex farthest from the start so both halves have distinct endpoints
+    if np.array_equal(xy[0], xy[-1]):
+        split = int(np.argmax(np.hypot(*(xy - xy[0]).T)))
+        if split == 0:
+            return keep
+        keep[split] = True
+        stack = [(0, split), (split, n - 1)]
+    else:
+        stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        seg = xy[end] - xy[start]
+        pts = xy[start + 1:end] - xy[start]
+        length = np.hypot(seg[0], seg[1])
+        if length == 0:
+            dist = np.hypot(pts[:, 0], pts[:, 1])
+        else:
+            dist = np.abs(pts[:, 0] * seg[1] - pts[:, 1] * seg[0]) / length
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            mid = start + 1 + i
+            keep[mid] = True
+            stack.append((start, mid))
+            stack.append((mid, end))
+    return keep
+
+
+def simplify_vw(xy, tolerance):
+    """Visvalingam-Whyatt keep-mask; vertices whose effective triangle area is
+    below tolerance**2 square metres are removed, smallest first."""
+    n = len(xy)
+    keep = np.ones(n, dtype=bool)
+    if n < 3:
+        return keep
+    min_area = tolerance * tolerance
+    prev = list(range(-1, n - 1))
+    nxt = list(range(1, n + 1))
+    # Plain floats: the heap loop is scalar work, numpy indexing would only slow it down
+    xs, ys = xy[:, 0].tolist(), xy[:, 1].tolist()
+
+    def area(i):
+        a, c = prev[i], nxt[i]
+        return abs((xs[i] - xs[a]) * (ys[c] - ys[a]) - (xs[c] - xs[a]) * (ys[i] - ys[a])) / 2
+
+    heap = [(area(i), i) for i in range(1, n - 1)]
+    heapq.heapify(heap)
+    current = {i: a for a, i in heap}
+    while heap:
+        a, i = heapq.heappop(heap)
+        if not keep[i] or current.get(i) != a:
+            continue
+        if a >= min_area:
+            break
+        keep[i] = False
+        p, q = prev[i], nxt[i]
+        nxt[p], prev[q] = q, p
+        for j in (p, q):
+            if 0 < j < n - 1:
+                # Standard VW: a neighbour's area never drops below the removed one
+                current[j] = max(area(j), a)
+                heapq.heappush(heap, (current[j], j))
+    return keep
+
+
+SIMPLIFIERS = {'dp': simplify_dp, 'vw': simplify_vw}
+
+
+def process_geometry(geometry, precision=DEFAULT_PRECISION, tolerance=None, method='dp'):
+    """Quantize, dedupe and optionally simplify a GeoJSON geometry dict.
+
+    Returns a new geometry; unknown types and empty geometries are returned
+    as they are.
+    """
+    if not geometry or 'coordinates' not in geometry:
+        if geometry and geometry.get('type') == 'GeometryCollection':
+            return {
+                'type': 'GeometryCollection',
+                'geometries': [process_geometry(g, precision, tolerance, method)
+                               for g in geometry.get('geometries', [])],
+            }
+        return geometry
+    gtype = geometry.get('type')
+    coords = geometry.get('coordinates')
+    if gtype == 'Point':
+        if not coords:
+            return {'type': gtype, 'coordinates': coords}
+        q = quantize(np.array(coords, dtype=np.float64), precision)
+        return {'type': gtype, 'coordinates': dequantize(q, precision).tolist()}
+    depth = _RING_DEPTH.get(gtype)
+    if depth is None:
+        return geometry
+
+    rings = []
+    _collect_rings(coords, depth, rings)
+    flat, offsets = flatten_rings(rings)
+    q = quantize(flat, precision)
+    min_vertices = _MIN_VERTICES.get(gtype, 1)
+    keep = dedupe_mask(q, offsets) if min_vertices > 1 else np.ones(len(q), dtype=bool)
+    simplify = SIMPLIFIERS[method] if tolerance else None
+    out = dequantize(q, precision)
+
+    # Rings that dedupe would collapse keep all their vertices
+    for k in np.flatnonzero(_ring_counts(keep, offsets) < min_vertices):
+        keep[offsets[k]:offsets[k + 1]] = True
+
+    if simplify is not None:
+        xy = to_metres(out)
+        for k in range(len(rings)):
+            start, end = offsets[k], offsets[k + 1]
+            idx = start + np.flatnonzero(keep[start:end])
+            if len(idx) <= min_vertices:
+                continue
+            mask = simplify(xy[idx], tolerance)
+            if mask.sum() >= min_vertices:
+                keep[idx[~mask]] = False
+
+    # One tolist() for the whole feature, then slice it back into rings
+    flat_list = out[keep].tolist()
+    bounds = np.concatenate(([0], np.cumsum(_ring_counts(keep, offsets))))
+    new_rings = [flat_list[bounds[k]:bounds[k + 1]] for k in range(len(rings))]
+
+    return {'type': gtype, 'coordinates': _rebuild(coords, depth, iter(new_rings))}
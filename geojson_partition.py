@@ -0,0 +1,165 @@
+"""Partitioned export of SLS GeoJSON: one compact file per kecamatan, desa
+or XYZ tile, plus manifest.json with the bbox, feature count and byte size
+of every partition, so the app can fetch and parse only what it needs.
+
+Features are streamed and appended to their partition file as they come;
+at most MAX_OPEN_FILES partition files are open at the same time.
+
+    python optimize_geojson.py final_sls.geojson out_dir --partition kec
+    python optimize_geojson.py final_sls.geojson out_dir --partition tile --zoom 13
+"""
+
+import json
+import math
+import os
+import re
+from collections import OrderedDict
+
+from geojson_stream import iter_features
+
+MANIFEST_NAME = 'manifest.json'
+MODES = ('kec', 'desa', 'tile')
+DEFAULT_ZOOM = 13
+MAX_OPEN_FILES = 64
+
+
+def slugify(text):
+    slug = re.sub(r'[^a-z0-9]+', '_', str(text or '').lower()).strip('_')
+    return slug or 'tanpa_nama'
+
+
+def tile_for(lon, lat, zoom):
+    """XYZ (slippy map) tile containing lon/lat."""
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    n = 2 ** zoom
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return zoom, min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def _positions(coords):
+    if coords and isinstance(coords[0], (int, float)):
+        yield coords
+    else:
+        for c in coords or ():
+            yield from _positions(c)
+
+
+def feature_bbox(feature):
+    geometry = feature.get('geometry') or {}
+    xs, ys = [], []
+    if geometry.get('type') == 'GeometryCollection':
+        for g in geometry.get('geometries', []):
+            b = feature_bbox({'geometry': g})
+            if b:
+                xs += [b[0], b[2]]
+                ys += [b[1], b[3]]
+    else:
+        for p in _positions(geometry.get('coordinates')):
+            xs.append(p[0])
+            ys.append(p[1])
+    if not xs:
+        return None
+    return [min(xs), min(ys), max(xs), max(ys)]
+
+
+def partition_key(feature, mode, zoom=DEFAULT_ZOOM, bbox=None):
+    """(key, manifest fields) of the partition a feature belongs to."""
+    props = feature.get('properties') or {}
+    if mode == 'kec':
+        return slugify(props.get('nmkec')), {'nmkec': props.get('nmkec', '')}
+    if mode == 'desa':
+        key = f"{slugify(props.get('nmkec'))}__{slugify(props.get('nmdesa'))}"
+        return key, {'nmkec': props.get('nmkec', ''), 'nmdesa': props.get('nmdesa', '')}
+    if bbox is None:
+        return 'tanpa_geometri', {}
+    # Whole feature goes to the tile of its bbox centre; the manifest bbox
+    # covers the real extent of the features in the tile
+    z, x, y = tile_for((bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2, zoom)
+    return f"{z}_{x}_{y}", {'tile': [z, x, y]}
+
+
+class _Partitions:
+    """Append-only FeatureCollection files with a bounded pool of open handles."""
+
+    def __init__(self, out_dir, prefix):
+        self.out_dir = out_dir
+        self.prefix = prefix
+        self.entries = OrderedDict()  # key -> manifest entry
+        self._open = OrderedDict()     # key -> file handle (LRU)
+
+    def _handle(self, key):
+        f = self._open.pop(key, None)
+        if f is None:
+            path = os.path.join(self.out_dir, self.entries[key]['file'])
+            f = open(path, 'a', encoding='utf-8')
+            if len(self._open) >= MAX_OPEN_FILES:
+                _, oldest = self._open.popitem(last=False)
+                oldest.close()
+        self._open[key] = f
+        return f
+
+    def write(self, key, fields, feature, bbox):
+        entry = self.entries.get(key)
+        first = entry is None
+        if first:
+            entry = {'key': key, **fields, 'file': f"{self.prefix}_{key}.json", 'features': 0, 'bbox': None}
+            self.entries[key] = entry
+            # Start from an empty file even if an older export left one behind
+            open(os.path.join(self.out_dir, entry['file']), 'w').close()
+        f = self._handle(key)
+        f.write('{"type":"FeatureCollection","features":[' if first else ',')
+        f.write(json.dumps(feature, separators=(',', ':')))
+        entry['features'] += 1
+        if bbox:
+            b = entry['bbox']
+            entry['bbox'] = bbox if b is None else [min(b[0], bbox[0]), min(b[1], bbox[1]),
+                                                    max(b[2], bbox[2]), max(b[3], bbox[3])]
+
+    def close(self):
+        for f in self._open.values():
+            f.close()
+        self._open.clear()
+        for entry in self.entries.values():
+            path = os.path.join(self.out_dir, entry['file'])
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(']}')
+            entry['bytes'] = os.path.getsize(path)
+
+
+def export_partitions(input_path, out_dir, mode='kec', zoom=DEFAULT_ZOOM, transform=None):
+    """Split a GeoJSON file into per-partition files and write the manifest.
+
+    `transform(feature)` (e.g. optimize_geojson.optimize_feature) is applied
+    to every feature before it is written. Returns the manifest dict.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown partition mode: {mode}")
+    os.makedirs(out_dir, exist_ok=True)
+    parts = _Partitions(out_dir, mode)
+    total = 0
+    try:
+        for feature in iter_features(input_path):
+            if transform:
+                feature = transform(feature)
+            bbox = feature_bbox(feature)
+            key, fields = partition_key(feature, mode, zoom, bbox)
+            parts.write(key, fields, feature, bbox)
+            total += 1
+    finally:
+        parts.close()
+
+    boxes = [e['bbox'] for e in parts.entries.values() if e['bbox']]
+    manifest = {
+        'mode': mode,
+        'zoom': zoom if mode == 'tile' else None,
+        'features': total,
+        'bbox': [min(b[0] for b in boxes), min(b[1] for b in boxes),
+                 max(b[2] for b in boxes), max(b[3] for b in boxes)] if boxes else None,
+        'bytes': sum(e['bytes'] for e in parts.entries.values()),
+        'partitions': sorted(parts.entries.values(), key=lambda e: e['key']),
+    }
+    with open(os.path.join(out_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    print(f"Wrote {total} features into {len(parts.entries)} partitions ({mode}) in {out_dir}")
+    return manifest
@@ -0,0 +1,195 @@
+"""Streaming read/write helpers for large GeoJSON FeatureCollections.
+
+iter_features() yields one feature at a time without loading the whole file,
+so peak memory is bounded by the largest single feature. It uses ijson when
+installed and otherwise falls back to an incremental parser built on
+json.JSONDecoder.raw_decode. iter_array() does the same for any top-level
+array member (e.g. the "usaha"/"keluarga" lists of the anomali converter)
+and read_member() returns a single small member.
+FeatureWriter writes features one by one into a compact FeatureCollection.
+"""
+
+import json
+
+try:
+    import ijson
+except ImportError:  # optional, the stdlib fallback below is used instead
+    ijson = None
+
+CHUNK_SIZE = 1 << 20
+_WHITESPACE = ' \t\n\r'
+
+
+class _Buffer:
+    """Text buffer over a file that grows on demand and drops consumed text."""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def read_more(self, size=None):
+        if self.eof:
+            return False
+        if self.pos > self.chunk_size:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        chunk = self.f.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf += chunk
+        return True
+
+    def skip_ws(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf) or not self.read_more():
+                return
+
+    def peek(self):
+        self.skip_ws()
+        if self.pos >= len(self.buf):
+            raise ValueError("Unexpected end of GeoJSON file")
+        return self.buf[self.pos]
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos}, found {self.buf[self.pos]!r}")
+        self.pos += 1
+
+    def decode(self, decoder):
+        """Decode one JSON value at the cursor, reading more text as needed."""
+        self.skip_ws()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buf, self.pos)
+                # A bare number cut at the buffer end may still continue
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # Grow reads geometrically so one huge feature is not re-parsed per chunk
+            self.read_more(size)
+            size *= 2
+
+
+def _iter_items(buf, decoder, where):
+    """Yield the elements of the JSON array at the cursor one by one."""
+    buf.expect('[')
+    if buf.peek() == ']':
+        buf.pos += 1
+        return
+    while True:
+        yield buf.decode(decoder)
+        sep = buf.peek()
+        buf.pos += 1
+        if sep == ']':
+            return
+        if sep != ',':
+            raise ValueError(f"Expected ',' or ']' in {where} at offset {buf.pos - 1}")
+
+
+def _iter_members(f, chunk_size):
+    """Yield (key, buf, decoder) for each top-level member; the caller must
+    consume the value at the cursor before asking for the next one."""
+    decoder = json.JSONDecoder()
+    buf = _Buffer(f, chunk_size)
+    buf.expect('{')
+    if buf.peek() == '}':
+        return
+    while True:
+        key = buf.decode(decoder)
+        buf.expect(':')
+        yield key, buf, decoder
+        sep = buf.peek()
+        buf.pos += 1
+        if sep == '}':
+            return
+        if sep != ',':
+            raise ValueError(f"Expected ',' or '}}' at offset {buf.pos - 1}")
+
+
+def _skip_value(buf, decoder, key):
+    # Arrays are skipped element by element so a big sibling array never
+    # has to fit in memory as a whole
+    if buf.peek() == '[':
+        for _ in _iter_items(buf, decoder, key):
+            pass
+    else:
+        buf.decode(decoder)
+
+
+def _iter_array_stdlib(f, chunk_size, member):
+    for key, buf, decoder in _iter_members(f, chunk_size):
+        if key == member:
+            yield from _iter_items(buf, decoder, member)
+        else:
+            _skip_value(buf, decoder, key)
+
+
+def iter_array(path, member, chunk_size=CHUNK_SIZE):
+    """Yield the items of the top-level array `member` of a JSON object one at a time."""
+    if ijson is not None:
+        with open(path, 'rb') as f:
+            # use_float keeps coordinates as float instead of Decimal
+            yield from ijson.items(f, f'{member}.item', use_float=True)
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from _iter_array_stdlib(f, chunk_size, member)
+
+
+def read_member(path, member, chunk_size=CHUNK_SIZE):
+    """Value of one top-level member of a JSON object, or None when absent."""
+    if ijson is not None:
+        with open(path, 'rb') as f:
+            return next(ijson.items(f, member, use_float=True), None)
+    with open(path, 'r', encoding='utf-8') as f:
+        for key, buf, decoder in _iter_members(f, chunk_size):
+            if key == member:
+                return buf.decode(decoder)
+            _skip_value(buf, decoder, key)
+    return None
+
+
+def iter_features(path, chunk_size=CHUNK_SIZE):
+    """Yield the features of a GeoJSON FeatureCollection one at a time."""
+    return iter_array(path, 'features', chunk_size)
+
+
+class FeatureWriter:
+    """Write a compact FeatureCollection one feature at a time.
+
+    with FeatureWriter(path) as out:
+        out.write(feature)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._f = None
+
+    def __enter__(self):
+        self._f = open(self.path, 'w', encoding='utf-8')
+        self._f.write('{"type":"FeatureCollection","features":[')
+        return self
+
+    def write(self, feature):
+        if self.count:
+            self._f.write(',')
+        # separators=(',', ':') removes whitespace around separators
+        self._f.write(json.dumps(feature, separators=(',', ':')))
+        self.count += 1
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self._f.write(']}')
+        finally:
+            self._f.close()
+        return False
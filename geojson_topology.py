@@ -0,0 +1,318 @@
+"""TopoJSON output for SLS boundaries: shared arcs + delta-encoded integers.
+
+Every ring is quantized to the same integer grid as optimize_geojson
+(10**-precision degrees) and cut at junctions, i.e. vertices where
+neighbouring polygons stop sharing a border. Each resulting arc is stored
+once and referenced by index from both polygons (~index when reversed), so
+a border shared by two SLS is no longer written twice. Arc positions are
+delta-encoded integers (TopoJSON "quantized" topology) and each geometry
+carries its idsls as `id` with the remaining properties.
+
+Simplification (tolerance in metres) runs per arc, so both neighbours of a
+shared border get exactly the same simplified line.
+
+    python geojson_topology.py final_sls.geojson final_sls.topojson
+    python geojson_topology.py --check final_sls.geojson final_sls.topojson
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+from geojson_geometry import (DEFAULT_PRECISION, SIMPLIFIERS, _collect_rings, _ring_counts,
+                              dedupe_mask, dequantize, flatten_rings, process_geometry,
+                              quantize, to_metres)
+from geojson_stream import iter_features
+
+OBJECT_NAME = 'sls'
+PROPERTY_KEYS = ('nmsls', 'nmdesa', 'nmkec', 'kode_pos')
+# Ring nesting inside `coordinates` for the polygon types kept in the topology
+_POLYGON_DEPTH = {'Polygon': 1, 'MultiPolygon': 2}
+
+
+def _quantized_rings(geometry, precision):
+    """List of (n, 2) int64 arrays (closed, deduped rings) for a polygon geometry."""
+    rings = []
+    _collect_rings(geometry['coordinates'], _POLYGON_DEPTH[geometry['type']], rings)
+    flat, offsets = flatten_rings(rings)
+    if flat.shape[1] != 2:
+        # Arcs are keyed and delta-encoded on x, y only; Z would be lost silently
+        raise ValueError(f"TopoJSON output supports 2-D coordinates only (feature has {flat.shape[1]}-D positions)")
+    q = quantize(flat, precision)
+    keep = dedupe_mask(q, offsets)
+    for k in np.flatnonzero(_ring_counts(keep, offsets) < 4):
+        keep[offsets[k]:offsets[k + 1]] = True
+    return [q[offsets[k]:offsets[k + 1]][keep[offsets[k]:offsets[k + 1]]] for k in range(len(rings))]
+
+
+class _Builder:
+    """Collects quantized polygons, then finds junctions and cuts shared arcs."""
+
+    def __init__(self, precision):
+        self.precision = precision
+        self.rings = []       # int64 arrays, closed
+        self.geometries = []  # (gtype, nested ring indices, id, properties)
+
+    def add(self, feature):
+        props = feature.get('properties') or {}
+        geometry = feature.get('geometry') or {}
+        gtype = geometry.get('type')
+        entry_props = {k: props.get(k, '') for k in PROPERTY_KEYS}
+        if gtype not in _POLYGON_DEPTH or not geometry.get('coordinates'):
+            self.geometries.append((None, None, props.get('idsls', ''), entry_props))
+            return
+        rings = _quantized_rings(geometry, self.precision)
+        start = len(self.rings)
+        self.rings.extend(rings)
+        if gtype == 'Polygon':
+            nested = list(range(start, start + len(rings)))
+        else:
+            nested, i = [], start
+            for polygon in geometry['coordinates']:
+                nested.append(list(range(i, i + len(polygon))))
+                i += len(polygon)
+        self.geometries.append((gtype, nested, props.get('idsls', ''), entry_props))
+
+    def _keys(self):
+        """Pack each vertex into one int64 key (grid cells relative to the minimum)."""
+        allv = np.concatenate(self.rings) if self.rings else np.zeros((0, 2), dtype=np.int64)
+        self.origin = allv.min(axis=0) if len(allv) else np.zeros(2, dtype=np.int64)
+        self.height = int(allv[:, 1].max() - self.origin[1] + 1) if len(allv) else 1
+        return [(r[:, 0] - self.origin[0]) * self.height + (r[:, 1] - self.origin[1]) for r in self.rings]
+
+    def _junctions(self, keys):
+        """Set of vertex keys where the neighbouring vertices differ between rings."""
+        cyc = [k[:-1] for k in keys if len(k) > 1]
+        if not cyc:
+            return set()
+        point = np.concatenate(cyc)
+        prev = np.concatenate([np.roll(k, 1) for k in cyc])
+        nxt = np.concatenate([np.roll(k, -1) for k in cyc])
+        pairs = np.column_stack((point, np.minimum(prev, nxt), np.maximum(prev, nxt)))
+        distinct = np.unique(pairs, axis=0)
+        points, counts = np.unique(distinct[:, 0], return_counts=True)
+        return set(points[counts > 1].tolist())
+
+    def build(self, tolerance=None, method='dp'):
+        keys = self._keys()
+        junctions = self._junctions(keys)
+        arc_index = {}
+        arcs = []
+        ring_arcs = []
+        for k in keys:
+            seq = k[:-1].tolist() if len(k) > 1 else k.tolist()
+            cut = [i for i, v in enumerate(seq) if v in junctions]
+            if not cut:
+                # Ring without junctions: one closed arc, rotated to a canonical start
+                start = seq.index(min(seq))
+                forward = seq[start:] + seq[:start]
+                backward = [forward[0]] + forward[:0:-1]
+                pieces = [forward + forward[:1]] if forward <= backward else [backward + backward[:1]]
+                refs = [self._ref(pieces[0], arc_index, arcs, forward <= backward)]
+            else:
+                rotated = seq[cut[0]:] + seq[:cut[0]]
+                bounds = [i - cut[0] for i in cut] + [len(seq)]
+                rotated.append(rotated[0])
+                refs = [self._ref(rotated[a:b + 1], arc_index, arcs) for a, b in zip(bounds, bounds[1:])]
+            ring_arcs.append(refs)
+
+        arcs = [np.array(a, dtype=np.int64) for a in arcs]
+        if tolerance:
+            self._simplify(arcs, ring_arcs, tolerance, method)
+        return arcs, ring_arcs
+
+    @staticmethod
+    def _ref(arc, arc_index, arcs, forward=True):
+        if not forward:
+            # Closed arc stored in the other direction
+            key = tuple(arc)
+            index = arc_index.setdefault(key, len(arcs))
+            if index == len(arcs):
+                arcs.append(arc)
+            return ~index
+        key = tuple(arc)
+        rkey = key[::-1]
+        if key in arc_index:
+            return arc_index[key]
+        if rkey in arc_index:
+            return ~arc_index[rkey]
+        arc_index[key] = len(arcs)
+        arcs.append(arc)
+        return arc_index[key]
+
+    def _simplify(self, arcs, ring_arcs, tolerance, method):
+        simplify = SIMPLIFIERS[method]
+        original = list(arcs)
+        for i, keys in enumerate(arcs):
+            if len(keys) <= 2:
+                continue
+            xy = to_metres(dequantize(self._decode_keys(keys), self.precision))
+            mask = simplify(xy, tolerance)
+            if keys[0] == keys[-1] and mask.sum() < 4:
+                continue
+            arcs[i] = keys[mask]
+        # Rings that would collapse below 4 vertices get their arcs back
+        for refs in ring_arcs:
+            if sum(len(arcs[r if r >= 0 else ~r]) - 1 for r in refs) < 3:
+                for r in refs:
+                    j = r if r >= 0 else ~r
+                    arcs[j] = original[j]
+
+    def _decode_keys(self, keys):
+        return np.column_stack((keys // self.height + self.origin[0], keys % self.height + self.origin[1]))
+
+    def topology(self, tolerance=None, method='dp'):
+        arcs, ring_arcs = self.build(tolerance, method)
+        encoded = []
+        for keys in arcs:
+            q = self._decode_keys(keys) - self.origin
+            delta = np.diff(q, axis=0, prepend=np.zeros((1, 2), dtype=np.int64))
+            encoded.append(delta.tolist())
+
+        scale = 10.0 ** -self.precision
+        geometries = []
+        for gtype, nested, idsls, props in self.geometries:
+            geom = {'type': gtype, 'id': idsls, 'properties': props}
+            if gtype == 'Polygon':
+                geom['arcs'] = [ring_arcs[r] for r in nested]
+            elif gtype == 'MultiPolygon':
+                geom['arcs'] = [[ring_arcs[r] for r in polygon] for polygon in nested]
+            geometries.append(geom)
+        return {
+            'type': 'Topology',
+            'transform': {
+                'scale': [scale, scale],
+                'translate': dequantize(self.origin, self.precision).tolist(),
+            },
+            'objects': {OBJECT_NAME: {'type': 'GeometryCollection', 'geometries': geometries}},
+            'arcs': encoded,
+        }
+
+
+def build_topology(features, precision=DEFAULT_PRECISION, tolerance=None, method='dp'):
+    """TopoJSON dict for an iterable of GeoJSON features."""
+    builder = _Builder(precision)
+    for feature in features:
+        builder.add(feature)
+    return builder.topology(tolerance, method)
+
+
+def _precision(topology):
+    return int(round(-np.log10(topology['transform']['scale'][0])))
+
+
+def decode_arcs(topology):
+    """Absolute integer grid positions for every arc (list of (n, 2) arrays)."""
+    precision = _precision(topology)
+    origin = quantize(np.array(topology['transform']['translate']), precision)
+    return [np.cumsum(np.array(arc, dtype=np.int64), axis=0) + origin for arc in topology['arcs']]
+
+
+def _ring(arcs, refs):
+    points = []
+    for r in refs:
+        arc = arcs[r] if r >= 0 else arcs[~r][::-1]
+        points.extend(arc.tolist() if not points else arc[1:].tolist())
+    return points
+
+
+def iter_decoded_features(topology, object_name=OBJECT_NAME):
+    """Yield GeoJSON features back from a topology written by build_topology()."""
+    precision = _precision(topology)
+    arcs = decode_arcs(topology)
+    scale = 10 ** precision
+
+    def ring(refs):
+        return [[x / scale, y / scale] for x, y in _ring(arcs, refs)]
+
+    for geom in topology['objects'][object_name]['geometries']:
+        props = {'idsls': geom.get('id', '')}
+        props.update(geom.get('properties') or {})
+        gtype = geom.get('type')
+        if gtype == 'Polygon':
+            geometry = {'type': gtype, 'coordinates': [ring(r) for r in geom['arcs']]}
+        elif gtype == 'MultiPolygon':
+            geometry = {'type': gtype, 'coordinates': [[ring(r) for r in p] for p in geom['arcs']]}
+        else:
+            geometry = None
+        yield {'type': 'Feature', 'properties': props, 'geometry': geometry}
+
+
+def _same_ring(a, b):
+    """Rings are equal up to the starting vertex (arcs rotate rings to a junction)."""
+    a, b = a[:-1], b[:-1]
+    if len(a) != len(b):
+        return False
+    if not a:
+        return True
+    starts = [i for i, v in enumerate(b) if v == a[0]]
+    return any(b[i:] + b[:i] == a for i in starts)
+
+
+def _rings_of(geometry):
+    if not geometry or geometry.get('type') not in _POLYGON_DEPTH:
+        return []
+    rings = []
+    _collect_rings(geometry['coordinates'], _POLYGON_DEPTH[geometry['type']], rings)
+    return rings
+
+
+def check_round_trip(input_path, topology_path):
+    """Compare every decoded feature with the input quantized at the same
+    precision (lossless topologies only). Return the list of mismatching idsls."""
+    with open(topology_path, 'r', encoding='utf-8') as f:
+        topology = json.load(f)
+    precision = _precision(topology)
+    decoded = {}
+    for feature in iter_decoded_features(topology):
+        decoded.setdefault(feature['properties']['idsls'], []).append(feature)
+
+    mismatches = []
+    for feature in iter_features(input_path):
+        idsls = (feature.get('properties') or {}).get('idsls', '')
+        candidates = decoded.get(idsls)
+        if not candidates:
+            mismatches.append(idsls)
+            continue
+        got = candidates.pop(0)
+        expected_geom = process_geometry(feature.get('geometry'), precision)
+        want_rings = _rings_of(expected_geom)
+        got_rings = _rings_of(got['geometry'])
+        if len(want_rings) != len(got_rings) or not all(_same_ring(w, g) for w, g in zip(want_rings, got_rings)):
+            mismatches.append(idsls)
+    mismatches.extend(i for i, rest in decoded.items() for _ in rest)
+    return mismatches
+
+
+def write_topology(input_path, output_path, precision=DEFAULT_PRECISION, tolerance=None, method='dp'):
+    print(f"Building topology from {input_path}...")
+    topology = build_topology(iter_features(input_path), precision, tolerance, method)
+    geometries = topology['objects'][OBJECT_NAME]['geometries']
+    print(f"{len(geometries)} geometries, {len(topology['arcs'])} arcs.")
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(topology, f, separators=(',', ':'))
+    original_size = os.path.getsize(input_path)
+    new_size = os.path.getsize(output_path)
+    print(f"Done! Original size: {original_size/1024:.2f} KB, TopoJSON size: {new_size/1024:.2f} KB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write SLS boundaries as TopoJSON with shared arcs.")
+    parser.add_argument('input')
+    parser.add_argument('output')
+    parser.add_argument('--precision', type=int, default=DEFAULT_PRECISION)
+    parser.add_argument('--simplify', type=float, metavar='METRES')
+    parser.add_argument('--method', choices=sorted(SIMPLIFIERS), default='dp')
+    parser.add_argument('--check', action='store_true',
+                        help="only decode OUTPUT and compare it with INPUT")
+    args = parser.parse_args()
+    if not args.check:
+        write_topology(args.input, args.output, args.precision, args.simplify, args.method)
+    if args.check or not args.simplify:
+        bad = check_round_trip(args.input, args.output)
+        if bad:
+            print(f"❌ Round-trip mismatch for {len(bad)} features, e.g. {bad[:5]}")
+            raise SystemExit(1)
+        print("✅ Round-trip check passed.")
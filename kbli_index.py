@@ -0,0 +1,339 @@
+"""Search index over the KBLI 2025 master CSV (assets/csv/*master KBLI*.csv).
+
+build_index() parses the semicolon-delimited CSV once and writes a JSON sidecar with the records
+and an inverted index: stemmed tokens of Judul and Deskripsi mapped to
+precomputed BM25 scores, Judul weighted higher. The part of a Deskripsi
+from "tidak mencakup" onwards lists what the code excludes, so it is not
+indexed. KbliIndex.load() reads the sidecar (rebuilding it when the CSV is
+newer) and adds a code-prefix trie.
+
+The sidecar is a build artefact, so it is kept out of assets/csv/ (which
+the app bundles): it lives in $KBLI_INDEX_DIR, by default
+~/.cache/direktori/kbli.
+
+    search("011*")              codes starting with 011
+    search("penjahitan pakaian") ranked full-text matches
+    search("47 kelontong")      full-text within codes starting with 47
+    classify(names)             best code for many business names at once
+
+    python kbli_index.py build "assets/csv/...master KBLI 2025 SE A.csv"
+    python kbli_index.py search "warung makan"
+    python kbli_index.py classify usaha.csv hasil.csv --column nama_usaha
+"""
+
+import argparse
+import csv
+import glob
+import json
+import math
+import os
+import re
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+INDEX_VERSION = 1
+DEFAULT_CSV_GLOB = 'assets/csv/*KBLI*.csv'
+DEFAULT_INDEX_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'direktori', 'kbli')
+
+# Judul says what the code is; Deskripsi adds synonyms and examples
+TITLE_WEIGHT = 3
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Score factor for vocabulary terms that only share the query term as prefix
+PREFIX_FACTOR = 0.6
+MAX_PREFIX_TERMS = 50
+# Bonus when every query term occurs in the Judul
+TITLE_MATCH_BONUS = 1.5
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+_EXCLUSION = re.compile(r'\btidak\s+mencakup\b', re.IGNORECASE)
+_CODE_QUERY = re.compile(r'^(\d{1,5})\*?$')
+
+STOPWORDS = frozenset('''
+    ada adalah akan antara atas atau bagi bahwa baik bukan dalam dan dapat dari
+    dengan di ini itu juga ke kelompok lain lainnya lihat mencakup oleh pada
+    sebagai secara seperti serta suatu tersebut tidak untuk yang yaitu
+    termasuk kegiatan usaha ytdl
+'''.split())
+
+_PREFIXES = ('peng', 'peny', 'pem', 'pen', 'per', 'pe', 'meng', 'meny', 'mem', 'men', 'me', 'ber', 'di')
+_SUFFIXES = ('nya', 'kan', 'an')
+
+
+def stem(token):
+    """Light Indonesian stemmer: one suffix and one prefix, keeping >= 4 letters.
+
+    penjahitan -> jahit, pertanian -> tani, perdagangan -> dagang
+    """
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 4:
+            token = token[:-len(suffix)]
+            break
+    for prefix in _PREFIXES:
+        if token.startswith(prefix) and len(token) - len(prefix) >= 4:
+            token = token[len(prefix):]
+            break
+    return token
+
+
+def tokenize(text):
+    return [stem(t) for t in _TOKEN.findall((text or '').lower())
+            if t not in STOPWORDS and not t.isdigit()]
+
+
+def find_csv():
+    paths = sorted(glob.glob(DEFAULT_CSV_GLOB))
+    if not paths:
+        raise FileNotFoundError(f"No KBLI CSV matches {DEFAULT_CSV_GLOB}")
+    return paths[0]
+
+
+def index_dir():
+    return os.environ.get('KBLI_INDEX_DIR') or DEFAULT_INDEX_DIR
+
+
+def index_path_for(csv_path):
+    """Sidecar path: .../master KBLI 2025 SE A.csv -> <index_dir>/master KBLI 2025 SE A.index.json"""
+    name = os.path.splitext(os.path.basename(csv_path))[0] + '.index.json'
+    return os.path.join(index_dir(), name)
+
+
+def read_kbli_csv(csv_path):
+    """Records as [kode, judul, kategori, bukan_cakupan_se, deskripsi]."""
+    records = []
+    # csv handles quoted Deskripsi values spanning several lines or holding ';'
+    with open(csv_path, 'r', newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f, delimiter=';')
+        next(reader, None)
+        for fields in reader:
+            if len(fields) < 4 or not fields[2].strip():
+                continue
+            deskripsi = fields[5] if len(fields) > 5 else ''
+            bukan_se = len(fields) > 6 and fields[6].strip() == '1'
+            records.append([fields[2].strip(), fields[3].strip(), fields[1].strip(), bukan_se,
+                            ' '.join(deskripsi.split())])
+    return records
+
+
+def _postings(records):
+    """token -> [[doc, bm25 score], ...] over Judul (weighted) + Deskripsi."""
+    tfs, lengths = [], []
+    for _, judul, _, _, deskripsi in records:
+        included = _EXCLUSION.split(deskripsi, maxsplit=1)[0]
+        title_tokens = tokenize(judul)
+        tf = Counter(tokenize(included))
+        for t in title_tokens:
+            tf[t] += TITLE_WEIGHT
+        tfs.append(tf)
+        lengths.append(sum(tf.values()))
+
+    n = len(records)
+    avg_len = (sum(lengths) / n) if n else 1.0
+    df = Counter(t for tf in tfs for t in tf)
+    postings = defaultdict(list)
+    for doc, tf in enumerate(tfs):
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[doc] / avg_len)
+        for t, f in tf.items():
+            idf = math.log(1 + (n - df[t] + 0.5) / (df[t] + 0.5))
+            postings[t].append([doc, round(idf * f * (BM25_K1 + 1) / (f + norm), 4)])
+    return dict(sorted(postings.items()))
+
+
+def build_index(csv_path=None, index_path=None):
+    """Write the JSON sidecar for the KBLI CSV and return its path."""
+    csv_path = csv_path or find_csv()
+    index_path = index_path or index_path_for(csv_path)
+    records = read_kbli_csv(csv_path)
+    os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+    data = {
+        'version': INDEX_VERSION,
+        'source': os.path.basename(csv_path),
+        'records': records,
+        'postings': _postings(records),
+    }
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    print(f"Indexed {len(records)} KBLI codes, {len(data['postings'])} terms -> {index_path}")
+    return index_path
+
+
+class _CodeTrie:
+    """Digit trie over KBLI codes; every node keeps the docs of its subtree."""
+
+    def __init__(self, codes):
+        self.root = {'docs': [], 'next': {}}
+        for doc in sorted(range(len(codes)), key=codes.__getitem__):
+            node = self.root
+            node['docs'].append(doc)
+            for digit in codes[doc]:
+                node = node['next'].setdefault(digit, {'docs': [], 'next': {}})
+                node['docs'].append(doc)
+
+    def prefix(self, prefix):
+        node = self.root
+        for digit in prefix:
+            node = node['next'].get(digit)
+            if node is None:
+                return []
+        return node['docs']
+
+
+class KbliIndex:
+    """Loaded KBLI index: code prefix lookup, full-text search, batch classify."""
+
+    def __init__(self, data):
+        self.records = data['records']
+        self.postings = data['postings']
+        self.vocab = list(self.postings)  # sorted at build time
+        self.trie = _CodeTrie([r[0] for r in self.records])
+        self._by_code = {r[0]: i for i, r in enumerate(self.records)}
+
+    @classmethod
+    def load(cls, csv_path=None, index_path=None):
+        """Load the sidecar of csv_path, (re)building it when missing or stale."""
+        csv_path = csv_path or find_csv()
+        index_path = index_path or index_path_for(csv_path)
+        if not os.path.exists(index_path) or os.path.getmtime(index_path) < os.path.getmtime(csv_path):
+            build_index(csv_path, index_path)
+        with open(index_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != INDEX_VERSION:
+            build_index(csv_path, index_path)
+            with open(index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        return cls(data)
+
+    def _result(self, doc, score=None):
+        kode, judul, kategori, bukan_se, _ = self.records[doc]
+        result = {'kode': kode, 'judul': judul, 'kategori': kategori, 'bukan_cakupan_se': bukan_se}
+        if score is not None:
+            result['skor'] = round(score, 4)
+        return result
+
+    def get(self, kode):
+        """Full record of one code, or None."""
+        doc = self._by_code.get(str(kode).strip())
+        if doc is None:
+            return None
+        return {**self._result(doc), 'deskripsi': self.records[doc][4]}
+
+    def _expand(self, term):
+        """(vocabulary term, factor) pairs for one query term."""
+        matches = []
+        i = bisect_left(self.vocab, term)
+        while i < len(self.vocab) and self.vocab[i].startswith(term) and len(matches) < MAX_PREFIX_TERMS:
+            matches.append((self.vocab[i], 1.0 if self.vocab[i] == term else PREFIX_FACTOR))
+            i += 1
+        return matches
+
+    def _scores(self, terms, allowed=None):
+        scores = defaultdict(float)
+        hits = defaultdict(int)
+        for term in terms:
+            best = {}
+            for vterm, factor in self._expand(term):
+                for doc, score in self.postings[vterm]:
+                    if allowed is None or doc in allowed:
+                        best[doc] = max(best.get(doc, 0.0), score * factor)
+            for doc, score in best.items():
+                scores[doc] += score
+                hits[doc] += 1
+        for doc in scores:
+            # Docs matching more of the query terms rank first
+            scores[doc] *= hits[doc] / len(terms)
+            if hits[doc] == len(terms) and set(terms) <= set(tokenize(self.records[doc][1])):
+                scores[doc] *= TITLE_MATCH_BONUS
+        return scores
+
+    def search(self, query, limit=10, cakupan_se=False):
+        """Ranked matches for a query.
+
+        Numeric parts ("011", "011*") restrict to codes with that prefix; the
+        other words are matched against Judul/Deskripsi. With cakupan_se=True
+        codes marked "Bukan cakupan SE" are left out.
+        """
+        prefixes, words = [], []
+        for part in (query or '').split():
+            m = _CODE_QUERY.match(part)
+            if m:
+                prefixes.append(m.group(1))
+            else:
+                words.append(part)
+        allowed = None
+        if prefixes:
+            allowed = set(self.trie.prefix(prefixes[0]))
+            for p in prefixes[1:]:
+                allowed &= set(self.trie.prefix(p))
+        if cakupan_se:
+            in_scope = {i for i, r in enumerate(self.records) if not r[3]}
+            allowed = in_scope if allowed is None else allowed & in_scope
+
+        terms = tokenize(' '.join(words))
+        if not terms:
+            if allowed is None:
+                return []
+            docs = [d for d in self.trie.prefix(prefixes[0] if prefixes else '') if d in allowed]
+            return [self._result(d) for d in docs[:limit]]
+
+        scores = self._scores(terms, allowed)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], self.records[item[0]][0]))
+        return [self._result(doc, score) for doc, score in ranked[:limit]]
+
+    def classify(self, names, limit=1, cakupan_se=True):
+        """Suggested codes for many business names: one list of up to `limit`
+        results per name (empty when nothing matches). Repeated names are
+        scored once."""
+        cache = {}
+        results = []
+        for name in names:
+            key = ' '.join(tokenize(name))
+            if key not in cache:
+                cache[key] = self.search(key, limit, cakupan_se) if key else []
+            results.append(cache[key])
+        return results
+
+
+def classify_csv(csv_path, output_path, column='nama_usaha', kbli_csv=None):
+    """Copy a CSV adding kbli_saran, judul_saran and skor_saran columns."""
+    index = KbliIndex.load(kbli_csv)
+    with open(csv_path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames or []
+        rows = list(reader)
+    if column not in fieldnames:
+        raise SystemExit(f"Column {column!r} not found in {csv_path}")
+    suggestions = index.classify([r[column] for r in rows])
+    with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames + ['kbli_saran', 'judul_saran', 'skor_saran'])
+        writer.writeheader()
+        for row, found in zip(rows, suggestions):
+            best = found[0] if found else {}
+            writer.writerow({**row, 'kbli_saran': best.get('kode', ''),
+                             'judul_saran': best.get('judul', ''), 'skor_saran': best.get('skor', '')})
+    matched = sum(1 for found in suggestions if found)
+    print(f"Classified {matched}/{len(rows)} rows -> {output_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="KBLI 2025 search index.")
+    parser.add_argument('--kbli', help=f"KBLI CSV (default: first match of {DEFAULT_CSV_GLOB})")
+    sub = parser.add_subparsers(dest='command', required=True)
+    b = sub.add_parser('build', help="write <csv>.index.json into the index directory")
+    b.add_argument('csv', nargs='?')
+    b.add_argument('--output')
+    s = sub.add_parser('search', help="print matches for a query")
+    s.add_argument('query')
+    s.add_argument('--limit', type=int, default=10)
+    s.add_argument('--cakupan-se', action='store_true', help="only codes within SE coverage")
+    c = sub.add_parser('classify', help="add suggested KBLI columns to a CSV of business names")
+    c.add_argument('csv')
+    c.add_argument('output')
+    c.add_argument('--column', default='nama_usaha')
+    args = parser.parse_args()
+    if args.command == 'build':
+        build_index(args.csv or args.kbli, args.output)
+    elif args.command == 'search':
+        for r in KbliIndex.load(args.kbli).search(args.query, args.limit, args.cakupan_se):
+            print(f"{r['kode']}  {r.get('skor', ''):>8}  {r['judul']}")
+    else:
+        classify_csv(args.csv, args.output, args.column, args.kbli)
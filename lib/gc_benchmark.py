@@ -0,0 +1,242 @@
+"""Benchmark submitter GC terhadap server tiruan MatchaPro (matchapro_palsu.py).
+
+Setiap skenario menjalankan jalur kirim yang sama dengan gc_koprol.py
+(jalankan_paralel + SesiHttp, atau jalankan_async dengan --async) ke server
+tiruan lokal dengan gangguan tertentu, lalu meringkas gc_metrics.jsonl dan
+jurnal run itu:
+
+    baris/menit   baris yang selesai (sukses/sudah GC/fatal) per menit
+    overhead      POST tambahan per baris selesai (retry karena 429/503/token)
+    tunggu        detik menunggu cooldown 429, limiter dan refresh token
+    pulih         per jenis gangguan: waktu dari response gagal pertama
+                  sampai POST sukses berikutnya di akun yang sama (p50/maks)
+
+Sesi login dibuat lewat HTTP ke server tiruan dan disimpan di sessions.json,
+jadi tidak perlu browser. Dengan --sso login memakai alur Playwright
+login.py (BrowserPool headless) terhadap halaman SSO tiruan.
+
+Setiap skenario berjalan di direktori sendiri (jurnal, sessions.json,
+rate_state.json, gc_metrics.jsonl, log) di bawah --dir. Output submitter
+ditulis ke <skenario>.log, ringkasan ke gc_benchmark.json.
+
+    python gc_benchmark.py
+    python gc_benchmark.py --skenario=normal,sibuk,429 --baris=100 --akun=3
+    python gc_benchmark.py --async --interval=0.5 --dir=bench
+"""
+
+import contextlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+from gc_reader import GcRow
+from matchapro_palsu import MatchaProPalsu, Perilaku, login_http
+
+# Nama skenario -> perilaku server tiruan
+SKENARIO = {
+    'normal': Perilaku(),
+    'latensi': Perilaku(latensi=0.3, jitter=0.4),
+    'sibuk': Perilaku(p_sibuk=0.1),
+    'token': Perilaku(p_token=0.1),
+    '429': Perilaku(p_429=0.05, retry_after=5),
+    '429-menit': Perilaku(p_429=0.03, retry_after=60, gaya_429='menit'),
+    'batas': Perilaku(batas_per_menit=20, retry_after=10),
+}
+
+# Jenis gangguan menurut status response
+GANGGUAN = {429: 'rate_limit', 503: 'sibuk', 400: 'token', 419: 'csrf', 401: 'sesi', None: 'koneksi'}
+
+
+def buat_baris(jumlah, seed=0):
+    """GcRow sintetis dengan perusahaan_id unik dan koordinat di sekitar Parepare."""
+    rnd = random.Random(seed)
+    for i in range(jumlah):
+        yield GcRow(i + 1, f"BENCH{i + 1:07d}",
+                    round(-4.01 + rnd.uniform(-0.02, 0.02), 6),
+                    round(119.63 + rnd.uniform(-0.02, 0.02), 6),
+                    rnd.choice((1, 1, 1, 3, 99)))
+
+
+def _persentil(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def ringkas_metrics(path):
+    """Hitung request, baris, waktu tunggu dan waktu pulih per gangguan dari file metrics."""
+    requests_per_akun = defaultdict(list)
+    rows = 0
+    tunggu = defaultdict(float)
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            event = record['event']
+            if event == 'request':
+                requests_per_akun[record['akun']].append((record['ts'], record.get('status')))
+            elif event == 'row' and not record.get('dilepas'):
+                rows += 1
+            elif event in ('backoff_429', 'limiter', 'refresh'):
+                tunggu[event] += record.get('durasi', 0.0)
+
+    # Satu episode gangguan = response gagal berturut-turut di satu akun
+    # sampai POST berikutnya yang berstatus 200. Episode tanpa POST sukses
+    # sesudahnya (mis. baris sudah habis diambil akun lain) dihitung
+    # tidak_pulih.
+    pulih = defaultdict(list)
+    tidak_pulih = defaultdict(int)
+    for events in requests_per_akun.values():
+        mulai = jenis = None
+        for ts, status in sorted(events, key=lambda e: e[0]):
+            if status == 200:
+                if mulai is not None:
+                    pulih[jenis].append(ts - mulai)
+                    mulai = None
+            elif mulai is None:
+                mulai, jenis = ts, GANGGUAN.get(status, f"http_{status}")
+        if mulai is not None:
+            tidak_pulih[jenis] += 1
+
+    return {
+        'requests': sum(len(e) for e in requests_per_akun.values()),
+        'rows': rows,
+        'tunggu_detik': {k: round(v, 1) for k, v in sorted(tunggu.items())},
+        'pulih': {
+            jenis: {'episode': len(pulih[jenis]) + tidak_pulih[jenis],
+                    'tidak_pulih': tidak_pulih[jenis],
+                    'p50_detik': round(_persentil(pulih[jenis], 50), 2) if pulih[jenis] else None,
+                    'maks_detik': round(max(pulih[jenis]), 2) if pulih[jenis] else None}
+            for jenis in sorted(set(pulih) | set(tidak_pulih))
+        },
+    }
+
+
+def jalankan_skenario(nama, perilaku, args, direktori):
+    """Jalankan satu skenario di `direktori` dan kembalikan dict hasil."""
+    # Diimpor di sini: gc_koprol membaca MATCHAPRO_BASE_URL saat diimpor
+    import gc_koprol
+    from gc_journal import Journal
+    from gc_metrics import metrics
+    from session_store import save_session
+
+    server = MatchaProPalsu(('127.0.0.1', args['port']), perilaku, seed=args['seed']).mulai()
+    if server.base_url != gc_koprol.BASE_URL:
+        server.berhenti()
+        raise SystemExit(f"gc_koprol memakai {gc_koprol.BASE_URL}, server tiruan di {server.base_url}")
+
+    os.makedirs(direktori, exist_ok=True)
+    cwd = os.getcwd()
+    os.chdir(direktori)
+    # Username unik per skenario agar limiter di proses ini tidak terbawa
+    users = [(f"bench{i + 1}-{nama}", 'rahasia') for i in range(args['akun'])]
+    journal = Journal('gc_journal.db')
+    try:
+        if not args['sso']:
+            for username, password in users:
+                save_session(username, login_http(server.base_url, username, password))
+        gc_koprol.SesiAkun.pakai_pool = args['sso']
+
+        metrics.aktifkan('gc_metrics.jsonl')
+        t0 = time.monotonic()
+        with open(f"{nama}.log", 'w', encoding='utf-8') as log, contextlib.redirect_stdout(log):
+            rows = buat_baris(args['baris'], args['seed'])
+            if args['async']:
+                from gc_koprol_async import jalankan_async
+                jalankan_async(users, rows, journal, args['interval'])
+            else:
+                gc_koprol.jalankan_paralel(users, rows, journal, args['interval'], gc_koprol.SesiHttp)
+        detik = time.monotonic() - t0
+        metrics.tutup()
+
+        hasil = ringkas_metrics('gc_metrics.jsonl')
+        hasil.update({
+            'skenario': nama,
+            'perilaku': perilaku._asdict(),
+            'detik': round(detik, 1),
+            'baris_per_menit': round(hasil['rows'] / detik * 60, 1) if detik else 0.0,
+            'overhead_pct': round(100 * (hasil['requests'] - hasil['rows']) / hasil['rows'], 1) if hasil['rows'] else None,
+            'jurnal': journal.ringkasan(),
+            'server': dict(server.statistik),
+        })
+        return hasil
+    finally:
+        metrics.tutup()
+        journal.tutup()
+        os.chdir(cwd)
+        server.berhenti()
+
+
+def cetak_hasil(hasil):
+    print(f"{'skenario':<11}{'baris':>6}{'detik':>8}{'baris/mnt':>11}{'request':>9}{'overhead':>10}"
+          f"{'tunggu s':>10}  pulih (episode, p50/maks detik)")
+    for h in hasil:
+        tunggu = sum(h['tunggu_detik'].values())
+        overhead = '-' if h['overhead_pct'] is None else f"{h['overhead_pct']}%"
+        pulih = ', '.join(
+            f"{j} {p['episode']}x {p['p50_detik']}/{p['maks_detik']}"
+            + (f" ({p['tidak_pulih']} tidak pulih)" if p['tidak_pulih'] else '')
+            for j, p in h['pulih'].items())
+        print(f"{h['skenario']:<11}{h['rows']:>6}{h['detik']:>8}{h['baris_per_menit']:>11}{h['requests']:>9}"
+              f"{overhead:>10}{tunggu:>10.1f}  {pulih or '-'}")
+
+
+def _parse_flags(argv):
+    flags = dict(a[2:].split('=', 1) if '=' in a else (a[2:], '') for a in argv if a.startswith('--'))
+    skenario = flags.get('skenario')
+    nama = skenario.split(',') if skenario else list(SKENARIO)
+    tidak_dikenal = [n for n in nama if n not in SKENARIO]
+    if tidak_dikenal:
+        raise SystemExit(f"Skenario tidak dikenal: {tidak_dikenal}. Pilihan: {', '.join(SKENARIO)}")
+    return nama, {
+        'baris': int(flags.get('baris', 60)),
+        'akun': int(flags.get('akun', 2)),
+        'interval': float(flags.get('interval', 1)),
+        'port': int(flags.get('port', 0)),
+        'seed': int(flags.get('seed', 0)),
+        'async': 'async' in flags,
+        'sso': 'sso' in flags,
+        'dir': flags.get('dir') or tempfile.mkdtemp(prefix='gc_benchmark_'),
+        'output': flags.get('output', 'gc_benchmark.json'),
+    }
+
+
+def main():
+    if '--help' in sys.argv:
+        print(__doc__)
+        return
+    nama_skenario, args = _parse_flags(sys.argv[1:])
+
+    # Port tetap untuk semua skenario: alamat server harus sudah diketahui
+    # sebelum gc_koprol diimpor
+    if not args['port']:
+        probe = MatchaProPalsu(('127.0.0.1', 0))
+        args['port'] = probe.server_address[1]
+        probe.server_close()
+    os.environ['MATCHAPRO_BASE_URL'] = f"http://127.0.0.1:{args['port']}"
+
+    print(f"[INFO] {len(nama_skenario)} skenario, {args['baris']} baris, {args['akun']} akun, "
+          f"mode {'async' if args['async'] else 'paralel'}, direktori {args['dir']}")
+    hasil = []
+    for nama in nama_skenario:
+        print(f"[INFO] Skenario {nama}...")
+        h = jalankan_skenario(nama, SKENARIO[nama], args, os.path.join(args['dir'], nama))
+        print(f"[INFO] {nama}: {h['rows']} baris dalam {h['detik']}s, jurnal {h['jurnal']}")
+        hasil.append(h)
+
+    print()
+    cetak_hasil(hasil)
+    output = os.path.join(args['dir'], args['output'])
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(hasil, f, indent=2)
+    print(f"\n[INFO] Ringkasan: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""Jurnal hasil pengiriman GC (SQLite, append-only).
+
+Menggantikan baris.txt dan error.txt: setiap hasil kirim per perusahaan_id
+dicatat sebagai satu entri (sukses, sudah_gc, retry atau fatal). Entri
+ditulis per batch dalam satu transaksi dengan synchronous=FULL (fsync saat
+commit), jadi tidak ada lagi buka-tulis file untuk setiap baris. Saat
+resume, perusahaan_id yang sudah selesai dilewati dan hanya yang gagal
+(retry) atau belum pernah dikirim yang dicoba lagi. Status terakhir suatu
+perusahaan_id adalah entri dengan id terbesar.
+
+Ringkasan dari command line:
+    python gc_journal.py                        # jumlah per status
+    python gc_journal.py --error                # daftar perusahaan_id retry/fatal terakhir
+    python gc_journal.py --export=sudah_gc.txt  # id terkonfirmasi, untuk --cache di batch lain
+"""
+
+import csv
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+JOURNAL_PATH = 'gc_journal.db'
+
+SUKSES = 'sukses'
+SUDAH_GC = 'sudah_gc'
+RETRY = 'retry'
+FATAL = 'fatal'
+
+# Status yang dianggap selesai (tidak dikirim ulang saat resume)
+STATUS_SELESAI = (SUKSES, SUDAH_GC, FATAL)
+# Status yang berarti server sudah mencatat ground check untuk usaha tersebut
+STATUS_TERKONFIRMASI = (SUKSES, SUDAH_GC)
+# Label saring_selesai untuk perusahaan_id yang muncul lebih dari sekali di input
+DUPLIKAT = 'duplikat'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS journal (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    perusahaan_id TEXT NOT NULL,
+    baris INTEGER,
+    status TEXT NOT NULL,
+    http_status INTEGER,
+    pesan TEXT,
+    akun TEXT,
+    ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_journal_perusahaan ON journal (perusahaan_id, id);
+"""
+
+_LATEST_SQL = """
+SELECT j.perusahaan_id, j.baris, j.status, j.http_status, j.pesan, j.akun, j.ts
+FROM journal j
+JOIN (SELECT perusahaan_id, MAX(id) AS id FROM journal GROUP BY perusahaan_id) t
+  ON t.id = j.id
+"""
+
+
+class Journal:
+    """Jurnal thread-safe dengan penulisan per batch.
+
+    Entri ditampung di memori dan di-commit setiap `batch_size` entri atau
+    setiap `flush_interval` detik, mana yang lebih dulu.
+    """
+
+    def __init__(self, path=JOURNAL_PATH, batch_size=20, flush_interval=5.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.executescript(SCHEMA)
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def catat(self, perusahaan_id, status, baris=None, http_status=None, pesan=None, akun=None):
+        with self._lock:
+            self._buffer.append((str(perusahaan_id), baris, status, http_status, pesan, akun, time.time()))
+            if (len(self._buffer) >= self.batch_size or
+                    time.monotonic() - self._last_flush >= self.flush_interval):
+                self._flush_locked()
+
+    def _flush_locked(self):
+        if self._buffer:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO journal (perusahaan_id, baris, status, http_status, pesan, akun, ts) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    self._buffer,
+                )
+            self._buffer = []
+        self._last_flush = time.monotonic()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def kosong(self):
+        with self._lock:
+            return not self._buffer and self._conn.execute("SELECT 1 FROM journal LIMIT 1").fetchone() is None
+
+    def selesai_ids(self, status=STATUS_SELESAI):
+        """Set perusahaan_id yang status terakhirnya termasuk `status`."""
+        return set(self.status_terakhir(status))
+
+    def status_terakhir(self, status=STATUS_SELESAI):
+        """Dict perusahaan_id -> status terakhir, hanya untuk status dalam `status`."""
+        self.flush()
+        marks = ",".join("?" * len(status))
+        with self._lock:
+            cur = self._conn.execute(
+                f"SELECT perusahaan_id, status FROM ({_LATEST_SQL}) WHERE status IN ({marks})", tuple(status))
+            return dict(cur.fetchall())
+
+    def ringkasan(self):
+        """Jumlah perusahaan_id per status terakhir."""
+        self.flush()
+        with self._lock:
+            cur = self._conn.execute(f"SELECT status, COUNT(*) FROM ({_LATEST_SQL}) GROUP BY status")
+            return dict(cur.fetchall())
+
+    def gagal(self):
+        """Entri terakhir berstatus retry/fatal, urut nomor baris."""
+        self.flush()
+        with self._lock:
+            cur = self._conn.execute(
+                f"SELECT * FROM ({_LATEST_SQL}) WHERE status IN (?, ?) ORDER BY baris", (RETRY, FATAL))
+            return cur.fetchall()
+
+    def tutup(self):
+        with self._lock:
+            try:
+                self._flush_locked()
+            finally:
+                self._conn.close()
+
+
+def muat_terkonfirmasi(path):
+    """perusahaan_id terkonfirmasi dari jurnal lain (.db) atau daftar id
+    (.txt/.csv, kolom pertama; header 'perusahaan_id' diabaikan)."""
+    if path.endswith('.db'):
+        other = Journal(path)
+        try:
+            return other.selesai_ids(STATUS_TERKONFIRMASI)
+        finally:
+            other.tutup()
+    ids = set()
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        for record in csv.reader(f):
+            if record and record[0].strip() and record[0].strip() != 'perusahaan_id':
+                ids.add(record[0].strip())
+    return ids
+
+
+def indeks_lewati(journal, cache_paths=()):
+    """Dict perusahaan_id -> status untuk semua id yang tidak perlu dikirim:
+    status selesai di jurnal ini ditambah id terkonfirmasi dari `cache_paths`
+    (batch CSV lain yang tumpang tindih)."""
+    lewati = journal.status_terakhir()
+    for path in cache_paths:
+        if not os.path.exists(path):
+            print(f"Warning: cache {path} tidak ditemukan, dilewati.")
+            continue
+        ids = muat_terkonfirmasi(path)
+        for perusahaan_id in ids:
+            lewati.setdefault(perusahaan_id, SUDAH_GC)
+        print(f"[INFO] Cache {path}: {len(ids)} perusahaan_id terkonfirmasi.")
+    return lewati
+
+
+def saring_selesai(rows, lewati, on_skip=None):
+    """Lewati GcRow yang perusahaan_id-nya ada di `lewati` (set atau dict
+    id -> status) atau sudah muncul sebelumnya di input yang sama.
+
+    Kembalikan (generator, counter); counter['dilewati'] dan jumlah per
+    status terisi selama iterasi. on_skip(row, status) dipanggil per baris
+    yang dilewati.
+    """
+    counter = {'dilewati': 0}
+    terlihat = set()
+
+    def gen():
+        for row in rows:
+            if row.perusahaan_id in lewati:
+                status = lewati[row.perusahaan_id] if isinstance(lewati, dict) else SUDAH_GC
+            elif row.perusahaan_id in terlihat:
+                status = DUPLIKAT
+            else:
+                terlihat.add(row.perusahaan_id)
+                yield row
+                continue
+            counter['dilewati'] += 1
+            counter[status] = counter.get(status, 0) + 1
+            if on_skip:
+                on_skip(row, status)
+
+    return gen(), counter
+
+
+def main():
+    path = next((a for a in sys.argv[1:] if not a.startswith('--')), JOURNAL_PATH)
+    journal = Journal(path)
+    try:
+        export = next((a.split('=', 1)[1] for a in sys.argv if a.startswith('--export=')), None)
+        if export:
+            ids = journal.selesai_ids(STATUS_TERKONFIRMASI)
+            with open(export, 'w', encoding='utf-8') as f:
+                f.write('perusahaan_id\n')
+                for perusahaan_id in sorted(ids):
+                    f.write(f"{perusahaan_id}\n")
+            print(f"{len(ids)} perusahaan_id terkonfirmasi ditulis ke {export}")
+            return
+        if '--error' in sys.argv:
+            for perusahaan_id, baris, status, http_status, pesan, akun, ts in journal.gagal():
+                print(f"Row {baris}: {perusahaan_id} [{status}] {http_status or '-'} {akun or '-'} - {pesan}")
+            return
+        summary = journal.ringkasan()
+        for status in (SUKSES, SUDAH_GC, RETRY, FATAL):
+            print(f"{status}: {summary.get(status, 0)}")
+        print(f"total: {sum(summary.values())}")
+    finally:
+        journal.tutup()
+
+
+if __name__ == "__main__":
+    main()
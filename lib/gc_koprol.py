@@ -1,14 +1,41 @@
 import requests
-import pandas as pd
+import csv
 import time
 import sys
-import json
 import re
-from login import login_with_sso, user_agents
+import queue
+import threading
+from collections import namedtuple
+from login import BASE_URL, login_with_sso, login_session, get_pool, _stop_playwright
+from http_session import HttpResponse, SesiTidakValid, buat_session, ambil_tokens, rekam_cookies
+from session_store import load_session, save_session, invalidate as hapus_sesi_tersimpan
+from gc_metrics import metrics
+from gc_reader import CSV_PATH, REPORT_PATH, sniff_encoding, iter_rows, validate_file, format_koordinat
+from gc_journal import Journal, indeks_lewati, saring_selesai, SUKSES, SUDAH_GC, RETRY, FATAL, DUPLIKAT
+from rate_limiter import get_limiter, save_all as simpan_rate_limiter
 
 
 version = "1.2.4"
 
+URL_GC = f"{BASE_URL}/dirgc"
+URL_KONFIRMASI = f"{BASE_URL}/dirgc/konfirmasi-user"
+
+# Headers tambahan spesifik untuk POST konfirmasi
+POST_HEADERS = {
+    "origin": BASE_URL,
+    "referer": URL_GC
+}
+
+MSG_SUDAH_GC = 'Usaha ini sudah diground check'
+MSG_TOKEN_INVALID = 'Token invalid atau sudah terpakai. Silakan refresh halaman.'
+MSG_SERVER_SIBUK = 'Server sedang sibuk. Silakan coba lagi dalam beberapa detik.'
+
+# Hasil kirim_baris: response terakhir (None jika gagal), sesi yang dipakai,
+# lama tunggu 429 (detik) jika baris dilepas karena rate limit, dan jumlah
+# percobaan POST.
+HasilKirim = namedtuple('HasilKirim', ['response', 'sesi', 'tunggu', 'attempts'])
+
+
 def extract_tokens(page):
     # Tunggu hingga tag meta token CSRF terpasang
     page.wait_for_selector('meta[name="csrf-token"]', state='attached', timeout=10000)
@@ -35,7 +62,7 @@ def extract_tokens(page):
             print("SOLUSI: Pastikan file 'login.py' di laptop ini SUDAH DIPERBARUI")
             print("        agar sama persis dengan yang ada di laptop utama.")
             print("="*50 + "\n")
-        
+
         # Simpan konten halaman untuk debugging jika token tidak ditemukan
         try:
             with open("debug_page_content.html", "w", encoding="utf-8") as f:
@@ -43,33 +70,161 @@ def extract_tokens(page):
             print("Gagal menemukan gc_token. Konten halaman telah disimpan ke debug_page_content.html")
         except Exception as e:
             print(f"Gagal menyimpan debug page: {e}")
-            
+
         raise Exception("Token tidak ditemukan (Cek pesan error di atas)")
-    
+
     return _token, gc_token
 
-def main():
-    # Pengecekan versi
-    try:
-        response = requests.get("https://dev.ketut.web.id/ver.txt", timeout=10)
-        if response.status_code == 200:
-            remote_version = response.text.strip()
-            if remote_version != version:
-                print(f"Versi saat ini: {version}")
-                print(f"Versi terbaru: {remote_version}")
-                print("Gunakan versi terbaru. Silakan unduh dari:")
-                print("https://github.com/ketut/SsscriptGC")
-                time.sleep(5)
-                sys.exit(1)
+
+class SesiAkun:
+    """Sesi login satu akun MatchaPro (browser, halaman /dirgc dan token).
+
+    `interval` adalah jeda awal antar POST (detik) untuk rate limiter akun
+    ini, dipakai jika belum ada laju tersimpan di rate_state.json.
+    """
+
+    # Jika True (flag --pool), login memakai context dari BrowserPool headless
+    # milik thread ini alih-alih meluncurkan browser baru setiap login.
+    pakai_pool = False
+
+    def __init__(self, username, password, interval=10):
+        self.username = username
+        self.password = password
+        self.limiter = get_limiter(username, interval)
+        self.page = None
+        self.browser = None
+        self._token = None
+        self.gc_token = None
+
+    def buka(self):
+        """Login SSO, buka /dirgc dan ekstrak token."""
+        with metrics.timer('login', self.username, mode=type(self).__name__):
+            return self._buka()
+
+    def refresh_tokens(self):
+        with metrics.timer('refresh', self.username):
+            self._refresh_tokens()
+        print(f"[{self.username}] Refreshed _token: {self._token}")
+        print(f"[{self.username}] Refreshed gc_token: {self.gc_token}")
+
+    def _buka(self):
+        if self.pakai_pool:
+            # self.browser berisi context pool; close() hanya menutup context
+            self.page, self.browser = get_pool().login(self.username, self.password, None)
         else:
-            print("Gagal mengambil versi terbaru. Melanjutkan...")
-    except Exception as e:
-        print(f"Gagal mengecek versi: {e}. Melanjutkan...")
+            self.page, self.browser = login_with_sso(self.username, self.password, None)
+        if not self.page:
+            raise Exception(f"Login gagal untuk user {self.username}")
+        self.page.goto(URL_GC)
+        self.page.wait_for_load_state('networkidle')
+        self._token, self.gc_token = extract_tokens(self.page)
+        return self
+
+    def _refresh_tokens(self):
+        self.page.reload()
+        self.page.wait_for_load_state('networkidle')
+        self._token, self.gc_token = extract_tokens(self.page)
+
+    def login_ulang(self):
+        self.tutup()
+        self.buka()
+
+    def post_konfirmasi(self, form_data):
+        # Kirim request menggunakan context browser (cookies & session otomatis terpakai)
+        return self.page.request.post(URL_KONFIRMASI, form=form_data, headers=POST_HEADERS, timeout=30000)
+
+    def tutup(self):
+        try:
+            if self.browser:
+                self.browser.close()
+        except Exception:
+            pass
+
+
+class SesiHttp(SesiAkun):
+    """Sesi tanpa browser: login SSO sekali, lalu browser ditutup dan semua
+    request lewat requests.Session (keep-alive) dengan cookies hasil login.
+
+    Sesi disimpan di sessions.json (session_store), jadi membuka ulang sesi
+    user yang sama (rotasi, restart) cukup memakai cookies tersimpan. Login
+    SSO penuh hanya dilakukan jika server menolak sesi tersebut.
+    """
+
+    def __init__(self, username, password, interval=10):
+        super().__init__(username, password, interval)
+        self.http = None
+        self.user_agent = None
+
+    def _buka(self):
+        cached = load_session(self.username)
+        if cached:
+            try:
+                self._pakai_sesi(cached)
+                print(f"[{self.username}] Memakai sesi tersimpan.")
+                return self
+            except SesiTidakValid as e:
+                print(f"[{self.username}] Sesi tersimpan ditolak server ({e}), login SSO ulang...")
+                self.tutup(simpan=False)
+                hapus_sesi_tersimpan(self.username)
+
+        if self.pakai_pool:
+            result = get_pool().login_session(self.username, self.password, None)
+        else:
+            result = login_session(self.username, self.password, None)
+            # Browser sudah ditutup; hentikan juga driver Playwright thread ini
+            _stop_playwright()
+        if not result:
+            raise Exception(f"Login gagal untuk user {self.username}")
+        self._pakai_sesi(result)
+        save_session(self.username, self._data_sesi())
+        return self
+
+    def _pakai_sesi(self, data):
+        self.user_agent = data.get('user_agent')
+        self.http = buat_session(data)
+        self._token, self.gc_token = ambil_tokens(self.http, URL_GC)
+
+    def _data_sesi(self):
+        return {
+            'cookies': self.http.cookies.get_dict(),
+            'cookie_jar': rekam_cookies(self.http.cookies),
+            'user_agent': self.user_agent,
+            'csrf_token': self._token,
+            'gc_token': self.gc_token,
+        }
+
+    def _refresh_tokens(self):
+        try:
+            self._token, self.gc_token = ambil_tokens(self.http, URL_GC)
+        except SesiTidakValid as e:
+            print(f"[{self.username}] Sesi ditolak saat refresh token ({e}), login SSO ulang...")
+            self.login_ulang()
 
-    # Muat pengguna dari user.txt jika tersedia. Format per baris: username,password ATAU username password ATAU username:password
+    def login_ulang(self):
+        hapus_sesi_tersimpan(self.username)
+        self.tutup(simpan=False)
+        self.buka()
+
+    def post_konfirmasi(self, form_data):
+        return HttpResponse(self.http.post(URL_KONFIRMASI, data=form_data, headers=POST_HEADERS, timeout=30))
+
+    def tutup(self, simpan=True):
+        try:
+            if self.http:
+                # Simpan cookies terbaru (Laravel memperbarui cookie sesi di setiap response)
+                if simpan and self._token:
+                    save_session(self.username, self._data_sesi())
+                self.http.close()
+                self.http = None
+        except Exception:
+            pass
+
+
+def load_users(path='user.txt'):
+    """Muat pengguna dari user.txt. Format per baris: username,password ATAU username password ATAU username:password"""
     users = []
     try:
-        with open('user.txt', 'r', encoding='utf-8') as uf:
+        with open(path, 'r', encoding='utf-8') as uf:
             for ln in uf:
                 ln = ln.strip()
                 if not ln or ln.startswith('#'):
@@ -87,6 +242,383 @@ def main():
                     users.append((creds[0].strip(), creds[1].strip()))
     except FileNotFoundError:
         users = []
+    return users
+
+
+def _is_connection_error(error_message):
+    return (
+        "timed out" in error_message or
+        "timeout" in error_message or
+        "econnreset" in error_message or
+        "connection reset" in error_message or
+        "connection refused" in error_message or
+        "connection aborted" in error_message or
+        "network" in error_message or
+        "socket" in error_message or
+        "target page" in error_message or
+        "has been closed" in error_message
+    )
+
+
+def buat_form(sesi, row):
+    """Form POST konfirmasi untuk satu GcRow dengan token sesi saat ini."""
+    return {
+        "perusahaan_id": row.perusahaan_id,
+        "latitude": format_koordinat(row.latitude),
+        "longitude": format_koordinat(row.longitude),
+        "hasilgc": str(row.hasilgc),
+        "gc_token": sesi.gc_token,
+        "_token": sesi._token
+    }
+
+
+def error_bisa_diulang(response):
+    """True untuk 400 token invalid / 503 server sibuk: baris yang sama dicoba
+    ulang setelah refresh token."""
+    if response.status not in (400, 503):
+        return False
+    try:
+        resp_json = response.json()
+        message = resp_json.get('message', '')
+        expected = MSG_TOKEN_INVALID if response.status == 400 else MSG_SERVER_SIBUK
+        return resp_json.get('status') == 'error' and expected in message
+    except Exception:
+        return False
+
+
+def catat_ke_limiter(sesi, status_code):
+    """Umpan balik limiter untuk response akhir: laju hanya naik untuk 2xx,
+    5xx lain diperlakukan seperti 503 sibuk, 4xx fatal dibiarkan."""
+    if 200 <= status_code < 300:
+        sesi.limiter.on_success()
+    elif status_code >= 500:
+        sesi.limiter.on_busy()
+
+
+def tangani_429(sesi, response):
+    """Catat 429 ke limiter sesi (turunkan laju, mulai cooldown sesuai
+    retry_after) dan kembalikan lama tunggu dalam detik."""
+    try:
+        resp_json = response.json()
+    except Exception as e:
+        print(f"Error processing 429 response: {e}")
+        resp_json = {}
+    message = resp_json.get('message', 'Terlalu banyak permintaan.')
+    wait_time_seconds = round(sesi.limiter.on_rate_limited(resp_json))
+
+    print("\n" + "="*50)
+    print(f"❌ [{sesi.username}] STATUS 429: {message}")
+    print(f"⏳ Menunggu {wait_time_seconds} detik ({wait_time_seconds//60} menit {wait_time_seconds%60} detik)...")
+    print("="*50 + "\n")
+    return wait_time_seconds
+
+
+def kirim_baris(sesi, row, on_429, max_request_retries=5):
+    """Kirim satu baris (lihat _kirim_baris) dan catat event metrics 'row'."""
+    t0 = time.monotonic()
+    hasil = _kirim_baris(sesi, row, on_429, max_request_retries)
+    metrics.catat('row', hasil.sesi.username, baris=row.index, perusahaan_id=row.perusahaan_id,
+                  attempts=hasil.attempts, durasi=round(time.monotonic() - t0, 3),
+                  status=None if hasil.response is None else hasil.response.status,
+                  dilepas=hasil.tunggu is not None)
+    return hasil
+
+
+def _kirim_baris(sesi, row, on_429, max_request_retries=5):
+    """Kirim satu baris (GcRow) ke /dirgc/konfirmasi-user dengan retry.
+
+    Setiap POST menunggu giliran dari rate limiter sesi (sesi.limiter).
+    on_429(sesi, wait_time_seconds) dipanggil saat menerima 429 dan harus
+    mengembalikan sesi untuk mencoba ulang (boleh sesi user lain), atau None
+    untuk melepas baris ini (HasilKirim.tunggu berisi lama tunggu).
+    """
+    index = row.index
+    attempts = 0
+    for request_attempt in range(max_request_retries):
+        try:
+            form_data = buat_form(sesi, row)
+
+            attempts = request_attempt + 1
+            tunggu_limiter = sesi.limiter.acquire()
+            if tunggu_limiter > 0.001:
+                metrics.catat('limiter', sesi.username, durasi=round(tunggu_limiter, 3))
+            t_post = time.monotonic()
+            try:
+                response = sesi.post_konfirmasi(form_data)
+            except Exception as e:
+                metrics.catat('request', sesi.username, baris=index, status=None, attempt=attempts,
+                              latency=round(time.monotonic() - t_post, 3), error=str(e)[:200])
+                raise
+            status_code = response.status
+            metrics.catat('request', sesi.username, baris=index, status=status_code, attempt=attempts,
+                          latency=round(time.monotonic() - t_post, 3))
+
+            # Tangani 429 Terlalu Banyak Permintaan
+            if status_code == 429:
+                wait_time_seconds = tangani_429(sesi, response)
+                sesi_baru = on_429(sesi, wait_time_seconds)
+                if sesi_baru is None:
+                    return HasilKirim(None, sesi, wait_time_seconds, attempts)
+                sesi = sesi_baru
+                if request_attempt < max_request_retries - 1:
+                    continue
+                print(f"Max retries reached untuk baris {index} setelah 429 error")
+                break
+
+            # Periksa apakah ini adalah error yang perlu dicoba ulang pada baris yang sama
+            if error_bisa_diulang(response):
+                if status_code == 503:
+                    # Server sibuk: limiter memperlambat laju dan memberi jeda singkat
+                    sesi.limiter.on_busy()
+                if request_attempt < max_request_retries - 1:
+                    print(f"Token invalid error for row {index} (attempt {request_attempt + 1}/{max_request_retries}). Refreshing tokens...")
+                    try:
+                        sesi.refresh_tokens()
+                    except Exception as token_refresh_error:
+                        print(f"Failed to refresh tokens: {token_refresh_error}")
+                        print("Retrying request without token refresh...")
+                    continue
+                print(f"Token invalid error for row {index}: max retries reached")
+                break
+
+            # Success or other error - exit retry loop
+            catat_ke_limiter(sesi, status_code)
+            print(f"[{sesi.username}] Row {index}: {status_code} - {response.text()}")
+            return HasilKirim(response, sesi, None, attempts)
+
+        except Exception as e:
+            error_message = str(e).lower()
+            if _is_connection_error(error_message):
+                if request_attempt < max_request_retries - 1:
+                    print(f"Connection error untuk row {index} (attempt {request_attempt + 1}/{max_request_retries}): {e}. Retrying in 5 seconds...")
+                    # If browser/page was closed, try to re-login current user before retrying
+                    if "target page" in error_message or "has been closed" in error_message:
+                        try:
+                            print("[INFO] Detected closed page/browser. Re-login current user...")
+                            sesi.login_ulang()
+                            print("[INFO] Re-login berhasil.")
+                        except Exception as err:
+                            print(f"[WARN] Re-login gagal: {err}")
+                    time.sleep(5)
+                    continue
+                print(f"Error during request logging for row {index}: {e} (max retries reached)")
+            else:
+                # Error lain yang tidak bisa di-retry, langsung log dan lanjut
+                print(f"Error during request logging for row {index}: {e}")
+                break
+
+    return HasilKirim(None, sesi, None, attempts)
+
+
+def klasifikasi_hasil(status_code, resp_json):
+    """Status jurnal (sukses/sudah_gc/retry/fatal) untuk response server."""
+    if not isinstance(resp_json, dict):
+        # Bukan JSON: 200 dianggap sukses, error server bisa dicoba lagi
+        if status_code == 200:
+            return SUKSES
+        return RETRY if status_code >= 500 or status_code in (408, 429) else FATAL
+    message = resp_json.get('message', '')
+    if MSG_SUDAH_GC in message:
+        return SUDAH_GC
+    if (status_code >= 500 or status_code in (408, 429) or
+            MSG_TOKEN_INVALID in message or MSG_SERVER_SIBUK in message):
+        return RETRY
+    if resp_json.get('status') == 'error' or status_code != 200:
+        return FATAL
+    return SUKSES
+
+
+def catat_hasil(sesi, row, response, journal):
+    """Perbarui gc_token dari response dan catat hasilnya ke jurnal."""
+    status_code = response.status
+    response_text = response.text()
+    try:
+        resp_json = response.json()
+    except Exception:
+        resp_json = None
+
+    # Perbarui gc_token jika ada (untuk respons yang berhasil)
+    if status_code == 200 and isinstance(resp_json, dict) and 'new_gc_token' in resp_json:
+        sesi.gc_token = resp_json['new_gc_token']
+        print(f"[{sesi.username}] Updated gc_token: {sesi.gc_token}")
+
+    status = klasifikasi_hasil(status_code, resp_json)
+    journal.catat(row.perusahaan_id, status, row.index, status_code, response_text[:1000], sesi.username)
+
+
+class AntreanBaris:
+    """Antrean baris bersama untuk mode paralel.
+
+    Baris baru diisi dari pembaca streaming oleh thread terpisah ke queue
+    berukuran terbatas (memori tidak tumbuh dengan ukuran file). Baris yang
+    dilepas karena 429 masuk antrean ulang dan diambil lebih dulu.
+    """
+
+    def __init__(self, rows, maxsize=1000):
+        self._baru = queue.Queue(maxsize)
+        self._ulang = queue.Queue()
+        self._habis = threading.Event()
+        threading.Thread(target=self._isi, args=(rows,), name="gc-reader", daemon=True).start()
+
+    def _isi(self, rows):
+        try:
+            for row in rows:
+                self._baru.put(row)
+        except Exception as e:
+            print(f"[WARN] Gagal membaca CSV: {e}")
+        finally:
+            self._habis.set()
+
+    def ambil(self):
+        """Baris berikutnya, atau None jika semua baris sudah diambil."""
+        while True:
+            try:
+                return self._ulang.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                return self._baru.get(timeout=0.5)
+            except queue.Empty:
+                if self._habis.is_set() and self._baru.empty() and self._ulang.empty():
+                    return None
+
+    def kembalikan(self, row):
+        self._ulang.put(row)
+
+
+def _worker_akun(kelas_sesi, username, password, antrean, journal, sleep_seconds, login_lock):
+    """Worker satu akun: ambil baris dari antrean bersama, dibatasi rate limiter akun itu."""
+    sesi = kelas_sesi(username, password, sleep_seconds)
+    if kelas_sesi.pakai_pool:
+        get_pool().start()
+    # Login satu per satu agar prompt OTP tidak bertabrakan
+    with login_lock:
+        try:
+            sesi.buka()
+            print(f"[{username}] Login berhasil, worker mulai.")
+        except Exception as e:
+            print(f"[{username}] Login gagal, worker berhenti: {e}")
+            sesi.tutup()
+            return
+
+    try:
+        while True:
+            row = antrean.ambil()
+            if row is None:
+                break
+
+            hasil = kirim_baris(sesi, row, on_429=lambda s, w: None)
+            sesi = hasil.sesi
+            if hasil.tunggu is not None:
+                # Kembalikan baris ke antrean agar diambil akun lain, lalu akun ini istirahat
+                antrean.kembalikan(row)
+                with metrics.timer('backoff_429', username):
+                    sesi.limiter.wait_for_cooldown()
+                try:
+                    sesi.refresh_tokens()
+                except Exception as e:
+                    print(f"[{username}] Gagal refresh token setelah 429: {e}")
+                continue
+
+            if hasil.response is not None:
+                catat_hasil(sesi, row, hasil.response, journal)
+            else:
+                journal.catat(row.perusahaan_id, RETRY, row.index, pesan="Gagal setelah retry", akun=username)
+    finally:
+        sesi.tutup()
+        _stop_playwright()
+        print(f"[{username}] Worker selesai.")
+
+
+def jalankan_paralel(users, rows, journal, sleep_seconds, kelas_sesi=SesiAkun):
+    """Mode paralel: satu worker (thread + sesi) per akun, semua menarik
+    baris (iterable GcRow) dari antrean bersama. Setiap akun punya rate
+    limiter sendiri; semua hasil dicatat ke jurnal yang sama."""
+    print(f"[INFO] Mode paralel: {len(users)} akun.")
+    antrean = AntreanBaris(rows)
+    login_lock = threading.Lock()
+    workers = []
+    for username, password in users:
+        t = threading.Thread(
+            target=_worker_akun,
+            args=(kelas_sesi, username, password, antrean, journal, sleep_seconds, login_lock),
+            name=f"gc-{username}",
+            daemon=True,
+        )
+        t.start()
+        workers.append(t)
+
+    for t in workers:
+        t.join()
+    simpan_rate_limiter()
+
+    if antrean.ambil() is not None:
+        print("[WARN] Masih ada baris yang belum terkirim (semua worker berhenti). Jalankan ulang untuk melanjutkan.")
+    else:
+        print("Semua pengiriman selesai.")
+
+
+def _lewati_baris(index, alasan):
+    print(f"Pemberitahuan: baris {index} dilewati: {alasan}")
+
+
+def _parse_args(argv):
+    """Pisahkan flag (--xxx) dari argumen posisional agar posisi argv lama tetap berlaku."""
+    positional = [a for a in argv if not a.startswith('--')]
+    flags = {a for a in argv if a.startswith('--')}
+    return positional, flags
+
+
+def _flag_value(flags, name, default=None):
+    """Nilai flag berbentuk --nama=nilai."""
+    for flag in flags:
+        if flag.startswith(name + '='):
+            return flag.split('=', 1)[1]
+    return default
+
+
+DRY_RUN_REPORT_PATH = 'laporan_dry_run.csv'
+
+
+def dry_run(rows, lewati, report_path=DRY_RUN_REPORT_PATH):
+    """Tulis rencana kirim/lewati per baris tanpa login atau mengirim apa pun."""
+    kirim = 0
+    with open(report_path, 'w', encoding='utf-8', newline='') as out:
+        writer = csv.writer(out)
+        writer.writerow(['baris', 'perusahaan_id', 'tindakan', 'status'])
+        rows, counter = saring_selesai(
+            rows, lewati, on_skip=lambda row, status: writer.writerow([row.index, row.perusahaan_id, 'lewati', status]))
+        for row in rows:
+            kirim += 1
+            writer.writerow([row.index, row.perusahaan_id, 'kirim', ''])
+    print("\n[DRY-RUN] Rencana pengiriman:")
+    print(f"  akan dikirim : {kirim}")
+    print(f"  dilewati     : {counter['dilewati']}")
+    for status in (SUKSES, SUDAH_GC, FATAL, DUPLIKAT):
+        if counter.get(status):
+            print(f"    - {status}: {counter[status]}")
+    print(f"  detail       : {report_path}")
+
+
+def main():
+    # Pengecekan versi
+    try:
+        response = requests.get("https://dev.ketut.web.id/ver.txt", timeout=10)
+        if response.status_code == 200:
+            remote_version = response.text.strip()
+            if remote_version != version:
+                print(f"Versi saat ini: {version}")
+                print(f"Versi terbaru: {remote_version}")
+                print("Gunakan versi terbaru. Silakan unduh dari:")
+                print("https://github.com/ketut/SsscriptGC")
+                time.sleep(5)
+                sys.exit(1)
+        else:
+            print("Gagal mengambil versi terbaru. Melanjutkan...")
+    except Exception as e:
+        print(f"Gagal mengecek versi: {e}. Melanjutkan...")
+
+    users = load_users()
 
     # Wajibkan user.txt: jika tidak ada pengguna ditemukan, keluar dengan instruksi
     if not users:
@@ -94,428 +626,183 @@ def main():
         print("Contoh:\nuser1,password1\nuser2,password2")
         sys.exit(1)
 
+    # Flag opsional:
+    #   --paralel  satu worker per akun di user.txt
+    #   --http     browser hanya untuk login SSO, POST lewat klien HTTP biasa;
+    #              sesi disimpan di sessions.json sehingga rotasi user tidak perlu login ulang
+    #   --pool     login di browser headless yang dipakai ulang (satu context per login)
+    #   --validasi hanya jalankan validasi CSV dan tulis laporan, tanpa mengirim
+    #   --cache=a.db,b.txt  perusahaan_id terkonfirmasi dari jurnal/daftar batch lain ikut dilewati
+    #   --dry-run  tampilkan berapa baris akan dikirim/dilewati, tanpa login
+    #   --async    semua akun dalam satu event loop asyncio (httpx), lihat gc_koprol_async.py
+    argv, flags = _parse_args(sys.argv)
+    kelas_sesi = SesiHttp if '--http' in flags else SesiAkun
+    SesiAkun.pakai_pool = '--pool' in flags
+
     # nomor_baris dapat diberikan via argv sebagai arg ke-4, jika ada
-    nomor_baris = int(sys.argv[4]) if len(sys.argv) > 4 else None
+    nomor_baris = int(argv[4]) if len(argv) > 4 else None
 
     # Opsional: durasi tidur (detik) sebagai argumen pertama: `python gc_koprol.py 10`
-    # Jika arg pertama adalah angka, gunakan sebagai `sleep_seconds`.
+    # Jika arg pertama adalah angka, gunakan sebagai `sleep_seconds`, yaitu jeda
+    # awal rate limiter per akun (laju tersimpan di rate_state.json diutamakan).
     sleep_seconds = 10
-    if len(sys.argv) > 1:
+    if len(argv) > 1:
         try:
-            maybe = int(sys.argv[1])
+            maybe = int(argv[1])
             sleep_seconds = maybe
         except Exception:
             pass
 
-    # Jika nomor_baris tidak diberikan, baca dari baris.txt
+    # Resume memakai jurnal (perusahaan_id yang sudah selesai dilewati). baris.txt
+    # lama hanya dipakai sebagai titik mulai jika jurnal masih kosong.
+    journal = Journal()
     if nomor_baris is None:
-        try:
-            with open('baris.txt', 'r') as f:
-                nomor_baris = int(f.read().strip())
-        except FileNotFoundError:
-            nomor_baris = 0
-
-    # Lakukan login dan dapatkan objek halaman (mulai dengan user pertama)
+        nomor_baris = 0
+        if journal.kosong():
+            try:
+                with open('baris.txt', 'r') as f:
+                    nomor_baris = int(f.read().strip())
+            except (FileNotFoundError, ValueError):
+                pass
+
+    # Metrics per request/baris ke gc_metrics.jsonl, ringkasan per akun tiap menit
+    metrics.aktifkan()
+    metrics.mulai_laporan(60)
+    try:
+        _kirim_semua(users, flags, kelas_sesi, journal, nomor_baris, sleep_seconds)
+        print(f"[INFO] Ringkasan jurnal: {journal.ringkasan()}")
+    finally:
+        journal.tutup()
+        metrics.cetak_ringkasan()
+        metrics.tutup()
+
+
+def _kirim_semua(users, flags, kelas_sesi, journal, nomor_baris, sleep_seconds):
+    """Validasi CSV lalu kirim semua baris yang belum selesai menurut jurnal."""
+    # Validasi seluruh file di depan: baris bermasalah dicatat ke laporan dan
+    # dilewati saat pengiriman (tidak ada prompt input() di tengah jalan)
+    encoding = sniff_encoding(CSV_PATH)
+    print(f"Berhasil membaca dengan encoding: {encoding}")
+    valid, invalid = validate_file(CSV_PATH, REPORT_PATH, nomor_baris, encoding)
+    print(f"[INFO] Validasi: {valid} baris valid, {invalid} baris tidak valid (mulai baris {nomor_baris}).")
+    if invalid:
+        print(f"[INFO] Baris tidak valid akan dilewati. Detail: {REPORT_PATH}")
+    if '--validasi' in flags:
+        return
+
+    # Pre-filter: perusahaan_id yang sudah sukses/sudah diground check (jurnal ini
+    # atau cache batch lain) dan duplikat di input tidak dikirim lagi
+    cache = _flag_value(flags, '--cache')
+    lewati = indeks_lewati(journal, cache.split(',') if cache else ())
+    print(f"[INFO] {len(lewati)} perusahaan_id sudah selesai/terkonfirmasi dan akan dilewati.")
+    if '--dry-run' in flags:
+        dry_run(iter_rows(CSV_PATH, nomor_baris, encoding), lewati)
+        return
+    rows, counter = saring_selesai(iter_rows(CSV_PATH, nomor_baris, encoding, on_invalid=_lewati_baris), lewati)
+
+    if '--async' in flags:
+        # Diimpor di sini agar httpx hanya dibutuhkan untuk mode ini
+        from gc_koprol_async import jalankan_async
+        jalankan_async(users, rows, journal, sleep_seconds)
+        print(f"[INFO] {counter['dilewati']} baris dilewati karena sudah selesai.")
+        return
+
+    if '--paralel' in flags:
+        jalankan_paralel(users, rows, journal, sleep_seconds, kelas_sesi)
+        print(f"[INFO] {counter['dilewati']} baris dilewati karena sudah selesai.")
+        return
+
+    if SesiAkun.pakai_pool:
+        # Pre-warm browser pool sebelum login pertama
+        get_pool().start()
+
+    # Lakukan login dan dapatkan sesi (mulai dengan user pertama)
     current_user_index = 0
     username, password = users[current_user_index]
-    otp_code = None
     try:
-        page, browser = login_with_sso(username, password, otp_code)
+        sesi = kelas_sesi(username, password, sleep_seconds).buka()
     except Exception as e:
         print(f"Login gagal untuk user {username}: {e}")
         raise
 
-    if page:
-        try:
-            # DEBUG: Cek identitas browser
-            ua = page.evaluate("navigator.userAgent")
-            print(f"\n[INFO] Browser User Agent: {ua}")
-            if "Android" not in ua and "Mobile" not in ua:
-                print("⚠️  WARNING: Script tidak berjalan dalam mode Mobile!")
-                print("    Kemungkinan file 'login.py' belum diupdate di laptop ini.")
-            else:
-                print("[INFO] Mode Mobile aktif. Melanjutkan...\n")
-
-            # Navigasi ke /dirgc
-            url_gc = "https://matchapro.web.bps.go.id/dirgc"
-            page.goto(url_gc)
-            page.wait_for_load_state('networkidle')
-
-            # Ekstrak tokens
-            _token, gc_token = extract_tokens(page)
-            print(f"Ekstrak _token: {_token}")
-            print(f"gc_token: {gc_token}")
+    try:
+        # DEBUG: Cek identitas browser
+        ua = sesi.user_agent if isinstance(sesi, SesiHttp) else sesi.page.evaluate("navigator.userAgent")
+        print(f"\n[INFO] Browser User Agent: {ua}")
+        if "Android" not in ua and "Mobile" not in ua:
+            print("⚠️  WARNING: Script tidak berjalan dalam mode Mobile!")
+            print("    Kemungkinan file 'login.py' belum diupdate di laptop ini.")
+        else:
+            print("[INFO] Mode Mobile aktif. Melanjutkan...\n")
 
-            # Dapatkan cookies
-            cookies = page.context.cookies()
-            session_cookies = {cookie['name']: cookie['value'] for cookie in cookies}
+        print(f"Ekstrak _token: {sesi._token}")
+        print(f"gc_token: {sesi.gc_token}")
 
-            url = "https://matchapro.web.bps.go.id/dirgc/konfirmasi-user"
+        # Loop untuk setiap baris mulai dari nomor_baris
+        # lacak waktu untuk memutar pengguna setiap 4 menit (240 detik)
+        rotate_interval = 4 * 60
+        last_rotate = time.time()
 
-            # Baca CSV
-            encodings_to_try = ['utf-8', 'cp1252', 'latin1']
-            df = None
-            for enc in encodings_to_try:
+        def ganti_user(sesi_lama, alasan):
+            nonlocal current_user_index, last_rotate
+            last_rotate = time.time()
+            indeks_lama = current_user_index
+            # Coba akun lain satu per satu; sesi lama baru ditutup setelah ada
+            # sesi baru yang benar-benar terbuka
+            for _ in range(len(users) - 1):
+                old_index = current_user_index
+                current_user_index = (current_user_index + 1) % len(users)
+                new_username, new_password = users[current_user_index]
+                print(f"\n[INFO] {alasan} — switching user: {old_index} -> {current_user_index} ({new_username})")
+                sesi_baru = kelas_sesi(new_username, new_password, sleep_seconds)
                 try:
-                    df = pd.read_csv('data_gc_profiling_bahan_kirim.csv', encoding=enc)
-                    print(f"Berhasil membaca dengan encoding: {enc}")
-                    break
-                except UnicodeDecodeError:
-                    print(f"Gagal dengan encoding: {enc}, mencoba yang lain...")
+                    sesi_baru.buka()
+                except Exception as e:
+                    print(f"[WARN] Gagal switch user ke {new_username}: {e}")
+                    sesi_baru.tutup()
                     continue
-            if df is None:
-                raise ValueError("Tidak bisa membaca file dengan encoding yang dicoba.")
-
-            headers = {
-                "host": "matchapro.web.bps.go.id",
-                "connection": "keep-alive",
-                "sec-ch-ua": "\"Android WebView\";v=\"143\", \"Chromium\";v=\"143\", \"Not A(Brand\";v=\"24\"",
-                "sec-ch-ua-mobile": "?1",
-                "sec-ch-ua-platform": "\"Android\"",
-                "upgrade-insecure-requests": "1",
-                "user-agent": user_agents,
-                "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
-                "x-requested-with": "com.matchapro.app",
-                "sec-fetch-site": "same-origin",
-                "sec-fetch-mode": "navigate",
-                "sec-fetch-user": "?1",
-                "sec-fetch-dest": "document",
-                "referer": "https://matchapro.web.bps.go.id/",
-                "accept-encoding": "gzip, deflate, br, zstd",
-                "accept-language": "en-GB,en-US;q=0.9,en;q=0.8",
-            }
-
-            # Loop untuk setiap baris mulai dari nomor_baris
-            # lacak waktu untuk memutar pengguna setiap 4 menit (240 detik)
-            rotate_interval = 4 * 60
-            last_rotate = time.time()
+                print(f"[INFO] Switched user, refreshed tokens: {sesi_baru._token} / {sesi_baru.gc_token}")
+                sesi_lama.tutup()
+                return sesi_baru
+            current_user_index = indeks_lama
+            print(f"[WARN] Tidak ada akun lain yang bisa dibuka, tetap memakai {sesi_lama.username}.")
+            return sesi_lama
+
+        def on_429(sesi_429, wait_time_seconds):
+            # Jika multi-pengguna, putar ke pengguna berikutnya segera alih-alih menunggu lama
+            # (limiter user baru yang mengatur jeda)
+            if len(users) > 1:
+                return ganti_user(sesi_429, "429 received")
+            # Pengguna tunggal: tunggu cooldown limiter lalu refresh tokens
+            with metrics.timer('backoff_429', sesi_429.username):
+                sesi_429.limiter.wait_for_cooldown()
+            print("Refreshing tokens setelah menunggu...")
+            sesi_429.refresh_tokens()
+            return sesi_429
+
+        for row in rows:
+            # Putar pengguna jika interval telah berlalu (lakukan ini di antara baris, bukan selama upaya permintaan)
+            if time.time() - last_rotate >= rotate_interval and len(users) > 1:
+                sesi = ganti_user(sesi, "Rotating user")
+
+            hasil = kirim_baris(sesi, row, on_429)
+            sesi = hasil.sesi
+
+            # Catat hasil ke jurnal (gagal setelah retry dicoba lagi saat resume)
+            if hasil.response is not None:
+                catat_hasil(sesi, row, hasil.response, journal)
+            else:
+                journal.catat(row.perusahaan_id, RETRY, row.index, pesan="Gagal setelah retry", akun=sesi.username)
 
-            for index in range(nomor_baris, len(df)):
-                row = df.iloc[index]
-                perusahaan_id = row['perusahaan_id']
-                latitude = row['latitude']
-                longitude = row['longitude']
-                hasilgc = row['hasilgc']
-                
-                # Pengecekan hasilgc
-                if hasilgc is None or str(hasilgc).strip() == '' or hasilgc not in [99, 1, 3, 4]:
-                    print(f"Pemberitahuan: hasilgc untuk baris {index} kosong atau tidak valid ({hasilgc}). Nilai yang diperbolehkan: 99, 1, 3, atau 4.")
-                    choice = input("Apakah Anda ingin berhenti (y) atau lanjut ke baris berikutnya (n)? ").strip().lower()
-                    if choice == 'y':
-                        print("Proses dihentikan.")
-                        sys.exit(0)
-                    elif choice == 'n':
-                        print("Melanjutkan ke baris berikutnya.")
-                        continue
-                    else:
-                        print("Input tidak valid. Melanjutkan ke baris berikutnya.")
-                        continue
-                
-                # Pengecekan tambahan: jika hasilgc = 1, latitude dan longitude harus ada
-                if hasilgc == 1:
-                    if pd.isna(latitude) or str(latitude).strip() == '' or pd.isna(longitude) or str(longitude).strip() == '':
-                        print(f"Pemberitahuan: Untuk hasilgc=1 pada baris {index}, latitude dan longitude harus diisi. Latitude: {latitude}, Longitude: {longitude}.")
-                        choice = input("Apakah Anda ingin berhenti (y) atau lanjut ke baris berikutnya (n)? ").strip().lower()
-                        if choice == 'y':
-                            print("Proses dihentikan.")
-                            sys.exit(0)
-                        elif choice == 'n':
-                            print("Melanjutkan ke baris berikutnya.")
-                            continue
-                        else:
-                            print("Input tidak valid. Melanjutkan ke baris berikutnya.")
-                            continue
-
-                # Putar pengguna jika interval telah berlalu (lakukan ini di antara baris, bukan selama upaya permintaan)
-                try:
-                    if time.time() - last_rotate >= rotate_interval and len(users) > 1:
-                        old_index = current_user_index
-                        current_user_index = (current_user_index + 1) % len(users)
-                        new_username, new_password = users[current_user_index]
-                        print(f"\n[INFO] Rotating user: {old_index} -> {current_user_index} ({new_username})")
-                        try:
-                            # close old browser and login as new user
-                            try:
-                                browser.close()
-                            except Exception:
-                                pass
-                            page, browser = login_with_sso(new_username, new_password, None)
-                            page.goto(url_gc)
-                            page.wait_for_load_state('networkidle')
-                            _token, gc_token = extract_tokens(page)
-                            print(f"[INFO] Switched user, refreshed tokens: {_token} / {gc_token}")
-                        except Exception as e:
-                            print(f"[WARN] Gagal switch user ke {new_username}: {e}")
-                        last_rotate = time.time()
-                except Exception:
-                    pass
-                
-                # Gunakan Playwright API Request untuk mengirim data (lebih aman dari blokir)
-                max_request_retries = 5
-                request_success = False
-                
-                for request_attempt in range(max_request_retries):
-                    try:
-                        form_data = {
-                            "perusahaan_id": str(perusahaan_id),
-                            "latitude": str(latitude),
-                            "longitude": str(longitude),
-                            "hasilgc": str(hasilgc),
-                            "gc_token": gc_token,
-                            "_token": _token
-                        }
-                        
-                        # Headers tambahan spesifik untuk POST ini
-                        post_headers = {
-                            "origin": "https://matchapro.web.bps.go.id",
-                            "referer": "https://matchapro.web.bps.go.id/dirgc"
-                        }
-
-                        # Kirim request menggunakan context browser (cookies & session otomatis terpakai)
-                        response = page.request.post(url, form=form_data, headers=post_headers, timeout=30000)
-                        
-                        status_code = response.status
-                        response_text = response.text()
-                        
-                        # Tangani 429 Terlalu Banyak Permintaan
-                        if status_code == 429:
-                            try:
-                                resp_json = response.json()
-                                message = resp_json.get('message', 'Terlalu banyak permintaan.')
-                                retry_after = resp_json.get('retry_after', 600)  # default 10 menit
-                                
-                                print("\n" + "="*50)
-                                print(f"❌ STATUS 429: {message}")
-                                print("="*50)
-                                
-                                # Parse waktu dari message jika ada (contoh: "10 menit")
-                                wait_time_seconds = retry_after
-                                
-                                # Coba ekstrak waktu dari message
-                                import re
-                                time_match = re.search(r'(\d+)\s*(menit|detik|jam)', message.lower())
-                                if time_match:
-                                    time_value = int(time_match.group(1))
-                                    time_unit = time_match.group(2)
-                                    
-                                    if time_unit == 'menit':
-                                        wait_time_seconds = time_value * 60
-                                    elif time_unit == 'detik':
-                                        wait_time_seconds = time_value
-                                    elif time_unit == 'jam':
-                                        wait_time_seconds = time_value * 3600
-                                
-                                # Tambahkan 10 detik sebagai buffer
-                                wait_time_seconds += 10
-
-                                print(f"⏳ Menunggu {wait_time_seconds} detik ({wait_time_seconds//60} menit {wait_time_seconds%60} detik)...")
-                                print("="*50 + "\n")
-
-                                # Jika multi-pengguna, putar ke pengguna berikutnya segera alih-alih menunggu lama
-                                if len(users) > 1:
-                                    try:
-                                        old_index = current_user_index
-                                        current_user_index = (current_user_index + 1) % len(users)
-                                        new_username, new_password = users[current_user_index]
-                                        print(f"[INFO] 429 received — switching user: {old_index} -> {current_user_index} ({new_username})")
-                                        try:
-                                            try:
-                                                browser.close()
-                                            except Exception:
-                                                pass
-                                            page, browser = login_with_sso(new_username, new_password, None)
-                                            page.goto(url_gc)
-                                            page.wait_for_load_state('networkidle')
-                                            _token, gc_token = extract_tokens(page)
-                                            print(f"[INFO] Switched user after 429, refreshed tokens: {_token} / {gc_token}")
-                                        except Exception as e:
-                                            print(f"[WARN] Gagal switch user setelah 429: {e}")
-                                        last_rotate = time.time()
-                                        # jeda singkat sebelum mencoba ulang dengan pengguna baru
-                                        time.sleep(5)
-                                        if request_attempt < max_request_retries - 1:
-                                            continue
-                                        else:
-                                            print(f"Max retries reached untuk baris {index} setelah 429 error")
-                                            break
-                                    except Exception as e:
-                                        print(f"Error saat mencoba switch user setelah 429: {e}")
-                                        # fallback ke menunggu jika switch gagal
-                                        time.sleep(wait_time_seconds)
-                                else:
-                                    # Pengguna tunggal: tunggu durasi penuh
-                                    time.sleep(wait_time_seconds)
-                                    # Refresh tokens setelah menunggu
-                                    print("Refreshing tokens setelah menunggu...")
-                                    page.reload()
-                                    page.wait_for_load_state('networkidle')
-                                    _token, gc_token = extract_tokens(page)
-                                    print(f"Refreshed _token: {_token}")
-                                    print(f"Refreshed gc_token: {gc_token}")
-                                    # Retry request yang sama
-                                    if request_attempt < max_request_retries - 1:
-                                        time.sleep(5)
-                                        continue
-                                    else:
-                                        print(f"Max retries reached untuk baris {index} setelah 429 error")
-                                        break
-                            except Exception as e:
-                                print(f"Error processing 429 response: {e}")
-                                print("Menunggu 10 menit sebagai fallback...")
-                                time.sleep(610)  # 10 menit + 10 detik
-                                continue
-                        
-                        # Periksa apakah ini adalah error yang perlu dicoba ulang pada baris yang sama
-                        is_retryable_error = False
-                        if status_code == 400:
-                            try:
-                                resp_json = response.json()
-                                message = resp_json.get('message', '')
-                                if (resp_json.get('status') == 'error' and 
-                                    'Token invalid atau sudah terpakai. Silakan refresh halaman.' in message):
-                                    is_retryable_error = True
-                            except Exception:
-                                pass
-                        elif status_code == 503:
-                            try:
-                                resp_json = response.json()
-                                message = resp_json.get('message', '')
-                                if (resp_json.get('status') == 'error' and 
-                                    'Server sedang sibuk. Silakan coba lagi dalam beberapa detik.' in message):
-                                    is_retryable_error = True
-                            except Exception:
-                                pass
-                        
-                        if is_retryable_error:
-                            if request_attempt < max_request_retries - 1:
-                                print(f"Token invalid error for row {index} (attempt {request_attempt + 1}/{max_request_retries}). Refreshing tokens...")
-                                # Refresh tokens
-                                try:
-                                    page.reload()
-                                    page.wait_for_load_state('networkidle')
-                                    _token, gc_token = extract_tokens(page)
-                                    print(f"Refreshed _token: {_token}")
-                                    print(f"Refreshed gc_token: {gc_token}")
-                                    time.sleep(5)  # Brief pause before retry
-                                    continue  # Retry the request with new tokens
-                                except Exception as token_refresh_error:
-                                    print(f"Failed to refresh tokens: {token_refresh_error}")
-                                    if request_attempt < max_request_retries - 1:
-                                        print("Retrying request without token refresh...")
-                                        time.sleep(5)
-                                        continue
-                                    else:
-                                        print(f"Max retries reached for row {index} after token refresh failure")
-                                        break
-                            else:
-                                print(f"Token invalid error for row {index}: max retries reached")
-                                break
-                        else:
-                            # Success or other error - exit retry loop
-                            print(f"Row {index}: {status_code} - {response_text}")
-                            request_success = True
-                            break
-                        
-                    except Exception as e:
-                        error_message = str(e).lower()
-                        is_retryable_error = (
-                            "timed out" in error_message or 
-                            "timeout" in error_message or
-                            "econnreset" in error_message or
-                            "connection reset" in error_message or
-                            "connection refused" in error_message or
-                            "connection aborted" in error_message or
-                            "network" in error_message or
-                            "socket" in error_message or
-                            "target page" in error_message or
-                            "has been closed" in error_message
-                        )
-                        
-                        if is_retryable_error:
-                            if request_attempt < max_request_retries - 1:
-                                print(f"Connection error untuk row {index} (attempt {request_attempt + 1}/{max_request_retries}): {e}. Retrying in 5 seconds...")
-                                # If browser/page was closed, try to re-login current user before retrying
-                                if "target page" in error_message or "has been closed" in error_message:
-                                    try:
-                                        print("[INFO] Detected closed page/browser. Re-login current user...")
-                                        uname, pwd = users[current_user_index]
-                                        try:
-                                            browser.close()
-                                        except Exception:
-                                            pass
-                                        page, browser = login_with_sso(uname, pwd, None)
-                                        page.goto(url_gc)
-                                        page.wait_for_load_state('networkidle')
-                                        _token, gc_token = extract_tokens(page)
-                                        print("[INFO] Re-login berhasil.")
-                                    except Exception as re:
-                                        print(f"[WARN] Re-login gagal: {re}")
-                                time.sleep(5)
-                                continue
-                            else:
-                                print(f"Error during request logging for row {index}: {e} (max retries reached)")
-                        else:
-                            # Error lain yang tidak bisa di-retry, langsung log dan lanjut
-                            print(f"Error during request logging for row {index}: {e}")
-                            break
-                
-                # Jika request berhasil, lanjutkan dengan pemrosesan response
-                if request_success:
-                    # Catat baris terakhir
-                    try:
-                        with open('baris.txt', 'w') as f:
-                            f.write(str(index))
-                    except PermissionError:
-                        print(f"Warning: Tidak bisa menulis ke baris.txt untuk baris {index}")
-                    
-                    # Perbarui gc_token jika ada (untuk respons yang berhasil)
-                    if status_code == 200:
-                        try:
-                            resp_json = response.json()
-                            if 'new_gc_token' in resp_json:
-                                gc_token = resp_json['new_gc_token']
-                                print(f"Updated gc_token: {gc_token}")
-                        except Exception:
-                            pass
-                    
-                    # Cek error untuk logging (hanya untuk response yang bukan token error)
-                    try:
-                        resp_json = response.json()
-                        if resp_json.get('status') == 'error':
-                            message = resp_json.get('message', '')
-                            if ('Usaha ini sudah diground check' not in message and
-                                'Token invalid atau sudah terpakai. Silakan refresh halaman.' not in message and
-                                'Server sedang sibuk. Silakan coba lagi dalam beberapa detik.' not in message):
-                                try:
-                                    with open('error.txt', 'a') as f:
-                                        f.write(f"Row {index}: {response_text}\n")
-                                except Exception as e:
-                                    print(f"Warning: Tidak bisa menulis ke error.txt untuk baris {index}: {e}")
-                    except Exception:
-                        # Jika bukan JSON atau status bukan 200, catat jika bukan token error
-                        if status_code != 200:
-                            try:
-                                with open('error.txt', 'a') as f:
-                                    f.write(f"Row {index}: Status {status_code} - {response_text}\n")
-                            except Exception as e:
-                                print(f"Warning: Tidak bisa menulis ke error.txt untuk baris {index}: {e}")
-                
-                # Delay untuk menghindari rate limit
-                time.sleep(sleep_seconds)
-
-            print("Semua pengiriman selesai.")
+        print(f"[INFO] {counter['dilewati']} baris dilewati karena sudah selesai.")
+        print("Semua pengiriman selesai.")
 
-        except Exception as e:
-            print(f"Error: {e}")
-        finally:
-            # Tutup browser
-            browser.close()
-    else:
-        print("Login gagal, tidak dapat melanjutkan permintaan.")
+    except Exception as e:
+        print(f"Error: {e}")
+    finally:
+        # Tutup browser
+        sesi.tutup()
+        simpan_rate_limiter()
 
 if __name__ == "__main__":
     main()
-
-
-
-
@@ -0,0 +1,315 @@
+"""Jalur asyncio untuk pengiriman GC: semua akun dalam satu event loop.
+
+Setiap akun adalah satu coroutine dengan httpx.AsyncClient sendiri (cookies
+hasil login SSO, sama seperti mode --http). Selama satu akun menunggu
+response server, cooldown 429 atau giliran rate limiter, akun lain tetap
+berjalan, jadi satu proses bisa mendorong semua akun di batas laju server
+tanpa thread per akun dan hampir tanpa CPU.
+
+Login SSO tetap memakai Playwright sync di thread terpisah
+(asyncio.to_thread), satu akun per waktu agar prompt OTP tidak
+bertabrakan; sesi tersimpan di sessions.json dipakai lebih dulu.
+
+CLI sama dengan gc_koprol.py (argv[1] jeda detik, argv[4] baris mulai,
+flag --validasi/--cache/--dry-run tetap berlaku):
+    python gc_koprol_async.py 10
+    python gc_koprol_async.py 10 x x 1200
+"""
+
+import asyncio
+import sys
+import time
+from collections import deque
+
+import httpx
+
+from login import login_session, _stop_playwright
+from http_session import MOBILE_HEADERS, HttpResponse, SesiTidakValid, parse_tokens, cookie_records, rekam_cookies
+from session_store import load_session, save_session, invalidate as hapus_sesi_tersimpan
+from gc_metrics import metrics
+from gc_journal import RETRY
+from rate_limiter import get_limiter, save_all as simpan_rate_limiter
+import gc_koprol
+from gc_koprol import (URL_GC, URL_KONFIRMASI, POST_HEADERS, HasilKirim, buat_form,
+                       catat_ke_limiter, error_bisa_diulang, tangani_429, catat_hasil,
+                       _is_connection_error)
+
+
+class SesiAsync:
+    """Sesi satu akun di atas httpx.AsyncClient (antarmuka sama dengan SesiHttp)."""
+
+    def __init__(self, username, password, interval=10):
+        self.username = username
+        self.password = password
+        self.limiter = get_limiter(username, interval)
+        self.http = None
+        self.user_agent = None
+        self._token = None
+        self.gc_token = None
+
+    async def buka(self, login_lock):
+        with metrics.timer('login', self.username, mode=type(self).__name__):
+            cached = load_session(self.username)
+            if cached:
+                try:
+                    await self._pakai_sesi(cached)
+                    print(f"[{self.username}] Memakai sesi tersimpan.")
+                    return self
+                except SesiTidakValid as e:
+                    print(f"[{self.username}] Sesi tersimpan ditolak server ({e}), login SSO ulang...")
+                    await self.tutup(simpan=False)
+                    hapus_sesi_tersimpan(self.username)
+
+            async with login_lock:
+                result = await asyncio.to_thread(_login_blocking, self.username, self.password)
+            if not result:
+                raise Exception(f"Login gagal untuk user {self.username}")
+            await self._pakai_sesi(result)
+            save_session(self.username, self._data_sesi())
+            return self
+
+    async def _pakai_sesi(self, data):
+        self.user_agent = data.get('user_agent')
+        headers = dict(MOBILE_HEADERS)
+        if self.user_agent:
+            headers["user-agent"] = self.user_agent
+        # Dengan domain/path asli, seperti http_session.buat_session, agar
+        # cookie yang diterbitkan ulang server menimpa yang lama
+        cookies = httpx.Cookies()
+        for c in cookie_records(data):
+            cookies.set(c['name'], c['value'], domain=c.get('domain') or '', path=c.get('path') or '/')
+        self.http = httpx.AsyncClient(
+            headers=headers,
+            cookies=cookies,
+            follow_redirects=True,
+            timeout=30,
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+        )
+        self._token, self.gc_token = await self._ambil_tokens()
+
+    async def _ambil_tokens(self):
+        response = await self.http.get(URL_GC)
+        if response.status_code != 200 or "/login" in str(response.url):
+            raise SesiTidakValid(f"Sesi tidak valid saat refresh token (status {response.status_code}, url {response.url})")
+        return parse_tokens(response.text)
+
+    def _data_sesi(self):
+        return {
+            'cookies': {c.name: c.value for c in self.http.cookies.jar},
+            'cookie_jar': rekam_cookies(self.http.cookies.jar),
+            'user_agent': self.user_agent,
+            'csrf_token': self._token,
+            'gc_token': self.gc_token,
+        }
+
+    async def refresh_tokens(self, login_lock):
+        with metrics.timer('refresh', self.username):
+            try:
+                self._token, self.gc_token = await self._ambil_tokens()
+            except SesiTidakValid as e:
+                print(f"[{self.username}] Sesi ditolak saat refresh token ({e}), login SSO ulang...")
+                hapus_sesi_tersimpan(self.username)
+                await self.tutup(simpan=False)
+                await self.buka(login_lock)
+        print(f"[{self.username}] Refreshed _token: {self._token}")
+        print(f"[{self.username}] Refreshed gc_token: {self.gc_token}")
+
+    async def post_konfirmasi(self, form_data):
+        return HttpResponse(await self.http.post(URL_KONFIRMASI, data=form_data, headers=POST_HEADERS))
+
+    async def tutup(self, simpan=True):
+        try:
+            if self.http:
+                if simpan and self._token:
+                    save_session(self.username, self._data_sesi())
+                await self.http.aclose()
+                self.http = None
+        except Exception:
+            pass
+
+
+def _login_blocking(username, password):
+    """Login SSO di thread executor, lalu hentikan Playwright thread itu."""
+    try:
+        return login_session(username, password, None)
+    finally:
+        _stop_playwright()
+
+
+async def kirim_baris(sesi, row, login_lock, max_request_retries=5):
+    """Versi async gc_koprol.kirim_baris. 429 tidak ditunggu di sini: baris
+    dilepas (HasilKirim.tunggu terisi) agar worker mengembalikannya ke antrean."""
+    t0 = time.monotonic()
+    hasil = await _kirim_baris(sesi, row, login_lock, max_request_retries)
+    metrics.catat('row', sesi.username, baris=row.index, perusahaan_id=row.perusahaan_id,
+                  attempts=hasil.attempts, durasi=round(time.monotonic() - t0, 3),
+                  status=None if hasil.response is None else hasil.response.status,
+                  dilepas=hasil.tunggu is not None)
+    return hasil
+
+
+async def _kirim_baris(sesi, row, login_lock, max_request_retries):
+    index = row.index
+    attempts = 0
+    for request_attempt in range(max_request_retries):
+        attempts = request_attempt + 1
+        try:
+            tunggu_limiter = await sesi.limiter.acquire_async()
+            if tunggu_limiter > 0.001:
+                metrics.catat('limiter', sesi.username, durasi=round(tunggu_limiter, 3))
+            t_post = time.monotonic()
+            try:
+                response = await sesi.post_konfirmasi(buat_form(sesi, row))
+            except Exception as e:
+                metrics.catat('request', sesi.username, baris=index, status=None, attempt=attempts,
+                              latency=round(time.monotonic() - t_post, 3), error=str(e)[:200])
+                raise
+            metrics.catat('request', sesi.username, baris=index, status=response.status, attempt=attempts,
+                          latency=round(time.monotonic() - t_post, 3))
+
+            if response.status == 429:
+                return HasilKirim(None, sesi, tangani_429(sesi, response), attempts)
+
+            if error_bisa_diulang(response):
+                if response.status == 503:
+                    sesi.limiter.on_busy()
+                if request_attempt < max_request_retries - 1:
+                    print(f"Token invalid error for row {index} (attempt {attempts}/{max_request_retries}). Refreshing tokens...")
+                    try:
+                        await sesi.refresh_tokens(login_lock)
+                    except Exception as token_refresh_error:
+                        print(f"Failed to refresh tokens: {token_refresh_error}")
+                    continue
+                print(f"Token invalid error for row {index}: max retries reached")
+                break
+
+            catat_ke_limiter(sesi, response.status)
+            print(f"[{sesi.username}] Row {index}: {response.status} - {response.text()}")
+            return HasilKirim(response, sesi, None, attempts)
+
+        except Exception as e:
+            # httpx.TimeoutException dkk. sering punya pesan kosong; pakai nama kelasnya
+            error_message = f"{type(e).__name__} {e}".lower()
+            if isinstance(e, httpx.TransportError) or _is_connection_error(error_message):
+                if request_attempt < max_request_retries - 1:
+                    print(f"Connection error untuk row {index} (attempt {attempts}/{max_request_retries}): {e!r}. Retrying in 5 seconds...")
+                    await asyncio.sleep(5)
+                    continue
+                print(f"Error during request logging for row {index}: {e!r} (max retries reached)")
+            else:
+                print(f"Error during request logging for row {index}: {e!r}")
+                break
+
+    return HasilKirim(None, sesi, None, attempts)
+
+
+class AntreanAsync:
+    """Padanan gc_koprol.AntreanBaris untuk satu event loop: queue baru
+    berukuran terbatas diisi coroutine pembaca, baris yang dilepas karena
+    429 diambil lebih dulu."""
+
+    def __init__(self, maxsize=1000):
+        self._baru = asyncio.Queue(maxsize)
+        self._ulang = deque()
+        self._habis = False
+
+    async def isi(self, rows):
+        try:
+            for row in rows:
+                await self._baru.put(row)
+        except Exception as e:
+            print(f"[WARN] Gagal membaca CSV: {e}")
+        finally:
+            self._habis = True
+
+    async def ambil(self):
+        """Baris berikutnya, atau None jika semua baris sudah diambil."""
+        while True:
+            if self._ulang:
+                return self._ulang.popleft()
+            try:
+                return await asyncio.wait_for(self._baru.get(), timeout=0.5)
+            except asyncio.TimeoutError:
+                if self._habis and self._baru.empty() and not self._ulang:
+                    return None
+
+    def kembalikan(self, row):
+        self._ulang.append(row)
+
+    def sisa(self):
+        return bool(self._ulang) or not self._baru.empty()
+
+
+async def _worker_akun(username, password, antrean, journal, sleep_seconds, login_lock):
+    sesi = SesiAsync(username, password, sleep_seconds)
+    try:
+        await sesi.buka(login_lock)
+        print(f"[{username}] Login berhasil, worker mulai.")
+    except Exception as e:
+        print(f"[{username}] Login gagal, worker berhenti: {e}")
+        await sesi.tutup(simpan=False)
+        return
+
+    try:
+        while True:
+            row = await antrean.ambil()
+            if row is None:
+                break
+
+            hasil = await kirim_baris(sesi, row, login_lock)
+            if hasil.tunggu is not None:
+                # Baris diambil akun lain selama akun ini menunggu cooldown
+                antrean.kembalikan(row)
+                with metrics.timer('backoff_429', username):
+                    await sesi.limiter.wait_for_cooldown_async()
+                try:
+                    await sesi.refresh_tokens(login_lock)
+                except Exception as e:
+                    print(f"[{username}] Gagal refresh token setelah 429: {e}")
+                continue
+
+            if hasil.response is not None:
+                catat_hasil(sesi, row, hasil.response, journal)
+            else:
+                journal.catat(row.perusahaan_id, RETRY, row.index, pesan="Gagal setelah retry", akun=username)
+    finally:
+        await sesi.tutup()
+        print(f"[{username}] Worker selesai.")
+
+
+async def _jalankan(users, rows, journal, sleep_seconds):
+    antrean = AntreanAsync()
+    login_lock = asyncio.Lock()
+    pembaca = asyncio.create_task(antrean.isi(rows))
+    try:
+        await asyncio.gather(*(
+            _worker_akun(username, password, antrean, journal, sleep_seconds, login_lock)
+            for username, password in users
+        ))
+    finally:
+        pembaca.cancel()
+    return antrean.sisa()
+
+
+def jalankan_async(users, rows, journal, sleep_seconds):
+    """Kirim semua baris (iterable GcRow) dengan satu coroutine per akun."""
+    print(f"[INFO] Mode asyncio: {len(users)} akun dalam satu event loop.")
+    try:
+        tersisa = asyncio.run(_jalankan(users, rows, journal, sleep_seconds))
+    finally:
+        simpan_rate_limiter()
+    if tersisa:
+        print("[WARN] Masih ada baris yang belum terkirim (semua worker berhenti). Jalankan ulang untuk melanjutkan.")
+    else:
+        print("Semua pengiriman selesai.")
+
+
+def main():
+    # Semua persiapan (cek versi, user.txt, jurnal, validasi, --cache, metrics)
+    # sama dengan gc_koprol.py; flag --async memilih jalankan_async()
+    sys.argv.append('--async')
+    gc_koprol.main()
+
+
+if __name__ == "__main__":
+    main()
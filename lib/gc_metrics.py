@@ -0,0 +1,171 @@
+"""Instrumentasi pengiriman GC: event JSON lines + ringkasan per akun.
+
+Event yang dicatat (satu objek JSON per baris di file metrics):
+    request      satu POST: akun, baris, status, latency, attempt
+    row          satu baris selesai diproses: akun, baris, attempts, hasil
+    limiter      lama menunggu giliran rate limiter (jeda kita sendiri)
+    backoff_429  lama menunggu cooldown setelah 429
+    refresh      lama refresh token
+    login        lama login (termasuk SSO) per akun
+    login_sso    lama alur SSO di login.py
+
+Ringkasan per akun: baris/menit, p50/p95 latency POST, persentase 429 dan
+total waktu login/refresh/backoff/limiter, untuk membedakan lambat karena
+server, SSO atau jeda kita sendiri.
+
+Ringkas file metrics dari run sebelumnya:
+    python gc_metrics.py gc_metrics.jsonl
+"""
+
+import json
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+METRICS_PATH = 'gc_metrics.jsonl'
+# Jumlah sampel latency terakhir per akun untuk p50/p95
+LATENCY_WINDOW = 2000
+
+_DURASI_EVENTS = ('login', 'refresh', 'backoff_429', 'limiter')
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+class _Akun:
+    def __init__(self, now):
+        self.mulai = now
+        self.terakhir = now
+        self.rows = 0
+        self.requests = 0
+        self.rate_limited = 0
+        self.latency = deque(maxlen=LATENCY_WINDOW)
+        self.durasi = dict.fromkeys(_DURASI_EVENTS, 0.0)
+
+
+class Metrics:
+    """Pencatat metrics thread-safe. Tanpa aktifkan() hanya agregat di memori."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._file = None
+        self._akun = {}
+        self._reporter = None
+        self._stop = threading.Event()
+
+    def aktifkan(self, path=METRICS_PATH):
+        """Mulai menulis event ke file JSON lines (append)."""
+        with self._lock:
+            if self._file is None:
+                self._file = open(path, 'a', encoding='utf-8')
+
+    def catat(self, event, akun=None, ts=None, **fields):
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            self._update(event, akun or '-', ts, fields)
+            if self._file is not None:
+                record = {'ts': round(ts, 3), 'event': event, 'akun': akun}
+                record.update(fields)
+                self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def _update(self, event, akun, ts, fields):
+        stats = self._akun.get(akun)
+        if stats is None:
+            stats = self._akun[akun] = _Akun(ts)
+        stats.terakhir = max(stats.terakhir, ts)
+        if event == 'request':
+            stats.requests += 1
+            if fields.get('status') == 429:
+                stats.rate_limited += 1
+            if fields.get('latency') is not None:
+                stats.latency.append(fields['latency'])
+        elif event == 'row':
+            stats.rows += 1
+        elif event in stats.durasi:
+            stats.durasi[event] += fields.get('durasi', 0.0)
+
+    @contextmanager
+    def timer(self, event, akun=None, **fields):
+        """Catat event dengan field durasi (detik) selama blok berjalan."""
+        t0 = time.monotonic()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.catat(event, akun, durasi=round(time.monotonic() - t0, 3), ok=ok, **fields)
+
+    def ringkasan(self):
+        """Dict akun -> ringkasan angka."""
+        with self._lock:
+            hasil = {}
+            for akun, s in self._akun.items():
+                menit = max((s.terakhir - s.mulai) / 60, 1 / 60)
+                p50 = _percentile(s.latency, 50)
+                p95 = _percentile(s.latency, 95)
+                hasil[akun] = {
+                    'rows': s.rows,
+                    'rows_per_menit': round(s.rows / menit, 2),
+                    'requests': s.requests,
+                    'p50_ms': None if p50 is None else round(p50 * 1000),
+                    'p95_ms': None if p95 is None else round(p95 * 1000),
+                    'rate_429_pct': round(100 * s.rate_limited / s.requests, 2) if s.requests else 0.0,
+                    **{f'{k}_detik': round(v, 1) for k, v in s.durasi.items()},
+                }
+            return hasil
+
+    def cetak_ringkasan(self):
+        for akun, r in sorted(self.ringkasan().items()):
+            if akun == '-' and not r['requests']:
+                continue
+            print(f"[METRICS] {akun}: {r['rows']} baris ({r['rows_per_menit']} /menit), "
+                  f"p50 {r['p50_ms']} ms, p95 {r['p95_ms']} ms, 429 {r['rate_429_pct']}%, "
+                  f"login {r['login_detik']}s, refresh {r['refresh_detik']}s, "
+                  f"backoff {r['backoff_429_detik']}s, limiter {r['limiter_detik']}s")
+
+    def mulai_laporan(self, interval=60):
+        """Cetak ringkasan setiap `interval` detik di thread latar."""
+        def loop():
+            while not self._stop.wait(interval):
+                self.cetak_ringkasan()
+
+        if self._reporter is None:
+            self._reporter = threading.Thread(target=loop, name="gc-metrics", daemon=True)
+            self._reporter.start()
+
+    def tutup(self):
+        self._stop.set()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+# Instance bersama untuk gc_koprol.py dan login.py
+metrics = Metrics()
+
+
+def ringkas_file(path=METRICS_PATH):
+    """Bangun ulang ringkasan dari file JSON lines."""
+    m = Metrics()
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            event = record.pop('event')
+            akun = record.pop('akun', None)
+            ts = record.pop('ts', None)
+            m.catat(event, akun, ts=ts, **record)
+    return m
+
+
+if __name__ == "__main__":
+    ringkas_file(sys.argv[1] if len(sys.argv) > 1 else METRICS_PATH).cetak_ringkasan()
@@ -0,0 +1,136 @@
+"""Pembaca streaming untuk data_gc_profiling_bahan_kirim.csv.
+
+Encoding dideteksi sekali, lalu baris dibaca satu per satu dengan modul csv
+dan diubah menjadi GcRow (namedtuple kecil bertipe), sehingga memori tidak
+bertambah seiring ukuran file. validate_file() menjalankan pemeriksaan yang
+sama di depan dan menulis laporan semua baris bermasalah, jadi pengiriman
+tidak pernah berhenti di tengah jalan menunggu input().
+"""
+
+import codecs
+import csv
+from collections import namedtuple
+
+CSV_PATH = 'data_gc_profiling_bahan_kirim.csv'
+REPORT_PATH = 'laporan_validasi.csv'
+
+ENCODINGS = ('utf-8-sig', 'cp1252', 'latin1')
+HASILGC_VALID = (99, 1, 3, 4)
+
+# index = nomor baris data (0-based, sama dengan index DataFrame lama)
+GcRow = namedtuple('GcRow', ['index', 'perusahaan_id', 'latitude', 'longitude', 'hasilgc'])
+
+
+def sniff_encoding(path, encodings=ENCODINGS, chunk_size=1 << 20):
+    """Cari encoding pertama yang bisa mendekode seluruh file (dibaca per chunk)."""
+    for enc in encodings:
+        decoder = codecs.getincrementaldecoder(enc)()
+        try:
+            with open(path, 'rb') as f:
+                while True:
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        decoder.decode(b'', final=True)
+                        break
+                    decoder.decode(chunk)
+            return enc
+        except UnicodeDecodeError:
+            print(f"Gagal dengan encoding: {enc}, mencoba yang lain...")
+    raise ValueError("Tidak bisa membaca file dengan encoding yang dicoba.")
+
+
+def iter_records(path=CSV_PATH, encoding=None):
+    """Yield (index, dict kolom mentah) untuk setiap baris data."""
+    encoding = encoding or sniff_encoding(path)
+    with open(path, 'r', encoding=encoding, newline='') as f:
+        for index, record in enumerate(csv.DictReader(f)):
+            yield index, record
+
+
+def _parse_float(value):
+    value = (value or '').strip()
+    if value == '' or value.lower() == 'nan':
+        return None
+    return float(value.replace(',', '.'))
+
+
+def _parse_hasilgc(value):
+    value = (value or '').strip()
+    if value == '':
+        return None
+    number = float(value)
+    if not number.is_integer():
+        raise ValueError(value)
+    return int(number)
+
+
+def parse_row(index, record):
+    """Ubah record mentah menjadi GcRow. Kembalikan (GcRow, None) atau (None, alasan)."""
+    perusahaan_id = (record.get('perusahaan_id') or '').strip()
+    if not perusahaan_id:
+        return None, "perusahaan_id kosong."
+
+    raw_hasilgc = record.get('hasilgc')
+    try:
+        hasilgc = _parse_hasilgc(raw_hasilgc)
+    except ValueError:
+        hasilgc = None
+    if hasilgc not in HASILGC_VALID:
+        return None, f"hasilgc kosong atau tidak valid ({raw_hasilgc}). Nilai yang diperbolehkan: 99, 1, 3, atau 4."
+
+    raw_lat, raw_lon = record.get('latitude'), record.get('longitude')
+    try:
+        latitude = _parse_float(raw_lat)
+        longitude = _parse_float(raw_lon)
+    except ValueError:
+        return None, f"latitude/longitude bukan angka. Latitude: {raw_lat}, Longitude: {raw_lon}."
+
+    # Pengecekan tambahan: jika hasilgc = 1, latitude dan longitude harus ada
+    if hasilgc == 1 and (latitude is None or longitude is None):
+        return None, f"Untuk hasilgc=1, latitude dan longitude harus diisi. Latitude: {raw_lat}, Longitude: {raw_lon}."
+    if latitude is not None and not -90 <= latitude <= 90:
+        return None, f"latitude di luar rentang (-90..90): {raw_lat}."
+    if longitude is not None and not -180 <= longitude <= 180:
+        return None, f"longitude di luar rentang (-180..180): {raw_lon}."
+
+    return GcRow(index, perusahaan_id, latitude, longitude, hasilgc), None
+
+
+def iter_rows(path=CSV_PATH, start=0, encoding=None, on_invalid=None):
+    """Yield GcRow valid mulai dari baris `start`. Baris tidak valid dilewati
+    dan dilaporkan ke on_invalid(index, alasan) jika diberikan."""
+    for index, record in iter_records(path, encoding):
+        if index < start:
+            continue
+        row, alasan = parse_row(index, record)
+        if row is None:
+            if on_invalid:
+                on_invalid(index, alasan)
+            continue
+        yield row
+
+
+def format_koordinat(value):
+    """Nilai koordinat untuk form POST ('' jika kosong)."""
+    return '' if value is None else str(value)
+
+
+def validate_file(path=CSV_PATH, report_path=REPORT_PATH, start=0, encoding=None):
+    """Periksa semua baris sekali jalan dan tulis laporan baris bermasalah.
+
+    Kembalikan (jumlah_valid, jumlah_tidak_valid).
+    """
+    valid = invalid = 0
+    with open(report_path, 'w', encoding='utf-8', newline='') as out:
+        writer = csv.writer(out)
+        writer.writerow(['baris', 'perusahaan_id', 'alasan'])
+        for index, record in iter_records(path, encoding):
+            if index < start:
+                continue
+            row, alasan = parse_row(index, record)
+            if row is None:
+                invalid += 1
+                writer.writerow([index, record.get('perusahaan_id', ''), alasan])
+            else:
+                valid += 1
+    return valid, invalid
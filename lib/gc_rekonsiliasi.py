@@ -0,0 +1,244 @@
+"""Rekonsiliasi export "Sudah GC" dengan data_gc_profiling_bahan_kirim.csv.
+
+Export (xlsx, JSON hasil convert_excel.py, atau CSV) dimuat sekali ke dict
+id usaha -> (hasilgc, latitude, longitude), lalu CSV kiriman dibaca
+streaming dan setiap baris dicocokkan dengan satu lookup (hash join), jadi
+waktunya linear terhadap jumlah baris kedua file. Hasilnya:
+
+    rekonsiliasi_sisa_kirim.csv  baris yang belum ada di export (kolom asli,
+                                 bisa langsung dipakai sebagai CSV kiriman)
+    rekonsiliasi_konflik.csv     sudah ada di export tapi hasilgc/koordinat beda
+    rekonsiliasi_sudah_gc.txt    id yang sudah ada di export, format --cache
+                                 gc_koprol.py, supaya tidak di-POST ulang
+    rekonsiliasi_ringkasan.json  jumlah per kategori
+
+Kolom export dideteksi otomatis (idsbr/perusahaan_id, gcs_result/hasilgc,
+latitude, longitude); gcs_result berupa label ("Ditemukan", "Tutup", ...)
+dipetakan ke kode seperti di aplikasi.
+
+    python gc_rekonsiliasi.py "assets/excel/[7372] Parepare (Sudah GC).xlsx"
+    python gc_rekonsiliasi.py parepare_comparison.json --csv=data_gc_profiling_bahan_kirim.csv --toleransi=5
+"""
+
+import csv
+import json
+import math
+import os
+import sys
+
+from gc_reader import CSV_PATH, iter_records, parse_row, sniff_encoding
+
+SISA_PATH = 'rekonsiliasi_sisa_kirim.csv'
+KONFLIK_PATH = 'rekonsiliasi_konflik.csv'
+SUDAH_GC_PATH = 'rekonsiliasi_sudah_gc.txt'
+RINGKASAN_PATH = 'rekonsiliasi_ringkasan.json'
+
+# Kandidat nama kolom di export, urut prioritas
+KOLOM_ID = ('perusahaan_id', 'idsbr')
+KOLOM_HASIL = ('hasilgc', 'gcs_result')
+KOLOM_LAT = ('latitude', 'lat')
+KOLOM_LON = ('longitude', 'lon', 'lng')
+
+# Selisih koordinat (meter) yang masih dianggap sama
+TOLERANSI_METER = 1.0
+METER_PER_DERAJAT = 111320.0
+
+
+def _teks(value):
+    text = '' if value is None else str(value).strip()
+    return '' if text.lower() in ('nan', 'none', 'null') else text
+
+
+def normalisasi_id(value):
+    # Excel/pandas kadang membaca id angka sebagai float ("12345.0")
+    text = _teks(value)
+    if text.endswith('.0') and text[:-2].isdigit():
+        return text[:-2]
+    return text
+
+
+def kode_hasil(value):
+    """Kode hasilgc (99, 1, 3, 4, 5) dari kode atau label; None jika kosong/tidak dikenal.
+
+    Urutan cek sama dengan pemetaan gcs_result di aplikasi ('tidak ditemukan'
+    sebelum 'ditemukan').
+    """
+    lower = _teks(value).lower()
+    if not lower:
+        return None
+    try:
+        number = float(lower)
+        return int(number) if number.is_integer() else None
+    except ValueError:
+        pass
+    for kata, kode in (('tidak ditemukan', 99), ('ditemukan', 1), ('tutup', 3), ('ganda', 4), ('usaha baru', 5)):
+        if kata in lower:
+            return kode
+    return None
+
+
+def _angka(value):
+    text = _teks(value).replace(',', '.')
+    if not text:
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def _pilih_kolom(kolom, kandidat, wajib=True):
+    lower = {k.strip().lower(): k for k in kolom}
+    for nama in kandidat:
+        if nama in lower:
+            return lower[nama]
+    if wajib:
+        raise SystemExit(f"Kolom {'/'.join(kandidat)} tidak ditemukan di export. Kolom yang ada: {list(kolom)}")
+    return None
+
+
+def baca_export(path):
+    """List dict baris export dari .xlsx/.xls, .json (list of dict) atau .csv."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.xlsx', '.xls'):
+        # Diimpor di sini agar pandas hanya dibutuhkan untuk export Excel
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        from excel_cache import read_excel_cached
+        return read_excel_cached(path, dtype=str).to_dict('records')
+    if ext == '.json':
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    with open(path, 'r', encoding=sniff_encoding(path), newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def indeks_export(records):
+    """Dict id -> (hasilgc, lat, lon) dan jumlah id duplikat di export (baris pertama menang)."""
+    if not records:
+        return {}, 0
+    kolom = list(records[0].keys())
+    k_id = _pilih_kolom(kolom, KOLOM_ID)
+    k_hasil = _pilih_kolom(kolom, KOLOM_HASIL)
+    k_lat = _pilih_kolom(kolom, KOLOM_LAT, wajib=False)
+    k_lon = _pilih_kolom(kolom, KOLOM_LON, wajib=False)
+    print(f"[INFO] Kolom export: id={k_id}, hasil={k_hasil}, lat={k_lat}, lon={k_lon}")
+
+    indeks = {}
+    duplikat = 0
+    for record in records:
+        perusahaan_id = normalisasi_id(record.get(k_id))
+        if not perusahaan_id:
+            continue
+        if perusahaan_id in indeks:
+            duplikat += 1
+            continue
+        indeks[perusahaan_id] = (
+            kode_hasil(record.get(k_hasil)),
+            _angka(record.get(k_lat)) if k_lat else None,
+            _angka(record.get(k_lon)) if k_lon else None,
+        )
+    return indeks, duplikat
+
+
+def jarak_meter(lat1, lon1, lat2, lon2):
+    """Jarak equirectangular (cukup untuk selisih kecil)."""
+    dx = (lon2 - lon1) * METER_PER_DERAJAT * math.cos(math.radians((lat1 + lat2) / 2))
+    dy = (lat2 - lat1) * METER_PER_DERAJAT
+    return math.hypot(dx, dy)
+
+
+def bandingkan(row, export, toleransi=TOLERANSI_METER):
+    """Daftar jenis konflik antara GcRow dan entri export (kosong jika sama)."""
+    hasil, lat, lon = export
+    konflik = []
+    if hasil != row.hasilgc:
+        konflik.append('hasilgc')
+    ada_kirim = row.latitude is not None and row.longitude is not None
+    ada_export = lat is not None and lon is not None
+    if ada_kirim != ada_export:
+        konflik.append('koordinat')
+    elif ada_kirim and jarak_meter(row.latitude, row.longitude, lat, lon) > toleransi:
+        konflik.append('koordinat')
+    return konflik
+
+
+def rekonsiliasi(export_path, csv_path=CSV_PATH, toleransi=TOLERANSI_METER,
+                 sisa_path=SISA_PATH, konflik_path=KONFLIK_PATH,
+                 sudah_gc_path=SUDAH_GC_PATH, ringkasan_path=RINGKASAN_PATH):
+    """Jalankan hash join dan tulis semua file hasil. Kembalikan dict ringkasan."""
+    indeks, duplikat_export = indeks_export(baca_export(export_path))
+    print(f"[INFO] Export: {len(indeks)} id unik ({duplikat_export} duplikat dilewati).")
+
+    ringkasan = {'baris_csv': 0, 'tidak_valid': 0, 'duplikat_csv': 0, 'sisa_kirim': 0,
+                 'sudah_sama': 0, 'konflik': 0, 'konflik_hasilgc': 0, 'konflik_koordinat': 0,
+                 'id_export': len(indeks), 'duplikat_export': duplikat_export}
+    terlihat = set()
+    encoding = sniff_encoding(csv_path)
+
+    with open(csv_path, 'r', encoding=encoding, newline='') as f:
+        fieldnames = next(csv.reader(f), [])
+
+    with open(sisa_path, 'w', encoding='utf-8', newline='') as sisa_out, \
+            open(konflik_path, 'w', encoding='utf-8', newline='') as konflik_out, \
+            open(sudah_gc_path, 'w', encoding='utf-8') as sudah_out:
+        sisa = csv.DictWriter(sisa_out, fieldnames=fieldnames)
+        sisa.writeheader()
+        konflik_writer = csv.writer(konflik_out)
+        konflik_writer.writerow(['baris', 'perusahaan_id', 'konflik', 'hasilgc_kirim', 'hasilgc_export',
+                                 'latitude_kirim', 'longitude_kirim', 'latitude_export', 'longitude_export'])
+        sudah_out.write('perusahaan_id\n')
+
+        for index, record in iter_records(csv_path, encoding):
+            ringkasan['baris_csv'] += 1
+            row, _ = parse_row(index, record)
+            if row is None:
+                ringkasan['tidak_valid'] += 1
+                continue
+            if row.perusahaan_id in terlihat:
+                ringkasan['duplikat_csv'] += 1
+                continue
+            terlihat.add(row.perusahaan_id)
+
+            export = indeks.get(normalisasi_id(row.perusahaan_id))
+            if export is None:
+                ringkasan['sisa_kirim'] += 1
+                sisa.writerow(record)
+                continue
+
+            sudah_out.write(f"{row.perusahaan_id}\n")
+            jenis = bandingkan(row, export, toleransi)
+            if not jenis:
+                ringkasan['sudah_sama'] += 1
+                continue
+            ringkasan['konflik'] += 1
+            for j in jenis:
+                ringkasan[f'konflik_{j}'] += 1
+            konflik_writer.writerow([index, row.perusahaan_id, '+'.join(jenis), row.hasilgc,
+                                     '' if export[0] is None else export[0],
+                                     _teks(row.latitude), _teks(row.longitude),
+                                     _teks(export[1]), _teks(export[2])])
+
+    with open(ringkasan_path, 'w', encoding='utf-8') as f:
+        json.dump(ringkasan, f, indent=2)
+
+    print(f"[INFO] {ringkasan['baris_csv']} baris CSV: {ringkasan['sisa_kirim']} sisa kirim, "
+          f"{ringkasan['sudah_sama']} sudah GC (sama), {ringkasan['konflik']} konflik "
+          f"(hasilgc {ringkasan['konflik_hasilgc']}, koordinat {ringkasan['konflik_koordinat']}), "
+          f"{ringkasan['duplikat_csv']} duplikat, {ringkasan['tidak_valid']} tidak valid.")
+    print(f"[INFO] Sisa kirim: {sisa_path}, konflik: {konflik_path}")
+    print(f"[INFO] Lewati yang sudah GC saat kirim: python gc_koprol.py --cache={sudah_gc_path}")
+    return ringkasan
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    flags = dict(a[2:].split('=', 1) if '=' in a else (a[2:], '') for a in sys.argv[1:] if a.startswith('--'))
+    if not args:
+        print(__doc__)
+        sys.exit(1)
+    toleransi = float(flags['toleransi']) if flags.get('toleransi') else TOLERANSI_METER
+    rekonsiliasi(args[0], flags.get('csv') or CSV_PATH, toleransi)
+
+
+if __name__ == "__main__":
+    main()
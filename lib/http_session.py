@@ -0,0 +1,103 @@
+"""Klien HTTP biasa (requests + keep-alive) untuk MatchaPro setelah login SSO.
+
+Browser hanya dipakai untuk login; cookies, _token dan gc_token dari
+login.login_session() dipindahkan ke requests.Session, lalu browser
+ditutup. Refresh token cukup GET /dirgc dan parsing HTML dengan regex
+gcSubmitToken yang sama seperti di gc_koprol.extract_tokens().
+"""
+
+import re
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Header WebView Android yang sama dengan context browser di login.py
+MOBILE_HEADERS = {
+    "connection": "keep-alive",
+    "sec-ch-ua": "\"Android WebView\";v=\"143\", \"Chromium\";v=\"143\", \"Not A(Brand\";v=\"24\"",
+    "sec-ch-ua-mobile": "?1",
+    "sec-ch-ua-platform": "\"Android\"",
+    "x-requested-with": "com.matchapro.app",
+    "accept-language": "en-GB,en-US;q=0.9,en;q=0.8",
+}
+
+GC_TOKEN_RE = re.compile(r"let\s+gcSubmitToken\s*=\s*(['\"])([^'\"]+)\1")
+CSRF_RE = re.compile(
+    r"<meta\s+[^>]*name=[\"']csrf-token[\"'][^>]*content=[\"']([^\"']+)[\"']"
+    r"|<meta\s+[^>]*content=[\"']([^\"']+)[\"'][^>]*name=[\"']csrf-token[\"']",
+    re.IGNORECASE,
+)
+
+
+class SesiTidakValid(Exception):
+    """Server menolak sesi (redirect ke login / token tidak ada di /dirgc)."""
+
+
+class HttpResponse:
+    """Bungkus requests.Response agar antarmukanya sama dengan APIResponse Playwright."""
+
+    def __init__(self, response):
+        self._response = response
+        self.status = response.status_code
+
+    def text(self):
+        return self._response.text
+
+    def json(self):
+        return self._response.json()
+
+
+def cookie_records(login_result):
+    """List cookie {name, value, domain, path} dari dict hasil login/sesi tersimpan.
+
+    Sesi lama (sebelum cookie_jar disimpan) hanya punya dict name -> value;
+    cookie itu dipasang tanpa domain seperti sebelumnya.
+    """
+    records = login_result.get('cookie_jar')
+    if records:
+        return records
+    return [{'name': name, 'value': value} for name, value in (login_result.get('cookies') or {}).items()]
+
+
+def rekam_cookies(jar):
+    """Kebalikan cookie_records(): list cookie dari http.cookiejar.CookieJar
+    (requests.Session.cookies atau httpx cookies.jar)."""
+    return [{'name': c.name, 'value': c.value, 'domain': c.domain, 'path': c.path} for c in jar]
+
+
+def buat_session(login_result, pool_size=4):
+    """Buat requests.Session dari dict hasil login (cookies + user_agent)."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(MOBILE_HEADERS)
+    if login_result.get('user_agent'):
+        session.headers["user-agent"] = login_result['user_agent']
+    # Domain/path harus sama dengan cookie dari server: tanpa itu cookie yang
+    # diterbitkan ulang (laravel_session, XSRF-TOKEN) tersimpan sebagai cookie
+    # kedua dan request berikutnya mengirim nilai lama dan baru sekaligus
+    for c in cookie_records(login_result):
+        session.cookies.set(c['name'], c['value'], domain=c.get('domain') or '', path=c.get('path') or '/')
+    return session
+
+
+def parse_tokens(html):
+    """Ekstrak (_token, gc_token) dari HTML /dirgc. Raise SesiTidakValid jika tidak ditemukan."""
+    csrf = CSRF_RE.search(html)
+    if not csrf:
+        raise SesiTidakValid("Gagal mengekstrak _token - tag meta tidak ditemukan")
+    match = GC_TOKEN_RE.search(html)
+    if not match:
+        if "Akses lewat matchapro mobile aja" in html or "Not Authorized" in html:
+            raise SesiTidakValid("Akses ditolak server (terdeteksi bukan mobile)")
+        raise SesiTidakValid("Token tidak ditemukan di halaman /dirgc (sesi mungkin kedaluwarsa)")
+    return csrf.group(1) or csrf.group(2), match.group(2)
+
+
+def ambil_tokens(session, url_gc, timeout=30):
+    """GET /dirgc dan kembalikan (_token, gc_token)."""
+    response = session.get(url_gc, timeout=timeout)
+    if response.status_code != 200 or "/login" in response.url:
+        raise SesiTidakValid(f"Sesi tidak valid saat refresh token (status {response.status_code}, url {response.url})")
+    return parse_tokens(response.text)
@@ -1,6 +1,14 @@
 from playwright.sync_api import sync_playwright
+import os
 import sys
 import random
+import threading
+import time
+from gc_metrics import metrics
+
+# Alamat MatchaPro. Bisa diarahkan ke server tiruan lokal (matchapro_palsu.py)
+# lewat env MATCHAPRO_BASE_URL, mis. http://127.0.0.1:8765
+BASE_URL = os.environ.get('MATCHAPRO_BASE_URL', 'https://matchapro.web.bps.go.id').rstrip('/')
 
 user_agan = [
     "Mozilla/5.0 (Linux; Android 16; ONEPLUS 15 Build/SKQ1.211202.001; wv) AppleWebKit/537.36 (KHTML, like Gecko) Version/4.0 Chrome/143.0.7499.192 Mobile Safari/537.36",
@@ -18,28 +26,29 @@ user_agan = [
 # Pilih user agent secara acak dari list yang terverifikasi
 user_agents = random.choice(user_agan)
 
-# Reuse a single Playwright instance to avoid starting/stopping inside runtime
-_PW = None
+# Reuse a single Playwright instance per thread to avoid starting/stopping inside runtime.
+# Sync API Playwright tidak boleh dipakai lintas thread, jadi tiap worker
+# (mode paralel gc_koprol.py) mendapat instance sendiri.
+_PW_LOCAL = threading.local()
 def _get_playwright():
-    global _PW
-    if _PW is None:
-        _PW = sync_playwright().start()
-    return _PW
+    pw = getattr(_PW_LOCAL, 'pw', None)
+    if pw is None:
+        pw = sync_playwright().start()
+        _PW_LOCAL.pw = pw
+    return pw
 
 def _stop_playwright():
-    global _PW
     try:
-        if _PW is not None:
-            _PW.stop()
-            _PW = None
+        _PW_LOCAL.pool = None
+        pw = getattr(_PW_LOCAL, 'pw', None)
+        if pw is not None:
+            pw.stop()
+            _PW_LOCAL.pw = None
     except Exception:
         pass
 
-def login_with_sso(username, password, otp_code=None):
-    """Lakukan login SSO ke MatchaPro dan kembalikan objek halaman jika berhasil."""
-    pw = _get_playwright()
-    browser = pw.chromium.launch(headless=False)  # Set to True for headless
-    
+def _new_mobile_page(browser):
+    """Buat context + page dengan emulasi mobile yang sama untuk setiap login."""
     # Emulate mobile to avoid "Not Authorized" / "Akses lewat matchapro mobile aja"
     context = browser.new_context(
         user_agent=user_agents,
@@ -64,129 +73,272 @@ def login_with_sso(username, password, otp_code=None):
             get: function() { return 5; }
         });
     """)
+    return context, page
 
+def _run_sso(page, context, username, password, otp_code=None):
+    """Jalankan alur login SSO pada page; kembalikan dict sesi atau None jika gagal."""
+    t0 = time.monotonic()
+    result = None
     try:
-        # Navigasi ke halaman login
-        page.goto("https://matchapro.web.bps.go.id/login")
+        result = _run_sso_flow(page, context, username, password, otp_code)
+        return result
+    finally:
+        metrics.catat('login_sso', username, durasi=round(time.monotonic() - t0, 3), ok=bool(result))
 
-        # Klik tombol login SSO
-        page.click('#login-sso')
+def _run_sso_flow(page, context, username, password, otp_code=None):
+    # Navigasi ke halaman login
+    page.goto(f"{BASE_URL}/login")
 
-        # Tunggu navigasi ke halaman SSO
-        page.wait_for_load_state('networkidle')
+    # Klik tombol login SSO
+    page.click('#login-sso')
 
-        # Sekarang di halaman SSO, isi username dan password
-        page.fill('input[name="username"]', username)
-        page.fill('input[name="password"]', password)
+    # Tunggu navigasi ke halaman SSO
+    page.wait_for_load_state('networkidle')
 
-        # Klik tombol submit
-        page.click('input[type="submit"]')
+    # Sekarang di halaman SSO, isi username dan password
+    page.fill('input[name="username"]', username)
+    page.fill('input[name="password"]', password)
 
-        # Tunggu navigasi
-        page.wait_for_load_state('networkidle')
+    # Klik tombol submit
+    page.click('input[type="submit"]')
 
-        # Cek apakah OTP diperlukan (TOTP)
-        try:
-            otp_input = page.locator('input[name="otp"]').first
-            if otp_input.is_visible(timeout=5000):
-                if otp_code is None:
-                    otp_code = input("Masukkan kode OTP: ")
-                otp_input.fill(otp_code)
-                page.click('input[type="submit"]')  # Submit OTP
-                page.wait_for_load_state('networkidle')
-        except:
-            pass  # Tidak perlu OTP
-
-        # Tunggu hingga URL berubah ke matchapro
-        page.wait_for_url("https://matchapro.web.bps.go.id/**", timeout=50000)
-
-        # Cek apakah login berhasil
-        current_url = page.url
-        if "matchapro.web.bps.go.id" in current_url and "login" not in current_url:
-            # Login berhasil, extract data untuk Flutter
-            import json
-            
-            # 1. Get Cookies
-            cookies = context.cookies()
-            cookie_dict = {c['name']: c['value'] for c in cookies}
-            cookie_str = "; ".join([f"{c['name']}={c['value']}" for c in cookies])
+    # Tunggu navigasi
+    page.wait_for_load_state('networkidle')
+
+    # Cek apakah OTP diperlukan (TOTP)
+    try:
+        otp_input = page.locator('input[name="otp"]').first
+        if otp_input.is_visible(timeout=5000):
+            if otp_code is None:
+                otp_code = input("Masukkan kode OTP: ")
+            otp_input.fill(otp_code)
+            page.click('input[type="submit"]')  # Submit OTP
+            page.wait_for_load_state('networkidle')
+    except:
+        pass  # Tidak perlu OTP
+
+    # Tunggu hingga URL berubah ke matchapro
+    page.wait_for_url(f"{BASE_URL}/**", timeout=50000)
+
+    # Cek apakah login berhasil
+    current_url = page.url
+    if current_url.startswith(BASE_URL) and "login" not in current_url:
+        # Login berhasil, extract data untuk Flutter
+        import json
+        
+        # 1. Get Cookies
+        cookies = context.cookies()
+        cookie_dict = {c['name']: c['value'] for c in cookies}
+        cookie_str = "; ".join([f"{c['name']}={c['value']}" for c in cookies])
+        # Rekaman lengkap (domain/path) untuk klien HTTP Python, supaya cookie
+        # yang diterbitkan ulang server menimpa cookie ini, bukan jadi duplikat
+        cookie_jar = [{'name': c['name'], 'value': c['value'], 'domain': c.get('domain'), 'path': c.get('path')}
+                      for c in cookies]
+        
+        # 2. Get Tokens via JS
+        tokens = page.evaluate('''() => {
+            let gc_token = '';
+            let csrf_token = '';
+            let user_name = '';
             
-            # 2. Get Tokens via JS
-            tokens = page.evaluate('''() => {
-                let gc_token = '';
-                let csrf_token = '';
-                let user_name = '';
-                
-                try {
-                    // Try regex first
-                    let match = document.body.innerHTML.match(/let\s+gcSubmitToken\s*=\s*(['"])([^'"]+)\1/);
-                    if (match) gc_token = match[2];
-                } catch(e) {}
-                
-                if (!gc_token) {
-                    let el = document.querySelector('input[name="gc_token"]');
-                    if (el) gc_token = el.value;
-                }
-                
-                let meta = document.querySelector('meta[name="csrf-token"]');
-                if (meta) csrf_token = meta.content;
-                if (!csrf_token) {
-                    let el = document.querySelector('input[name="_token"]');
-                    if (el) csrf_token = el.value;
-                }
-                
-                // Try getting username
-                let userEl = document.querySelector('.user-name.fw-bolder') || 
-                             document.querySelector('.dropdown-user .username') || 
-                             document.querySelector('.user-panel .info p');
-                
-                if (userEl) {
-                    user_name = userEl.innerText.trim();
-                    console.log("Found username: " + user_name);
-                } else {
-                    console.log("Username element not found");
-                }
-                
-                return {gc_token, csrf_token, user_name};
-            }''')
+            try {
+                // Try regex first
+                let match = document.body.innerHTML.match(/let\s+gcSubmitToken\s*=\s*(['"])([^'"]+)\1/);
+                if (match) gc_token = match[2];
+            } catch(e) {}
             
-            # Print log if username found
-            if tokens.get('user_name'):
-                print(f"Log: Username found: {tokens.get('user_name')}")
+            if (!gc_token) {
+                let el = document.querySelector('input[name="gc_token"]');
+                if (el) gc_token = el.value;
+            }
             
-            result = {
-                "status": "success",
-                "cookie_header": cookie_str,
-                "cookies": cookie_dict,
-                "gc_token": tokens.get('gc_token', ''),
-                "csrf_token": tokens.get('csrf_token', ''),
-                "user_name": tokens.get('user_name', 'Python User'),
-                "user_agent": user_agents
+            let meta = document.querySelector('meta[name="csrf-token"]');
+            if (meta) csrf_token = meta.content;
+            if (!csrf_token) {
+                let el = document.querySelector('input[name="_token"]');
+                if (el) csrf_token = el.value;
             }
             
-            # Print JSON specific marker for Flutter to parse
-            print("\n---JSON_START---")
-            print(json.dumps(result))
-            print("---JSON_END---\n")
+            // Try getting username
+            let userEl = document.querySelector('.user-name.fw-bolder') || 
+                         document.querySelector('.dropdown-user .username') || 
+                         document.querySelector('.user-panel .info p');
             
-            return page, browser  # Mengembalikan halaman dan browser untuk menjaga sesi
-        else:
-            print("Login gagal. Periksa kredensial.")
-            print(f"Current URL: {current_url}")
-            try:
-                browser.close()
-            except Exception:
-                pass
-            return None, None
+            if (userEl) {
+                user_name = userEl.innerText.trim();
+                console.log("Found username: " + user_name);
+            } else {
+                console.log("Username element not found");
+            }
+            
+            return {gc_token, csrf_token, user_name};
+        }''')
+        
+        # Print log if username found
+        if tokens.get('user_name'):
+            print(f"Log: Username found: {tokens.get('user_name')}")
+        
+        result = {
+            "status": "success",
+            "cookie_header": cookie_str,
+            "cookies": cookie_dict,
+            "cookie_jar": cookie_jar,
+            "gc_token": tokens.get('gc_token', ''),
+            "csrf_token": tokens.get('csrf_token', ''),
+            "user_name": tokens.get('user_name', 'Python User'),
+            "user_agent": user_agents
+        }
+        
+        # Print JSON specific marker for Flutter to parse
+        print("\n---JSON_START---")
+        print(json.dumps(result))
+        print("---JSON_END---\n")
+        
+        return result
+    else:
+        print("Login gagal. Periksa kredensial.")
+        print(f"Current URL: {current_url}")
+        return None
+
+def _login_sso(username, password, otp_code=None):
+    """Login SSO ke MatchaPro; kembalikan (page, browser, result) atau (None, None, None)."""
+    pw = _get_playwright()
+    browser = pw.chromium.launch(headless=False)  # Set to True for headless
+    context, page = _new_mobile_page(browser)
 
+    try:
+        result = _run_sso(page, context, username, password, otp_code)
+        if result:
+            return page, browser, result  # Mengembalikan halaman dan browser untuk menjaga sesi
     except Exception as e:
         print(f"Error selama login: {e}")
+    try:
+        browser.close()
+    except Exception:
+        pass
+    return None, None, None
+
+def login_with_sso(username, password, otp_code=None):
+    """Lakukan login SSO ke MatchaPro dan kembalikan objek halaman jika berhasil."""
+    page, browser, _ = _login_sso(username, password, otp_code)
+    return page, browser
+
+def login_session(username, password, otp_code=None):
+    """Login SSO lalu langsung tutup browser.
+
+    Kembalikan data sesi (dict yang sama dengan yang dicetak di antara
+    ---JSON_START--- / ---JSON_END---: cookies, csrf_token, gc_token,
+    user_agent) untuk dipakai klien HTTP biasa, atau None jika gagal.
+    """
+    page, browser, result = _login_sso(username, password, otp_code)
+    if browser is not None:
         try:
             browser.close()
         except Exception:
             pass
+    return result
+
+def parse_login_output(text):
+    """Ambil dict sesi dari output login.py (blok ---JSON_START--- ... ---JSON_END---)."""
+    import json
+    start = text.rfind("---JSON_START---")
+    end = text.rfind("---JSON_END---")
+    if start == -1 or end == -1 or end < start:
+        return None
+    try:
+        return json.loads(text[start + len("---JSON_START---"):end].strip())
+    except ValueError:
+        return None
+
+class BrowserPool:
+    """Satu browser headless yang hidup lama; setiap login memakai context baru.
+
+    Login baru cukup membuat context (emulasi mobile yang sama dengan
+    login_with_sso), bukan proses browser baru. Context yang dikembalikan
+    login() tetap milik pemanggil sampai ditutup; pool tidak pernah menutup
+    context yang masih dipakai. max_contexts adalah batas lunak: jika semua
+    slot masih dipakai, context baru tetap dibuka dengan peringatan (menunggu
+    tidak mungkin, context hanya bisa dilepas dari thread yang sama).
+    Objek Playwright sync terikat ke thread pembuatnya, jadi ambil pool
+    lewat get_pool() (satu pool per thread).
+    """
+
+    def __init__(self, max_contexts=4, headless=True):
+        self.max_contexts = max_contexts
+        self.headless = headless
+        self.browser = None
+        self._contexts = []  # context yang sedang dipakai, urutan dibuka
+
+    def start(self):
+        """Pre-warm: jalankan browser sekarang agar login pertama tidak menunggu launch."""
+        if self.browser is None or not self.browser.is_connected():
+            self.browser = _get_playwright().chromium.launch(headless=self.headless)
+            self._contexts = []
+        return self
+
+    def _forget(self, context):
+        if context in self._contexts:
+            self._contexts.remove(context)
+
+    def _open_context(self):
+        self.start()
+        if len(self._contexts) >= self.max_contexts:
+            print(f"[WARN] {len(self._contexts)} context pool masih dipakai (maks {self.max_contexts}), "
+                  "membuka context tambahan")
+        context, page = _new_mobile_page(self.browser)
+        self._contexts.append(context)
+        context.on("close", lambda _: self._forget(context))
+        return context, page
+
+    def release(self, context):
+        self._forget(context)
+        try:
+            context.close()
+        except Exception:
+            pass
+
+    def login(self, username, password, otp_code=None):
+        """Login SSO di context baru; kembalikan (page, context) atau (None, None).
+
+        context.close() mengakhiri sesi dan membebaskan slot pool.
+        """
+        context, page = self._open_context()
+        try:
+            if _run_sso(page, context, username, password, otp_code):
+                return page, context
+        except Exception as e:
+            print(f"Error selama login: {e}")
+        self.release(context)
         return None, None
 
+    def login_session(self, username, password, otp_code=None):
+        """Seperti login_session(), tetapi memakai context pool lalu menutupnya."""
+        context, page = self._open_context()
+        try:
+            return _run_sso(page, context, username, password, otp_code)
+        except Exception as e:
+            print(f"Error selama login: {e}")
+            return None
+        finally:
+            self.release(context)
+
+    def close(self):
+        try:
+            if self.browser is not None:
+                self.browser.close()
+        except Exception:
+            pass
+        self.browser = None
+        self._contexts = []
+
+def get_pool(max_contexts=4, headless=True):
+    """BrowserPool milik thread ini (dibuat saat pertama kali dipanggil)."""
+    pool = getattr(_PW_LOCAL, 'pool', None)
+    if pool is None:
+        pool = BrowserPool(max_contexts=max_contexts, headless=headless)
+        _PW_LOCAL.pool = pool
+    return pool
+
 if __name__ == "__main__":
     if len(sys.argv) < 3:
         print("Usage: python login.py <username> <password> [otp_code]")
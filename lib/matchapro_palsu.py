@@ -0,0 +1,320 @@
+"""Server tiruan MatchaPro lokal untuk menguji dan mengukur gc_koprol.py.
+
+Meniru bagian MatchaPro yang dipakai submitter:
+
+    GET  /login                    halaman login dengan tombol #login-sso
+    GET  /sso/login                form SSO (username, password, submit)
+    POST /sso/login                set cookie sesi lalu redirect ke /dirgc
+    GET  /dirgc                    meta csrf-token + `let gcSubmitToken = '...'`;
+                                   tanpa sesi redirect ke /login
+    POST /dirgc/konfirmasi-user    konfirmasi GC dengan _token dan gc_token
+
+gc_token sekali pakai: setiap GET /dirgc dan setiap konfirmasi sukses
+menerbitkan token baru (dikirim balik sebagai new_gc_token), token lama
+dibalas 400 "Token invalid atau sudah terpakai". perusahaan_id yang sudah
+dikonfirmasi dibalas "Usaha ini sudah diground check".
+
+Gangguan yang bisa diatur (lihat Perilaku): latensi + jitter, 429 acak atau
+batas request per menit per akun (retry_after di JSON, pesan "N menit",
+atau tanpa keterangan waktu), 503 "Server sedang sibuk" dan token yang
+kedaluwarsa sebelum dipakai. Selama blokir 429 berlaku, semua POST akun
+itu dibalas 429.
+
+Jalankan lalu arahkan gc_koprol.py ke server ini:
+    python matchapro_palsu.py --port=8765 --latensi=0.2 --p429=0.05 --retry-after=30
+    MATCHAPRO_BASE_URL=http://127.0.0.1:8765 python gc_koprol.py 1 --http
+
+Akun apa pun diterima (password tidak boleh kosong). Tidak ada OTP.
+"""
+
+import html
+import json
+import random
+import secrets
+import sys
+import threading
+import time
+from collections import Counter, deque, namedtuple
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+COOKIE_SESI = 'matchapro_session'
+PORT = 8765
+
+# Pesan persis seperti server asli (dicocokkan oleh gc_koprol.py). Sengaja
+# tidak diimpor dari gc_koprol: modul itu membaca MATCHAPRO_BASE_URL saat
+# diimpor, sebelum alamat server ini diketahui.
+MSG_SUDAH_GC = 'Usaha ini sudah diground check'
+MSG_TOKEN_INVALID = 'Token invalid atau sudah terpakai. Silakan refresh halaman.'
+MSG_SERVER_SIBUK = 'Server sedang sibuk. Silakan coba lagi dalam beberapa detik.'
+
+# gaya_429: 'retry_after' (field JSON, detik), 'menit' (hanya pesan
+# "... dalam N menit"), atau 'kosong' (tanpa keterangan waktu)
+Perilaku = namedtuple('Perilaku', [
+    'latensi',          # detik tambahan per POST konfirmasi
+    'jitter',           # tambahan acak 0..jitter detik
+    'p_429',            # peluang 429 per POST
+    'batas_per_menit',  # 429 jika akun melebihi N POST dalam 60 detik (0 = tanpa batas)
+    'retry_after',      # lama blokir 429 (detik)
+    'gaya_429',
+    'p_sibuk',          # peluang 503 "Server sedang sibuk"
+    'p_token',          # peluang gc_token kedaluwarsa sebelum dipakai (400)
+], defaults=(0.0, 0.0, 0.0, 0, 30, 'retry_after', 0.0, 0.0))
+
+
+class _Sesi:
+    def __init__(self, username):
+        self.username = username
+        self.csrf = secrets.token_hex(20)
+        self.gc_token = None
+        self.post = deque()
+        self.blokir_sampai = 0.0
+
+
+class MatchaProPalsu(ThreadingHTTPServer):
+    """HTTP server tiruan; state sesi dan statistik disimpan di objek server."""
+
+    daemon_threads = True
+
+    def __init__(self, alamat=('127.0.0.1', PORT), perilaku=None, seed=None):
+        super().__init__(alamat, _Handler)
+        self.perilaku = perilaku or Perilaku()
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.sesi = {}
+        self.sudah_gc = set()
+        self.statistik = Counter()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def mulai(self):
+        """Jalankan serve_forever() di thread latar; kembalikan self."""
+        threading.Thread(target=self.serve_forever, name="matchapro-palsu", daemon=True).start()
+        return self
+
+    def berhenti(self):
+        self.shutdown()
+        self.server_close()
+
+    def hitung(self, jenis):
+        with self.lock:
+            self.statistik[jenis] += 1
+
+    def _token_baru(self, sesi):
+        sesi.gc_token = secrets.token_urlsafe(24)
+        return sesi.gc_token
+
+    def buat_sesi(self, username):
+        with self.lock:
+            sid = secrets.token_urlsafe(24)
+            self.sesi[sid] = _Sesi(username)
+            return sid
+
+    def halaman_dirgc(self, sid):
+        """(csrf, gc_token baru, username) untuk GET /dirgc, atau None jika sesi tidak dikenal."""
+        with self.lock:
+            sesi = self.sesi.get(sid)
+            if sesi is None:
+                return None
+            return sesi.csrf, self._token_baru(sesi), sesi.username
+
+    def konfirmasi(self, sid, form):
+        """Proses POST konfirmasi; kembalikan (status HTTP, dict JSON)."""
+        p = self.perilaku
+        with self.lock:
+            sesi = self.sesi.get(sid)
+        if sesi is None:
+            return 401, {'message': 'Unauthenticated.'}
+        if form.get('_token') != sesi.csrf:
+            return 419, {'message': 'CSRF token mismatch.'}
+
+        jeda = p.latensi + (self.random.uniform(0, p.jitter) if p.jitter else 0.0)
+        if jeda > 0:
+            time.sleep(jeda)
+
+        with self.lock:
+            now = time.monotonic()
+            while sesi.post and now - sesi.post[0] > 60:
+                sesi.post.popleft()
+            sesi.post.append(now)
+
+            if now < sesi.blokir_sampai:
+                return self._balas_429(sesi.blokir_sampai - now)
+            if ((p.batas_per_menit and len(sesi.post) > p.batas_per_menit)
+                    or self.random.random() < p.p_429):
+                sesi.blokir_sampai = now + p.retry_after
+                return self._balas_429(p.retry_after)
+            if self.random.random() < p.p_sibuk:
+                return 503, {'status': 'error', 'message': MSG_SERVER_SIBUK}
+            if self.random.random() < p.p_token:
+                # Token kedaluwarsa: klien harus refresh halaman
+                self._token_baru(sesi)
+            if not sesi.gc_token or form.get('gc_token') != sesi.gc_token:
+                return 400, {'status': 'error', 'message': MSG_TOKEN_INVALID}
+
+            perusahaan_id = form.get('perusahaan_id', '')
+            token = self._token_baru(sesi)
+            if perusahaan_id in self.sudah_gc:
+                return 200, {'status': 'error', 'message': MSG_SUDAH_GC, 'new_gc_token': token}
+            self.sudah_gc.add(perusahaan_id)
+            return 200, {'status': 'success', 'message': 'Data berhasil disimpan', 'new_gc_token': token}
+
+    def _balas_429(self, sisa):
+        sisa = max(1, round(sisa))
+        gaya = self.perilaku.gaya_429
+        if gaya == 'menit':
+            menit = max(1, round(sisa / 60))
+            return 429, {'status': 'error',
+                         'message': f"Terlalu banyak permintaan. Silakan coba lagi dalam {menit} menit."}
+        body = {'status': 'error', 'message': 'Terlalu banyak permintaan.'}
+        if gaya == 'retry_after':
+            body['retry_after'] = sisa
+        return 429, body
+
+
+HALAMAN_LOGIN = """<!DOCTYPE html>
+<html><head><title>MatchaPro</title></head>
+<body><a id="login-sso" href="/sso/login">Login dengan SSO BPS</a></body></html>
+"""
+
+HALAMAN_SSO = """<!DOCTYPE html>
+<html><head><title>SSO BPS</title></head>
+<body><form method="post" action="/sso/login">
+<input name="username"> <input name="password" type="password">
+<input type="submit" value="Masuk">
+</form></body></html>
+"""
+
+HALAMAN_DIRGC = """<!DOCTYPE html>
+<html><head><meta name="csrf-token" content="{csrf}"><title>Direktori GC</title></head>
+<body><span class="user-name fw-bolder">{username}</span>
+<script>let gcSubmitToken = '{gc_token}';</script></body></html>
+"""
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _sid(self):
+        cookie = SimpleCookie(self.headers.get('Cookie', ''))
+        morsel = cookie.get(COOKIE_SESI)
+        return morsel.value if morsel else None
+
+    def _form(self):
+        panjang = int(self.headers.get('Content-Length') or 0)
+        data = parse_qs(self.rfile.read(panjang).decode('utf-8'), keep_blank_values=True)
+        return {k: v[0] for k, v in data.items()}
+
+    def _kirim(self, status, body, content_type='text/html; charset=utf-8', headers=()):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _redirect(self, lokasi, headers=()):
+        self._kirim(302, '', headers=(('Location', lokasi), *headers))
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path == '/login':
+            self._kirim(200, HALAMAN_LOGIN)
+        elif path == '/sso/login':
+            self._kirim(200, HALAMAN_SSO)
+        elif path == '/dirgc':
+            halaman = self.server.halaman_dirgc(self._sid())
+            if halaman is None:
+                self.server.hitung('dirgc_tanpa_sesi')
+                self._redirect('/login')
+                return
+            self.server.hitung('dirgc')
+            csrf, gc_token, username = halaman
+            self._kirim(200, HALAMAN_DIRGC.format(csrf=csrf, gc_token=gc_token, username=html.escape(username)))
+        else:
+            self._kirim(404, 'Not Found', 'text/plain; charset=utf-8')
+
+    def do_POST(self):
+        path = self.path.split('?', 1)[0]
+        form = self._form()
+        if path == '/sso/login':
+            if not form.get('username') or not form.get('password'):
+                self._kirim(200, HALAMAN_SSO)
+                return
+            self.server.hitung('login')
+            sid = self.server.buat_sesi(form['username'])
+            self._redirect('/dirgc', headers=(('Set-Cookie', f"{COOKIE_SESI}={sid}; Path=/; HttpOnly"),))
+        elif path == '/dirgc/konfirmasi-user':
+            status, body = self.server.konfirmasi(self._sid(), form)
+            self.server.hitung(f"konfirmasi_{status}")
+            self._kirim(status, json.dumps(body), 'application/json')
+        else:
+            self._kirim(404, 'Not Found', 'text/plain; charset=utf-8')
+
+
+def login_http(base_url, username, password):
+    """Login ke server tiruan lewat HTTP biasa (tanpa browser).
+
+    Kembalikan dict sesi berformat sama dengan login.login_session(), siap
+    disimpan ke sessions.json dengan session_store.save_session().
+    """
+    import requests
+    from http_session import parse_tokens, rekam_cookies
+    from login import user_agents
+
+    with requests.Session() as http:
+        response = http.post(f"{base_url}/sso/login", data={'username': username, 'password': password}, timeout=30)
+        csrf_token, gc_token = parse_tokens(response.text)
+        return {
+            'status': 'success',
+            'cookies': http.cookies.get_dict(),
+            'cookie_jar': rekam_cookies(http.cookies),
+            'csrf_token': csrf_token,
+            'gc_token': gc_token,
+            'user_name': username,
+            'user_agent': user_agents,
+        }
+
+
+def perilaku_dari_flags(flags):
+    """Perilaku dari flag --latensi= --jitter= --p429= --batas= --retry-after= --gaya429= --p503= --ptoken=."""
+    return Perilaku(
+        latensi=float(flags.get('latensi', 0)),
+        jitter=float(flags.get('jitter', 0)),
+        p_429=float(flags.get('p429', 0)),
+        batas_per_menit=int(flags.get('batas', 0)),
+        retry_after=float(flags.get('retry-after', 30)),
+        gaya_429=flags.get('gaya429', 'retry_after'),
+        p_sibuk=float(flags.get('p503', 0)),
+        p_token=float(flags.get('ptoken', 0)),
+    )
+
+
+def main():
+    flags = dict(a[2:].split('=', 1) if '=' in a else (a[2:], '') for a in sys.argv[1:] if a.startswith('--'))
+    if 'help' in flags:
+        print(__doc__)
+        return
+    server = MatchaProPalsu((flags.get('host', '127.0.0.1'), int(flags.get('port', PORT))), perilaku_dari_flags(flags))
+    print(f"[INFO] MatchaPro tiruan di {server.base_url} ({server.perilaku})")
+    print(f"[INFO] MATCHAPRO_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"[INFO] Statistik: {dict(server.statistik)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""Rate limiter adaptif (token bucket + AIMD) untuk POST ke MatchaPro.
+
+Setiap akun punya satu limiter. Laju naik sedikit demi sedikit selama
+request sukses (additive increase) dan turun drastis saat server membalas
+429 / 503 "Server sedang sibuk" (multiplicative decrease). Laju yang sudah
+dipelajari dan cooldown 429 disimpan ke rate_state.json supaya restart
+tidak mulai dari nol atau langsung menabrak rate limit lagi.
+"""
+
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+
+STATE_PATH = 'rate_state.json'
+
+# Batas laju (request per detik)
+MIN_RATE = 1 / 600
+MAX_RATE = 1.0
+# Kenaikan laju per request sukses dan faktor penurunan
+INCREASE_STEP = 0.002
+DECREASE_429 = 0.5
+DECREASE_BUSY = 0.8
+# Jeda singkat setelah 503 "Server sedang sibuk"
+BUSY_COOLDOWN = 5
+# Default tunggu 429 jika server tidak memberi retry_after maupun pesan waktu
+DEFAULT_RETRY_AFTER = 600
+# Simpan state tiap N sukses (backoff selalu langsung disimpan)
+SAVE_EVERY = 20
+
+_state_lock = threading.Lock()
+_registry_lock = threading.Lock()
+_registry = {}
+
+
+def retry_after_seconds(resp_json, default=DEFAULT_RETRY_AFTER, buffer=2):
+    """Lama tunggu 429 dalam detik.
+
+    Prioritas: field `retry_after` dari server, lalu waktu di pesan
+    (contoh: "Coba lagi dalam 10 menit"), lalu `default`.
+    """
+    resp_json = resp_json or {}
+    retry_after = resp_json.get('retry_after')
+    try:
+        if retry_after is not None:
+            return max(0, float(retry_after)) + buffer
+    except (TypeError, ValueError):
+        pass
+
+    message = str(resp_json.get('message', '')).lower()
+    time_match = re.search(r'(\d+)\s*(menit|detik|jam)', message)
+    if time_match:
+        value = int(time_match.group(1))
+        unit = time_match.group(2)
+        factor = {'detik': 1, 'menit': 60, 'jam': 3600}[unit]
+        return value * factor + buffer
+    return default + buffer
+
+
+def _load_state(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_state(path, key, entry):
+    with _state_lock:
+        state = _load_state(path)
+        state[key] = entry
+        tmp = f"{path}.tmp"
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(state, f, indent=2)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"Warning: Tidak bisa menyimpan {path}: {e}")
+
+
+class AdaptiveRateLimiter:
+    """Token bucket dengan laju AIMD. Aman dipakai dari banyak thread."""
+
+    def __init__(self, key, rate, min_rate=MIN_RATE, max_rate=MAX_RATE,
+                 burst=1, state_path=STATE_PATH):
+        self.key = key
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate = min(max(rate, min_rate), max_rate)
+        self.burst = burst
+        self.state_path = state_path
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._cooldown_until = 0.0
+        self._since_save = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, key, interval, state_path=STATE_PATH, **kwargs):
+        """Buat limiter untuk `key` dengan laju awal 1/interval, atau laju
+        tersimpan dari run sebelumnya jika ada."""
+        limiter = cls(key, 1 / max(interval, 0.001), state_path=state_path, **kwargs)
+        entry = _load_state(state_path).get(key)
+        if entry:
+            try:
+                limiter.rate = min(max(float(entry['rate']), limiter.min_rate), limiter.max_rate)
+                remaining = float(entry.get('cooldown_until', 0)) - time.time()
+                if remaining > 0:
+                    limiter._start_cooldown(remaining)
+                print(f"[RATE] {key}: memakai laju tersimpan {limiter.rate:.3f} req/detik")
+            except (KeyError, TypeError, ValueError):
+                pass
+        return limiter
+
+    def _refill(self, now):
+        if now > self._last:
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+
+    def _start_cooldown(self, seconds):
+        now = time.monotonic()
+        self._cooldown_until = max(self._cooldown_until, now + seconds)
+        # Setelah cooldown boleh langsung kirim satu request
+        self._tokens = 1.0
+        self._last = self._cooldown_until
+
+    def coba_ambil(self):
+        """Ambil satu token tanpa blok. Kembalikan 0 jika berhasil, atau lama
+        (detik) yang harus ditunggu sebelum mencoba lagi."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._cooldown_until:
+                return self._cooldown_until - now
+            self._refill(now)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        """Blok sampai boleh mengirim satu request; kembalikan lama menunggu (detik)."""
+        t0 = time.monotonic()
+        while True:
+            wait = self.coba_ambil()
+            if not wait:
+                return time.monotonic() - t0
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """Seperti acquire(), tetapi menunggu dengan asyncio.sleep."""
+        t0 = time.monotonic()
+        while True:
+            wait = self.coba_ambil()
+            if not wait:
+                return time.monotonic() - t0
+            await asyncio.sleep(wait)
+
+    def cooldown_remaining(self):
+        with self._lock:
+            return max(0.0, self._cooldown_until - time.monotonic())
+
+    def wait_for_cooldown(self):
+        remaining = self.cooldown_remaining()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    async def wait_for_cooldown_async(self):
+        remaining = self.cooldown_remaining()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + INCREASE_STEP)
+            self._since_save += 1
+            save = self._since_save >= SAVE_EVERY
+        if save:
+            self.save()
+
+    def on_rate_limited(self, resp_json=None):
+        """Catat 429: turunkan laju dan mulai cooldown. Kembalikan lama tunggu (detik)."""
+        wait = retry_after_seconds(resp_json)
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * DECREASE_429)
+            self._start_cooldown(wait)
+        self.save()
+        return wait
+
+    def on_busy(self):
+        """Catat 503 "Server sedang sibuk": turunkan laju dan jeda singkat."""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * DECREASE_BUSY)
+            self._start_cooldown(BUSY_COOLDOWN)
+        self.save()
+
+    def save(self):
+        with self._lock:
+            entry = {
+                'rate': self.rate,
+                'cooldown_until': time.time() + max(0.0, self._cooldown_until - time.monotonic()),
+                'updated': time.time(),
+            }
+            self._since_save = 0
+        _save_state(self.state_path, self.key, entry)
+
+
+def get_limiter(key, interval, state_path=STATE_PATH):
+    """Limiter per akun; dipakai ulang selama proses hidup (mis. saat rotasi user)."""
+    with _registry_lock:
+        limiter = _registry.get(key)
+        if limiter is None:
+            limiter = AdaptiveRateLimiter.load(key, interval, state_path=state_path)
+            _registry[key] = limiter
+        return limiter
+
+
+def save_all():
+    with _registry_lock:
+        limiters = list(_registry.values())
+    for limiter in limiters:
+        limiter.save()
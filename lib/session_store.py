@@ -0,0 +1,70 @@
+"""Cache sesi login per username di disk (sessions.json).
+
+Menyimpan cookies (beserta domain/path), user agent dan token hasil login SSO beserta waktu
+kedaluwarsa, sehingga rotasi user cukup memakai sesi tersimpan dan login
+SSO penuh hanya dilakukan jika server menolak sesi tersebut.
+"""
+
+import json
+import os
+import threading
+import time
+
+STORE_PATH = 'sessions.json'
+# Umur sesi Laravel default 120 menit; diperpanjang setiap kali sesi disimpan ulang
+SESSION_TTL = 2 * 60 * 60
+
+_lock = threading.Lock()
+
+
+def _read(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _write(path, data):
+    tmp = f"{path}.tmp"
+    try:
+        # File berisi cookie sesi: batasi hanya untuk pemilik
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Warning: Tidak bisa menyimpan {path}: {e}")
+
+
+def load_session(username, path=STORE_PATH):
+    """Kembalikan dict sesi tersimpan untuk username, atau None jika tidak ada/kedaluwarsa."""
+    with _lock:
+        entry = _read(path).get(username)
+    if not entry or entry.get('expires_at', 0) <= time.time():
+        return None
+    return entry
+
+
+def save_session(username, session_data, ttl=SESSION_TTL, path=STORE_PATH):
+    """Simpan dict sesi (format hasil login.login_session) dengan masa berlaku ttl detik."""
+    entry = {
+        'cookies': session_data.get('cookies') or {},
+        'cookie_jar': session_data.get('cookie_jar') or [],
+        'user_agent': session_data.get('user_agent'),
+        'csrf_token': session_data.get('csrf_token', ''),
+        'gc_token': session_data.get('gc_token', ''),
+        'saved_at': time.time(),
+        'expires_at': time.time() + ttl,
+    }
+    with _lock:
+        data = _read(path)
+        data[username] = entry
+        _write(path, data)
+
+
+def invalidate(username, path=STORE_PATH):
+    with _lock:
+        data = _read(path)
+        if data.pop(username, None) is not None:
+            _write(path, data)
@@ -1,7 +1,66 @@
+import argparse
 import json
 import os
 
-def optimize_geojson(input_path, output_path):
+from geojson_geometry import DEFAULT_PRECISION, SIMPLIFIERS, process_geometry
+from geojson_partition import DEFAULT_ZOOM, MODES as PARTITION_MODES, export_partitions
+from geojson_stream import FeatureWriter, iter_features
+from geojson_topology import write_topology
+from sls_index import build_index, index_path_for
+
+DEFAULT_INPUT = '/Users/nasrul/flutter/direktori/assets/geojson/final_sls.geojson'
+DEFAULT_OUTPUT = '/Users/nasrul/flutter/direktori/assets/geojson/final_sls_optimized_v2.json'
+
+
+def optimize_feature(feature, precision=DEFAULT_PRECISION, tolerance=None, method='dp'):
+    props = feature.get('properties') or {}
+    geometry = feature.get('geometry', {})
+
+    # Keep only essential properties
+    new_props = {
+        'idsls': props.get('idsls', ''),
+        'nmsls': props.get('nmsls', ''),
+        'nmdesa': props.get('nmdesa', ''),
+        'nmkec': props.get('nmkec', ''),
+        'kode_pos': props.get('kode_pos', '')
+    }
+
+    # Quantize coordinates (6 decimals by default), drop repeated vertices and
+    # optionally simplify rings; see geojson_geometry.process_geometry
+    new_geometry = process_geometry(geometry, precision, tolerance, method)
+
+    return {
+        'type': 'Feature',
+        'properties': new_props,
+        'geometry': new_geometry
+    }
+
+
+def report_sizes(input_path, output_path):
+    original_size = os.path.getsize(input_path)
+    new_size = os.path.getsize(output_path)
+    print(f"Done! Original size: {original_size/1024:.2f} KB, Optimized size: {new_size/1024:.2f} KB")
+    print(f"Reduction: {(1 - new_size/original_size)*100:.2f}%")
+
+
+def optimize_geojson_stream(input_path, output_path, **options):
+    """Same output as optimize_geojson(), but features are parsed and written
+    one at a time so memory stays bounded by the largest single feature."""
+    print(f"Streaming {input_path} -> {output_path}...")
+    try:
+        with FeatureWriter(output_path) as out:
+            for feature in iter_features(input_path):
+                out.write(optimize_feature(feature, **options))
+                if out.count % 10000 == 0:
+                    print(f"  {out.count} features...")
+    except Exception as e:
+        print(f"Error optimizing file: {e}")
+        return
+    print(f"Wrote {out.count} features.")
+    report_sizes(input_path, output_path)
+
+
+def optimize_geojson(input_path, output_path, **options):
     print(f"Reading {input_path}...")
     try:
         with open(input_path, 'r', encoding='utf-8') as f:
@@ -17,44 +76,7 @@ def optimize_geojson(input_path, output_path):
     features = data['features']
     print(f"Found {len(features)} features. Optimizing...")
 
-    optimized_features = []
-    
-    for i, feature in enumerate(features):
-        props = feature.get('properties', {})
-        geometry = feature.get('geometry', {})
-        
-        # Keep only essential properties
-        new_props = {
-            'idsls': props.get('idsls', ''),
-            'nmsls': props.get('nmsls', ''),
-            'nmdesa': props.get('nmdesa', ''),
-            'nmkec': props.get('nmkec', ''),
-            'kode_pos': props.get('kode_pos', '')
-        }
-        
-        # Round coordinates to 6 decimal places to save space
-        if geometry and 'coordinates' in geometry:
-            def round_coords(coords):
-                if isinstance(coords, (float, int)):
-                    return round(coords, 6)
-                elif isinstance(coords, list):
-                    return [round_coords(c) for c in coords]
-                return coords
-            
-            # Create a new geometry object to avoid modifying the original in place if that matters
-            # (though here we are just reading)
-            new_geometry = {
-                'type': geometry.get('type'),
-                'coordinates': round_coords(geometry.get('coordinates'))
-            }
-        else:
-            new_geometry = geometry
-
-        optimized_features.append({
-            'type': 'Feature',
-            'properties': new_props,
-            'geometry': new_geometry
-        })
+    optimized_features = [optimize_feature(feature, **options) for feature in features]
 
     optimized_data = {
         'type': 'FeatureCollection',
@@ -67,15 +89,50 @@ def optimize_geojson(input_path, output_path):
             # separators=(',', ':') removes whitespace around separators
             json.dump(optimized_data, f, separators=(',', ':'))
         
-        original_size = os.path.getsize(input_path)
-        new_size = os.path.getsize(output_path)
-        print(f"Done! Original size: {original_size/1024:.2f} KB, Optimized size: {new_size/1024:.2f} KB")
-        print(f"Reduction: {(1 - new_size/original_size)*100:.2f}%")
+        report_sizes(input_path, output_path)
         
     except Exception as e:
         print(f"Error writing output file: {e}")
 
 if __name__ == "__main__":
-    input_file = '/Users/nasrul/flutter/direktori/assets/geojson/final_sls.geojson'
-    output_file = '/Users/nasrul/flutter/direktori/assets/geojson/final_sls_optimized_v2.json'
-    optimize_geojson(input_file, output_file)
+    parser = argparse.ArgumentParser(description="Optimize SLS GeoJSON for the app.")
+    parser.add_argument('input', nargs='?', default=DEFAULT_INPUT)
+    parser.add_argument('output', nargs='?', default=DEFAULT_OUTPUT)
+    parser.add_argument('--stream', action='store_true',
+                        help="parse and write one feature at a time (bounded memory)")
+    parser.add_argument('--precision', type=int, default=DEFAULT_PRECISION,
+                        help="decimal places kept in coordinates (default: %(default)s)")
+    parser.add_argument('--simplify', type=float, metavar='METRES',
+                        help="simplify rings with this tolerance in metres")
+    parser.add_argument('--method', choices=sorted(SIMPLIFIERS), default='dp',
+                        help="dp = Douglas-Peucker, vw = Visvalingam-Whyatt (default: %(default)s)")
+    parser.add_argument('--format', choices=('geojson', 'topojson'), default='geojson',
+                        help="topojson = shared arcs with delta-encoded integers (see geojson_topology.py)")
+    parser.add_argument('--index', action='store_true',
+                        help="also write a point-in-SLS index next to the output (see sls_index.py)")
+    parser.add_argument('--partition', choices=PARTITION_MODES,
+                        help="write one GeoJSON file per kecamatan/desa/XYZ tile into OUTPUT (a directory) "
+                             "plus manifest.json; always streamed, not combinable with --format topojson "
+                             "or --index")
+    parser.add_argument('--zoom', type=int, default=DEFAULT_ZOOM,
+                        help="tile zoom for --partition tile (default: %(default)s)")
+    args = parser.parse_args()
+    if args.partition and args.format != 'geojson':
+        parser.error("--partition writes GeoJSON parts; --format topojson is not supported with it")
+    if args.partition and args.index:
+        parser.error("--index is not supported with --partition; index the input or a single output instead")
+    options = {'precision': args.precision, 'tolerance': args.simplify, 'method': args.method}
+    if args.partition:
+        export_partitions(args.input, args.output, args.partition, args.zoom,
+                          transform=lambda feature: optimize_feature(feature, **options))
+        raise SystemExit(0)
+    if args.format == 'topojson':
+        write_topology(args.input, args.output, **options)
+    elif args.stream:
+        optimize_geojson_stream(args.input, args.output, **options)
+    else:
+        optimize_geojson(args.input, args.output, **options)
+    if args.index:
+        # The TopoJSON output is not GeoJSON; index the input polygons instead
+        source = args.output if args.format == 'geojson' else args.input
+        build_index(source, index_path_for(args.output))
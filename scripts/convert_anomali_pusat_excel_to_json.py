@@ -7,12 +7,39 @@ supabase/migrations/20260701170000_anomali_pusat_baru.sql.
 Usage:
     python3 scripts/convert_anomali_pusat_excel_to_json.py [usaha.xlsx] [keluarga.xlsx] [output.json]
 
+Beberapa export bulanan sekaligus (dibaca paralel, baris digabung sesuai
+urutan file):
+    python3 scripts/convert_anomali_pusat_excel_to_json.py \
+        --usaha usaha_juni.xlsx usaha_juli.xlsx \
+        --keluarga keluarga_juni.xlsx keluarga_juli.xlsx \
+        --output anomali_pusat_gabungan.json
+
+Import harian inkremental: dengan --manifest, hash isi tiap baris disimpan
+di file manifest lokal. Export berikutnya hanya menghasilkan baris yang baru
+atau berubah sejak manifest terakhir, plus daftar kasus yang hilang
+(hilang_usaha / hilang_keluarga) dan ringkasan di key "delta":
+    python3 scripts/convert_anomali_pusat_excel_to_json.py --usaha u.xlsx \
+        --keluarga k.xlsx --output delta.json --manifest anomali_manifest.json
+Kalau manifest belum ada, output berisi semua baris (import penuh). File
+output dikirim dengan scripts/load_anomali_pusat.py. Manifest baru ditulis
+sebagai <manifest>.pending dan baru menggantikan manifest setelah loader
+selesai memuat semua scope output ini; sampai saat itu konversi ulang tetap
+dibandingkan dengan manifest lama, jadi perubahan yang belum dimuat tidak
+hilang dari delta berikutnya.
+
 Tanpa argumen, dipakai default path Downloads sesuai file yang sedang diproses.
 """
 
+import argparse
+import hashlib
 import json
+import os
+import re
 import sys
-import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from excel_cache import read_excel_cached  # noqa: E402
 
 DEFAULT_USAHA = "/Users/nasrul/Downloads/Data_Mikro_Anomali_usaha_7372_20260630_210254.xlsx"
 DEFAULT_KELUARGA = "/Users/nasrul/Downloads/Data_Mikro_Anomali_keluarga_7372_20260630_154253.xlsx"
@@ -46,32 +73,181 @@ def convert_sheet(path: str, scope: str) -> list[dict]:
     # dtype=str wajib: kolom kode wilayah (Kode SLS, Sub SLS, dst) berformat
     # angka dengan leading zero (mis. "0014", "00") -- tanpa ini pandas
     # membaca sebagai int64 dan leading zero-nya hilang.
-    df = pd.read_excel(path, header=3, skiprows=[4], dtype=str)
+    # Hasil parse di-cache per hash file + opsi baca (lihat excel_cache.py),
+    # jadi run ulang pada file yang sama tidak lewat openpyxl lagi.
+    df = read_excel_cached(path, header=3, skiprows=[4], dtype=str)
     df = df.fillna("")
 
     subjek_col = df.columns[1]  # "Nama Usaha" atau "Nama KRT"
 
-    rows = []
-    for _, r in df.iterrows():
-        row = {"scope": scope, "nama_subjek": r[subjek_col]}
-        for col_asli, field in COLUMN_MAP.items():
-            row[field] = r.get(col_asli, "")
-        rows.append(row)
-    return rows
+    # Per kolom, bukan per baris: kolom yang tidak ada di file diisi "",
+    # lalu scope & nama_subjek disisipkan di depan (urutan key sama seperti
+    # sebelumnya) dan semua baris dijadikan dict sekaligus.
+    out = df.reindex(columns=list(COLUMN_MAP), fill_value="").rename(columns=COLUMN_MAP)
+    out.insert(0, "nama_subjek", df[subjek_col])
+    out.insert(0, "scope", scope)
+    return out.to_dict("records")
+
+
+def _convert_job(job: tuple[str, str]) -> list[dict]:
+    path, scope = job
+    return convert_sheet(path, scope)
+
+
+def convert_files(usaha_paths: list[str], keluarga_paths: list[str], workers: int | None = None) -> dict:
+    """Konversi banyak file sekaligus, satu proses per file.
+
+    Hasil per scope digabung sesuai urutan file di argumen.
+    """
+    jobs = [(p, "usaha") for p in usaha_paths] + [(p, "keluarga") for p in keluarga_paths]
+    workers = min(workers or os.cpu_count() or 1, len(jobs)) or 1
+    if workers == 1:
+        hasil = [_convert_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            hasil = list(pool.map(_convert_job, jobs))
+
+    result = {"usaha": [], "keluarga": []}
+    for (path, scope), rows in zip(jobs, hasil):
+        print(f"{scope}: {len(rows)} baris dari {path}")
+        result[scope].extend(rows)
+    return result
+
+
+MANIFEST_VERSION = 2
+# Pemisah field kunci manifest (tidak muncul di data excel)
+_SEP = "\x1f"
+# Regex yang sama dengan import_anomali_pusat_batch (regexp_match Postgres)
+_KATEGORI_RE = re.compile(r"Anomali\s+(?:Data\s+)?(\d+)\s*\(([^)]*)\)")
+
+
+def kategori_kode(scope: str, nama_anomali: str) -> str:
+    """kategori_kode seperti di server: UP/KP + nomor anomali, atau UP/KPLAINNYA."""
+    prefix = "UP" if scope == "usaha" else "KP"
+    match = _KATEGORI_RE.search(nama_anomali or "")
+    return prefix + (match.group(1) if match else "LAINNYA")
+
+
+def kunci_baris(scope: str, row: dict) -> str:
+    # Kunci kasus di server: (scope, assignment_id, nama_subjek, kategori_kode).
+    # Label nama_anomali yang berubah tapi nomornya sama tetap satu kasus, dan
+    # semua anomali tanpa nomor di satu assignment jatuh ke satu kasus LAINNYA.
+    return _SEP.join((row["assignment_id"], row["nama_subjek"], kategori_kode(scope, row["nama_anomali"])))
+
+
+def hash_baris(row: dict) -> str:
+    teks = json.dumps(row, ensure_ascii=False, sort_keys=True)
+    return hashlib.blake2b(teks.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def baca_manifest(path: str) -> dict | None:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise SystemExit(f"Versi manifest {path} tidak dikenal, hapus file ini untuk import penuh.")
+    return manifest
+
+
+def simpan_manifest(path: str, manifest: dict):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def hitung_delta(result: dict, manifest_lama: dict) -> tuple[dict, dict]:
+    """Bandingkan hasil konversi dengan manifest lama.
+
+    Returns (delta, manifest_baru). delta berisi baris baru/berubah per scope,
+    kunci kasus yang hilang (hilang_<scope>) dan ringkasan jumlahnya.
+    """
+    delta = {"delta": {}}
+    manifest_baru = {"version": MANIFEST_VERSION}
+    for scope in ("usaha", "keluarga"):
+        lama = manifest_lama.get(scope, {})
+        # Beberapa baris dengan kunci server yang sama (duplikat, atau beberapa
+        # anomali LAINNYA): baris terakhir menang, sama dengan upsert server
+        terakhir = {}
+        for row in result[scope]:
+            terakhir[kunci_baris(scope, row)] = row
+        hashes = {k: hash_baris(row) for k, row in terakhir.items()}
+
+        baru = [k for k in terakhir if k not in lama]
+        berubah = [k for k in terakhir if k in lama and lama[k] != hashes[k]]
+        # Kunci manifest = kunci server, jadi kasus yang masih ada di export
+        # tidak pernah ikut dinonaktifkan
+        hilang = [k for k in lama if k not in terakhir]
+
+        delta[scope] = [terakhir[k] for k in baru + berubah]
+        delta[f"hilang_{scope}"] = [
+            dict(zip(("assignment_id", "nama_subjek", "kategori_kode"), k.split(_SEP)))
+            for k in hilang
+        ]
+        delta["delta"][scope] = {
+            "baru": len(baru),
+            "berubah": len(berubah),
+            "sama": len(terakhir) - len(baru) - len(berubah),
+            "hilang": len(hilang),
+        }
+        manifest_baru[scope] = hashes
+    return delta, manifest_baru
 
 
 def main():
-    usaha_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_USAHA
-    keluarga_path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_KELUARGA
-    output_path = sys.argv[3] if len(sys.argv) > 3 else DEFAULT_OUTPUT
+    parser = argparse.ArgumentParser(description="Konversi excel anomali Fasih ke JSON p_rows.")
+    parser.add_argument("posisi", nargs="*", metavar="FILE",
+                        help="cara lama: [usaha.xlsx] [keluarga.xlsx] [output.json]")
+    parser.add_argument("--usaha", nargs="+", help="satu atau lebih export anomali usaha")
+    parser.add_argument("--keluarga", nargs="+", help="satu atau lebih export anomali keluarga")
+    parser.add_argument("--output", help="file JSON hasil")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="jumlah proses paralel (default: jumlah CPU)")
+    parser.add_argument("--manifest", help="manifest hash untuk output delta (import inkremental)")
+    args = parser.parse_args()
+
+    posisi = args.posisi + [None] * (3 - len(args.posisi))
+    usaha_paths = args.usaha or [posisi[0] or DEFAULT_USAHA]
+    keluarga_paths = args.keluarga or [posisi[1] or DEFAULT_KELUARGA]
+    output_path = args.output or posisi[2] or DEFAULT_OUTPUT
+
+    result = convert_files(usaha_paths, keluarga_paths, args.workers)
+
+    manifest_baru = None
+    if args.manifest:
+        manifest_lama = baca_manifest(args.manifest)
+        delta, manifest_baru = hitung_delta(result, manifest_lama or {})
+        if manifest_lama is None:
+            print(f"Manifest {args.manifest} belum ada: output berisi semua baris (import penuh)")
+        else:
+            result = delta
+            for scope, r in delta["delta"].items():
+                print(f"delta {scope}: {r['baru']} baru, {r['berubah']} berubah, "
+                      f"{r['sama']} sama, {r['hilang']} hilang")
 
-    result = {
-        "usaha": convert_sheet(usaha_path, "usaha"),
-        "keluarga": convert_sheet(keluarga_path, "keluarga"),
-    }
+    pending_path = args.manifest + ".pending" if manifest_baru is not None else None
+    if pending_path:
+        # Lokasi manifest untuk load_anomali_pusat.py, yang mempromosikan
+        # manifest pending setelah semua scope output ini termuat
+        result["manifest"] = {"path": os.path.abspath(args.manifest),
+                              "pending": os.path.abspath(pending_path)}
 
     with open(output_path, "w") as f:
         json.dump(result, f, indent=2, ensure_ascii=False)
+    if pending_path:
+        # Pending terikat ke isi output ini: output lain (konversi lain) tidak
+        # bisa mempromosikannya
+        simpan_manifest(pending_path, {**manifest_baru, "output_sha256": sha256_file(output_path)})
+        print(f"manifest pending: {pending_path} (aktif setelah output dimuat)")
 
     print(f"usaha: {len(result['usaha'])} baris")
     print(f"keluarga: {len(result['keluarga'])} baris")
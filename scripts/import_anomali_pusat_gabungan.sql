@@ -1,5 +1,7 @@
 -- Import anomali pusat gabungan via Supabase SQL Editor.
 -- Pastikan function public.import_anomali_pusat_batch(p_scope text, p_rows jsonb) sudah dibuat dulu.
+-- Untuk data besar (literal ini timeout di SQL Editor), pakai
+-- scripts/load_anomali_pusat.py yang mengirim per batch.
 
 begin;
 
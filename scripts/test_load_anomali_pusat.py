@@ -0,0 +1,161 @@
+"""Tes load_anomali_pusat.py dengan target palsu di memori (tanpa Supabase/Postgres).
+
+    python -m unittest scripts/test_load_anomali_pusat.py
+    python -m pytest scripts/test_load_anomali_pusat.py
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import load_anomali_pusat as loader  # noqa: E402
+
+
+class Crash(Exception):
+    """Proses 'mati' di tengah muat."""
+
+
+class TargetPalsu:
+    """Menyimpan setiap panggilan kirim/nonaktifkan; bisa dibuat gagal di panggilan ke-n."""
+
+    def __init__(self, gagal_kirim=None, gagal_nonaktifkan=None):
+        self.kirim_calls = []
+        self.nonaktifkan_calls = []
+        self.gagal_kirim = gagal_kirim
+        self.gagal_nonaktifkan = gagal_nonaktifkan
+
+    def kirim(self, scope, rows, mode):
+        if len(self.kirim_calls) + 1 == self.gagal_kirim:
+            raise Crash(f"kirim ke-{self.gagal_kirim}")
+        self.kirim_calls.append((scope, [r["id"] for r in rows], mode))
+        return {"diperbarui": len(rows), "dinonaktifkan": 0}
+
+    def nonaktifkan(self, scope, keys):
+        if len(self.nonaktifkan_calls) + 1 == self.gagal_nonaktifkan:
+            raise Crash(f"nonaktifkan ke-{self.gagal_nonaktifkan}")
+        self.nonaktifkan_calls.append((scope, [k["nama_subjek"] for k in keys]))
+        return len(keys)
+
+    def tutup(self):
+        pass
+
+
+def _kunci(nama):
+    return {"assignment_id": "A1", "nama_subjek": nama, "kategori_kode": "UP1"}
+
+
+class MuatScopeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input = os.path.join(self.tmp.name, "anomali.json")
+        self.progres_path = self.input + ".progres.json"
+        # Tanpa jeda retry dan tanpa output per batch selama tes
+        sleep = mock.patch.object(loader.time, "sleep")
+        sleep.start()
+        self.addCleanup(sleep.stop)
+        stdout = contextlib.redirect_stdout(io.StringIO())
+        stdout.__enter__()
+        self.addCleanup(stdout.__exit__, None, None, None)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def tulis_input(self, data):
+        with open(self.input, "w") as f:
+            json.dump(data, f)
+
+    def progres(self, mode="refresh"):
+        return loader.baca_progres(self.progres_path, loader.tanda_input(self.input), mode)
+
+    def muat(self, target, scope="usaha", mode="refresh", batch=2):
+        progres = self.progres(mode)
+        loader.muat_scope(target, self.input, scope, mode, batch, progres, self.progres_path)
+        return progres
+
+    def test_batch_dipecah_dan_refresh_hanya_batch_pertama(self):
+        self.tulis_input({"usaha": [{"id": i} for i in range(5)], "keluarga": [{"id": 10}]})
+        target = TargetPalsu()
+        progres = self.muat(target)
+        self.muat(target, scope="keluarga")
+
+        self.assertEqual(target.kirim_calls, [
+            ("usaha", [0, 1], "refresh"),
+            ("usaha", [2, 3], "tambahkan"),
+            ("usaha", [4], "tambahkan"),
+            ("keluarga", [10], "refresh"),
+        ])
+        self.assertEqual(progres["scope"]["usaha"], {"baris": 5, "batch": 3, "hilang": 0, "selesai": True})
+
+    def test_lanjut_setelah_crash_dari_file_progres(self):
+        self.tulis_input({"usaha": [{"id": i} for i in range(5)]})
+        pertama = TargetPalsu(gagal_kirim=2)
+        with self.assertRaises(Crash):
+            self.muat(pertama)
+        self.assertEqual(pertama.kirim_calls, [("usaha", [0, 1], "refresh")])
+        with open(self.progres_path) as f:
+            self.assertEqual(json.load(f)["scope"]["usaha"]["baris"], 2)
+
+        # Run ulang: baris yang sudah masuk dilewati dan refresh tidak diulang
+        kedua = TargetPalsu()
+        self.muat(kedua)
+        self.assertEqual(kedua.kirim_calls, [
+            ("usaha", [2, 3], "tambahkan"),
+            ("usaha", [4], "tambahkan"),
+        ])
+
+        # Scope yang sudah selesai tidak dikirim lagi
+        ketiga = TargetPalsu()
+        self.muat(ketiga)
+        self.assertEqual(ketiga.kirim_calls, [])
+
+    def test_progres_input_lain_ditolak(self):
+        self.tulis_input({"usaha": [{"id": 1}]})
+        self.muat(TargetPalsu())
+        self.tulis_input({"usaha": [{"id": 1}, {"id": 2}]})
+        with self.assertRaises(SystemExit):
+            self.progres()
+
+    def test_hilang_dinonaktifkan_per_batch_dan_dilanjutkan(self):
+        self.tulis_input({
+            "delta": {"usaha": {"baru": 1, "berubah": 0, "hilang": 3}},
+            "usaha": [{"id": 1}],
+            "hilang_usaha": [_kunci("x"), _kunci("y"), _kunci("z")],
+        })
+        pertama = TargetPalsu(gagal_nonaktifkan=2)
+        with self.assertRaises(Crash):
+            self.muat(pertama, mode="tambahkan")
+        self.assertEqual(pertama.kirim_calls, [("usaha", [1], "tambahkan")])
+        self.assertEqual(pertama.nonaktifkan_calls, [("usaha", ["x", "y"])])
+
+        kedua = TargetPalsu()
+        progres = self.muat(kedua, mode="tambahkan")
+        self.assertEqual(kedua.kirim_calls, [])
+        self.assertEqual(kedua.nonaktifkan_calls, [("usaha", ["z"])])
+        self.assertEqual(progres["scope"]["usaha"], {"baris": 1, "batch": 1, "hilang": 3, "selesai": True})
+
+    def test_gagal_sementara_dicoba_ulang(self):
+        self.tulis_input({"usaha": [{"id": 1}, {"id": 2}]})
+        target = TargetPalsu(gagal_kirim=1)
+        kirim_asli = target.kirim
+
+        def kirim(scope, rows, mode):
+            # Hanya percobaan pertama yang gagal
+            if target.gagal_kirim:
+                target.gagal_kirim = None
+                raise ConnectionError("timeout")
+            return kirim_asli(scope, rows, mode)
+
+        target.kirim = kirim
+        self.muat(target)
+        self.assertEqual(target.kirim_calls, [("usaha", [1, 2], "refresh")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,266 @@
+"""Spatial index sidecar for SLS polygons: point -> idsls lookup.
+
+build_index() reads the (optimized) SLS GeoJSON once and writes a .npz next
+to it with all ring vertices in flat arrays, a bbox per polygon and a
+uniform grid mapping each cell to the polygons with a ring bbox touching it.
+SlsIndex.locate() takes arrays of latitude/longitude, picks candidates from
+the grid, filters them by bbox and runs an even-odd point-in-polygon test
+vectorised per polygon (holes and MultiPolygons included), so 100k GC
+points take seconds.
+
+    python sls_index.py build final_sls_optimized_v2.json
+    python sls_index.py locate final_sls_optimized_v2.index.npz data_gc.csv hasil.csv
+"""
+
+import argparse
+import csv
+import os
+import sys
+
+import numpy as np
+
+from geojson_geometry import _collect_rings
+from geojson_stream import iter_features
+
+_POLYGON_DEPTH = {'Polygon': 1, 'MultiPolygon': 2}
+# Upper bound for points x edges processed in one broadcast
+_CHUNK = 2_000_000
+# Upper bound for the number of grid cells (the cell size grows to fit)
+MAX_CELLS = 4_000_000
+
+
+def index_path_for(geojson_path):
+    """Sidecar path: final_sls_optimized_v2.json -> final_sls_optimized_v2.index.npz"""
+    return os.path.splitext(geojson_path)[0] + '.index.npz'
+
+
+def build_index(geojson_path, index_path=None, cell_size=None):
+    """Write the sidecar index for a GeoJSON file and return its path."""
+    index_path = index_path or index_path_for(geojson_path)
+    ids, ring_offsets, ring_poly, chunks = [], [0], [], []
+    for feature in iter_features(geojson_path):
+        geometry = feature.get('geometry') or {}
+        if geometry.get('type') not in _POLYGON_DEPTH or not geometry.get('coordinates'):
+            continue
+        rings = []
+        _collect_rings(geometry['coordinates'], _POLYGON_DEPTH[geometry['type']], rings)
+        rings = [r for r in rings if len(r) >= 3]
+        if not rings:
+            continue
+        poly = len(ids)
+        ids.append(str((feature.get('properties') or {}).get('idsls', '')))
+        for ring in rings:
+            chunks.append(np.asarray([v[:2] for v in ring], dtype=np.float64))
+            ring_offsets.append(ring_offsets[-1] + len(ring))
+            ring_poly.append(poly)
+
+    vertices = np.concatenate(chunks) if chunks else np.zeros((0, 2))
+    ring_offsets = np.asarray(ring_offsets, dtype=np.int64)
+    ring_poly = np.asarray(ring_poly, dtype=np.int64)
+    owner = np.arange(len(ring_poly))
+    ring_bbox = _bboxes(vertices, ring_offsets, owner, len(ring_poly))
+    bbox = _bboxes(vertices, ring_offsets, ring_poly, len(ids))
+
+    # Grid over ring bboxes so far-apart parts of a MultiPolygon do not cover
+    # every cell in between
+    extent_lo = ring_bbox[:, :2].min(axis=0) if len(ring_bbox) else np.zeros(2)
+    extent_hi = ring_bbox[:, 2:].max(axis=0) if len(ring_bbox) else np.zeros(2)
+    if cell_size is None:
+        # About one ring per cell on average
+        sizes = np.maximum(ring_bbox[:, 2] - ring_bbox[:, 0], ring_bbox[:, 3] - ring_bbox[:, 1])
+        cell_size = float(np.median(sizes)) if len(sizes) else 1.0
+    cell_size = max(cell_size or 1e-3, float(np.sqrt(np.prod(extent_hi - extent_lo) / MAX_CELLS)))
+    origin = extent_lo
+    shape = (np.floor((extent_hi - origin) / cell_size).astype(np.int64) + 1)
+    cell_start, cell_polys = _grid(ring_bbox, ring_poly, origin, cell_size, shape)
+
+    np.savez_compressed(
+        index_path,
+        ids=np.asarray(ids), vertices=vertices, ring_offsets=ring_offsets, ring_poly=ring_poly,
+        bbox=bbox, origin=origin, cell_size=np.float64(cell_size), shape=shape,
+        cell_start=cell_start, cell_polys=cell_polys,
+    )
+    print(f"Index for {len(ids)} polygons written to {index_path} "
+          f"(grid {shape[0]}x{shape[1]}, cell {cell_size:.5f} deg)")
+    return index_path
+
+
+def _bboxes(vertices, ring_offsets, ring_owner, n):
+    """[minx, miny, maxx, maxy] per owner (ring or polygon number)."""
+    bbox = np.empty((n, 4))
+    bbox[:, :2] = np.inf
+    bbox[:, 2:] = -np.inf
+    if not len(vertices):
+        return bbox
+    owner = np.repeat(ring_owner, np.diff(ring_offsets))
+    np.minimum.at(bbox[:, 0], owner, vertices[:, 0])
+    np.minimum.at(bbox[:, 1], owner, vertices[:, 1])
+    np.maximum.at(bbox[:, 2], owner, vertices[:, 0])
+    np.maximum.at(bbox[:, 3], owner, vertices[:, 1])
+    return bbox
+
+
+def _grid(ring_bbox, ring_poly, origin, cell_size, shape):
+    """CSR arrays (cell_start, cell_polys) listing polygons per grid cell."""
+    lo = np.floor((ring_bbox[:, :2] - origin) / cell_size).astype(np.int64)
+    hi = np.floor((ring_bbox[:, 2:] - origin) / cell_size).astype(np.int64)
+    cells, polys = [], []
+    for r in range(len(ring_bbox)):
+        xs = np.arange(lo[r, 0], hi[r, 0] + 1)
+        ys = np.arange(lo[r, 1], hi[r, 1] + 1)
+        c = (xs[:, None] * shape[1] + ys[None, :]).ravel()
+        cells.append(c)
+        polys.append(np.full(len(c), ring_poly[r], dtype=np.int64))
+    cells = np.concatenate(cells) if cells else np.zeros(0, dtype=np.int64)
+    polys = np.concatenate(polys) if polys else np.zeros(0, dtype=np.int64)
+    # One entry per (cell, polygon) even when several rings of it touch the cell
+    pairs = np.unique(np.column_stack((cells, polys)), axis=0)
+    counts = np.bincount(pairs[:, 0], minlength=int(shape[0] * shape[1]))
+    cell_start = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=cell_start[1:])
+    return cell_start, pairs[:, 1]
+
+
+class SlsIndex:
+    """Point-in-SLS lookup over a sidecar written by build_index()."""
+
+    def __init__(self, data):
+        self.ids = data['ids']
+        self.vertices = data['vertices']
+        self.ring_offsets = data['ring_offsets']
+        self.ring_poly = data['ring_poly']
+        self.bbox = data['bbox']
+        self.origin = data['origin']
+        self.cell_size = float(data['cell_size'])
+        self.shape = data['shape']
+        self.cell_start = data['cell_start']
+        self.cell_polys = data['cell_polys']
+        # First ring of each polygon (rings of a polygon are contiguous)
+        self.poly_ring_start = np.searchsorted(self.ring_poly, np.arange(len(self.ids) + 1))
+
+    @classmethod
+    def load(cls, index_path):
+        with np.load(index_path, allow_pickle=False) as data:
+            return cls({k: data[k] for k in data.files})
+
+    def _edges(self, poly):
+        """Edge start/end arrays for all rings of one polygon."""
+        r0, r1 = self.poly_ring_start[poly], self.poly_ring_start[poly + 1]
+        starts, ends = [], []
+        for r in range(r0, r1):
+            ring = self.vertices[self.ring_offsets[r]:self.ring_offsets[r + 1]]
+            starts.append(ring)
+            ends.append(np.roll(ring, -1, axis=0))
+        return np.concatenate(starts), np.concatenate(ends)
+
+    def _contains(self, poly, x, y):
+        """Even-odd test of points (x, y) against every ring of `poly`."""
+        a, b = self._edges(poly)
+        inside = np.zeros(len(x), dtype=bool)
+        step = max(1, _CHUNK // max(len(a), 1))
+        for s in range(0, len(x), step):
+            px, py = x[s:s + step, None], y[s:s + step, None]
+            straddle = (a[:, 1] > py) != (b[:, 1] > py)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                cross_x = a[:, 0] + (py - a[:, 1]) * (b[:, 0] - a[:, 0]) / (b[:, 1] - a[:, 1])
+            hits = straddle & (px < cross_x)
+            inside[s:s + step] = (hits.sum(axis=1) % 2) == 1
+        return inside
+
+    def locate_index(self, lat, lon):
+        """Polygon number per point (-1 if outside every SLS)."""
+        lat = np.atleast_1d(np.asarray(lat, dtype=np.float64))
+        lon = np.atleast_1d(np.asarray(lon, dtype=np.float64))
+        result = np.full(len(lat), -1, dtype=np.int64)
+        valid = np.isfinite(lat) & np.isfinite(lon)
+        cx = np.floor((lon - self.origin[0]) / self.cell_size)
+        cy = np.floor((lat - self.origin[1]) / self.cell_size)
+        valid &= (cx >= 0) & (cy >= 0) & (cx < self.shape[0]) & (cy < self.shape[1])
+        points = np.flatnonzero(valid)
+        if not len(points):
+            return result
+        cell = cx[points].astype(np.int64) * self.shape[1] + cy[points].astype(np.int64)
+
+        # Candidate (point, polygon) pairs from the grid, then bbox filter
+        start, end = self.cell_start[cell], self.cell_start[cell + 1]
+        counts = end - start
+        pair_point = np.repeat(points, counts)
+        offsets = np.repeat(start - np.concatenate(([0], np.cumsum(counts)[:-1])), counts)
+        pair_poly = self.cell_polys[np.arange(counts.sum()) + offsets]
+        bb = self.bbox[pair_poly]
+        px, py = lon[pair_point], lat[pair_point]
+        ok = (px >= bb[:, 0]) & (px <= bb[:, 2]) & (py >= bb[:, 1]) & (py <= bb[:, 3])
+        pair_point, pair_poly = pair_point[ok], pair_poly[ok]
+
+        order = np.argsort(pair_poly, kind='stable')
+        pair_point, pair_poly = pair_point[order], pair_poly[order]
+        bounds = np.flatnonzero(np.diff(pair_poly)) + 1
+        for group in np.split(np.arange(len(pair_poly)), bounds):
+            if not len(group):
+                continue
+            poly = pair_poly[group[0]]
+            pts = pair_point[group]
+            pts = pts[result[pts] < 0]
+            if len(pts):
+                inside = self._contains(poly, lon[pts], lat[pts])
+                result[pts[inside]] = poly
+        return result
+
+    def locate(self, lat, lon):
+        """idsls for each point ('' if outside every SLS). Scalars give a str."""
+        scalar = np.ndim(lat) == 0
+        found = self.locate_index(lat, lon)
+        ids = np.where(found >= 0, self.ids[np.maximum(found, 0)] if len(self.ids) else '', '')
+        return str(ids[0]) if scalar else ids
+
+
+def locate_csv(index_path, csv_path, output_path, lat_col='latitude', lon_col='longitude'):
+    """Add an `idsls` column to a CSV with latitude/longitude columns.
+
+    The input encoding is detected the same way gc_koprol.py reads the
+    submission CSV (utf-8-sig, cp1252, latin1); the output is UTF-8.
+    """
+    # The GC scripts live in lib/; their reader is the one that knows the CSV
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lib'))
+    from gc_reader import sniff_encoding
+
+    index = SlsIndex.load(index_path)
+    with open(csv_path, 'r', encoding=sniff_encoding(csv_path), newline='') as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames + ['idsls']
+        rows = list(reader)
+
+    def number(value):
+        try:
+            return float(str(value).replace(',', '.'))
+        except ValueError:
+            return np.nan
+
+    lat = np.array([number(r.get(lat_col, '')) for r in rows])
+    lon = np.array([number(r.get(lon_col, '')) for r in rows])
+    found = index.locate(lat, lon)
+    with open(output_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for row, idsls in zip(rows, found):
+            row['idsls'] = idsls
+            writer.writerow(row)
+    print(f"{int((found != '').sum())} of {len(rows)} points located, written to {output_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SLS spatial index sidecar.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    b = sub.add_parser('build', help="write <input>.index.npz")
+    b.add_argument('geojson')
+    b.add_argument('--output')
+    b.add_argument('--cell-size', type=float, help="grid cell size in degrees")
+    loc = sub.add_parser('locate', help="add an idsls column to a CSV of points")
+    loc.add_argument('index')
+    loc.add_argument('csv')
+    loc.add_argument('output')
+    args = parser.parse_args()
+    if args.command == 'build':
+        build_index(args.geojson, args.output, args.cell_size)
+    else:
+        locate_csv(args.index, args.csv, args.output)
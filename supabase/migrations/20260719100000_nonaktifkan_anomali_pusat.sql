@@ -0,0 +1,69 @@
+-- Nonaktifkan kasus anomali pusat tertentu saja (bukan seluruh scope).
+-- Dipakai import inkremental (scripts/load_anomali_pusat.py dengan file
+-- delta dari convert_anomali_pusat_excel_to_json.py --manifest): baris yang
+-- hilang dari export terbaru dinonaktifkan di sini, baris baru/berubah
+-- dikirim lewat import_anomali_pusat_batch mode 'tambahkan'.
+--
+-- p_keys: jsonb array of {assignment_id, nama_subjek, kategori_kode}, kunci
+-- kasus yang sama dengan import_anomali_pusat_batch
+-- (scope, assignment_id, nama_subjek, kategori_kode). Kalau kategori_kode
+-- tidak diisi, diturunkan dari nama_anomali dengan aturan yang sama persis
+-- dengan import_anomali_pusat_batch.
+-- Mengembalikan jumlah kasus yang benar-benar berubah jadi nonaktif.
+
+create or replace function public.nonaktifkan_anomali_pusat(
+  p_scope text,
+  p_keys jsonb
+)
+returns integer
+language plpgsql
+security definer
+as $function$
+declare
+    v_prefix      text;
+    v_deactivated integer := 0;
+begin
+    if p_scope not in ('usaha', 'keluarga') then
+        raise exception 'scope tidak valid: %', p_scope;
+    end if;
+    if p_keys is null or jsonb_typeof(p_keys) <> 'array' then
+        raise exception 'p_keys harus berupa jsonb array';
+    end if;
+
+    v_prefix := case when p_scope = 'usaha' then 'UP' else 'KP' end;
+
+    with parsed as (
+        select
+            e.value ->> 'assignment_id' as assignment_id,
+            e.value ->> 'nama_subjek'   as nama_subjek,
+            e.value ->> 'kategori_kode' as kategori_kode,
+            regexp_match(
+                coalesce(e.value ->> 'nama_anomali', ''),
+                'Anomali\s+(?:Data\s+)?(\d+)\s*\(([^)]*)\)'
+            ) as m
+        from jsonb_array_elements(p_keys) e(value)
+    ),
+    kunci as (
+        select
+            p.assignment_id,
+            p.nama_subjek,
+            coalesce(
+                nullif(p.kategori_kode, ''),
+                case when p.m is null then v_prefix || 'LAINNYA'
+                     else v_prefix || p.m[1] end
+            ) as kategori_kode
+        from parsed p
+    )
+    update public.anomali_pusat_temuan t
+    set is_active = false, updated_at = now()
+    from kunci k
+    where t.scope = p_scope
+      and t.assignment_id = k.assignment_id
+      and t.nama_subjek = k.nama_subjek
+      and t.kategori_kode = k.kategori_kode
+      and t.is_active;
+    get diagnostics v_deactivated = row_count;
+
+    return v_deactivated;
+end;
+$function$;
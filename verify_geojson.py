@@ -1,75 +1,300 @@
+import argparse
 import json
+import sys
+from collections import Counter, deque
+from itertools import zip_longest
 
-def verify_geojson(original_path, optimized_path):
+import numpy as np
+
+from geojson_geometry import METERS_PER_DEGREE, _collect_rings
+from geojson_stream import iter_features
+
+DEFAULT_ORIGINAL = '/Users/nasrul/flutter/direktori/assets/geojson/final_sls.geojson'
+DEFAULT_OPTIMIZED = '/Users/nasrul/flutter/direktori/assets/geojson/final_sls_optimized_v2.json'
+DEFAULT_REPORT = 'verify_geojson_report.jsonl'
+
+# Maximum distance (metres) from any original vertex to the optimized ring
+DEFAULT_TOLERANCE = 1.0
+# Maximum relative area change per feature
+DEFAULT_AREA_TOLERANCE = 0.01
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_ERROR = 2
+
+_RING_DEPTH = {'LineString': 0, 'MultiPoint': 0, 'Polygon': 1, 'MultiLineString': 1, 'MultiPolygon': 2}
+_AREA_TYPES = ('Polygon', 'MultiPolygon')
+# Upper bound for points x segments processed in one broadcast
+_CHUNK = 2_000_000
+
+
+class _Shape:
+    """Compact per-feature geometry: rings as float arrays plus the polygon
+    each ring belongs to (for area: first ring of a polygon is the shell)."""
+
+    __slots__ = ('gtype', 'rings', 'shell')
+
+    def __init__(self, geometry):
+        geometry = geometry or {}
+        self.gtype = geometry.get('type')
+        self.rings = []
+        self.shell = []
+        coords = geometry.get('coordinates')
+        depth = _RING_DEPTH.get(self.gtype)
+        if not coords or depth is None:
+            if self.gtype == 'Point' and coords:
+                self.rings = [np.asarray([coords[:2]], dtype=np.float64)]
+                self.shell = [True]
+            return
+        if self.gtype == 'MultiPolygon':
+            polygons = coords
+        elif self.gtype == 'Polygon':
+            polygons = [coords]
+        else:
+            polygons = None
+        if polygons is not None:
+            for polygon in polygons:
+                for k, ring in enumerate(polygon):
+                    self.rings.append(_array(ring))
+                    self.shell.append(k == 0)
+        else:
+            rings = []
+            _collect_rings(coords, depth, rings)
+            self.rings = [_array(r) for r in rings]
+            self.shell = [True] * len(rings)
+
+    @property
+    def empty(self):
+        return not any(len(r) for r in self.rings)
+
+    def vertex_count(self):
+        return sum(len(r) for r in self.rings)
+
+    def bbox(self):
+        pts = [r for r in self.rings if len(r)]
+        if not pts:
+            return None
+        allv = np.concatenate(pts)
+        return np.concatenate((allv.min(axis=0), allv.max(axis=0)))
+
+
+def _array(ring):
+    if not ring:
+        return np.zeros((0, 2))
+    try:
+        return np.asarray(ring, dtype=np.float64)[:, :2]
+    except ValueError:
+        return np.asarray([v[:2] for v in ring], dtype=np.float64)
+
+
+def _area(shape, lat0):
+    """Signed-independent area in square metres (holes subtracted)."""
+    if shape.gtype not in _AREA_TYPES:
+        return 0.0
+    total = 0.0
+    for ring, is_shell in zip(shape.rings, shape.shell):
+        if len(ring) < 3:
+            continue
+        xy = _project(ring, lat0)
+        a = abs(np.dot(xy[:, 0], np.roll(xy[:, 1], -1)) - np.dot(xy[:, 1], np.roll(xy[:, 0], -1))) / 2
+        total += a if is_shell else -a
+    return total
+
+
+def _project(arr, lat0):
+    """Equirectangular metres around a fixed latitude (same for both files,
+    so distances between them are comparable)."""
+    return np.column_stack((arr[:, 0] * METERS_PER_DEGREE * np.cos(np.radians(lat0)),
+                            arr[:, 1] * METERS_PER_DEGREE))
+
+
+def _max_deviation(orig, opt, lat0):
+    """Largest distance (metres) from an original vertex to the optimized ring/line."""
+    if not len(orig):
+        return 0.0
+    if not len(opt):
+        return float('inf')
+    p = _project(orig, lat0)
+    q = _project(opt, lat0)
+    if len(q) == 1:
+        return float(np.hypot(*(p - q[0]).T).max())
+    a, b = q[:-1], q[1:]
+    ab = b - a
+    denom = np.einsum('ij,ij->i', ab, ab)
+    denom[denom == 0] = 1.0
+    worst = 0.0
+    step = max(1, _CHUNK // len(a))
+    for s in range(0, len(p), step):
+        pts = p[s:s + step, None, :]
+        t = np.clip(np.einsum('nmj,mj->nm', pts - a, ab) / denom, 0, 1)
+        closest = a + t[..., None] * ab
+        d = np.sqrt(((pts - closest) ** 2).sum(axis=2)).min(axis=1)
+        worst = max(worst, float(d.max()))
+    return worst
+
+
+def compare(idsls, orig, opt, tolerance, area_tolerance):
+    """Diff record for one feature pair (status 'ok' or 'fail' plus metrics)."""
+    record = {'idsls': idsls, 'status': 'ok', 'issues': []}
+    if orig.empty:
+        if not opt.empty:
+            record['issues'].append('geometry_added')
+        return record
+    if opt.empty:
+        record['issues'].append('geometry_lost')
+        record['status'] = 'fail'
+        return record
+
+    bb_orig, bb_opt = orig.bbox(), opt.bbox()
+    lat0 = float((bb_orig[1] + bb_orig[3]) / 2)
+    record['vertices'] = [orig.vertex_count(), opt.vertex_count()]
+    if orig.gtype != opt.gtype:
+        record['issues'].append('type_changed')
+    if len(orig.rings) != len(opt.rings):
+        record['issues'].append('ring_count')
+        record['rings'] = [len(orig.rings), len(opt.rings)]
+        record['status'] = 'fail'
+        return record
+
+    scale = np.array([METERS_PER_DEGREE * np.cos(np.radians(lat0)), METERS_PER_DEGREE])
+    record['bbox_drift_m'] = round(float((np.abs(bb_orig - bb_opt).reshape(2, 2) * scale).max()), 3)
+
+    area_orig, area_opt = _area(orig, lat0), _area(opt, lat0)
+    if area_orig > 0:
+        drift = abs(area_opt - area_orig) / area_orig
+        record['area_drift'] = round(drift, 6)
+        if drift > area_tolerance:
+            record['issues'].append('area_drift')
+
+    deviation = max(_max_deviation(o, p, lat0) for o, p in zip(orig.rings, opt.rings))
+    record['max_deviation_m'] = round(deviation, 3)
+    if deviation > tolerance:
+        record['issues'].append('deviation')
+
+    if any(i in record['issues'] for i in ('area_drift', 'deviation', 'type_changed')):
+        record['status'] = 'fail'
+    return record
+
+
+def _key(feature):
+    return str((feature.get('properties') or {}).get('idsls', ''))
+
+
+def verify_geojson(original_path, optimized_path, report_path=DEFAULT_REPORT,
+                   tolerance=DEFAULT_TOLERANCE, area_tolerance=DEFAULT_AREA_TOLERANCE):
+    """Stream both files, match features by idsls and write one JSON line per
+    feature with issues plus a final summary line. Return an exit code."""
     print(f"Verifying optimized GeoJSON...")
     print(f"Original: {original_path}")
     print(f"Optimized: {optimized_path}")
-    
+
+    # Both files are read in lockstep; features that do not line up wait in a
+    # hash index keyed by idsls until their partner shows up. Files in the same
+    # order therefore use almost no memory, reordered files still match.
+    # The SLS source repeats some idsls: repeated features wait in a FIFO per
+    # idsls and are paired in file order, like check_round_trip does.
+    pending_orig, pending_opt = {}, {}
+    counts = {'original': 0, 'optimized': 0, 'ok': 0, 'fail': 0, 'missing': 0, 'extra': 0, 'duplicate': 0}
+    worst = {'max_deviation_m': 0.0, 'area_drift': 0.0}
+    seen_orig, seen_opt = Counter(), Counter()
+
+    try:
+        out = open(report_path, 'w', encoding='utf-8')
+    except OSError as e:
+        print(f"Error writing report: {e}")
+        return EXIT_ERROR
+
+    def emit(record):
+        out.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def check(idsls, orig, opt):
+        record = compare(idsls, orig, opt, tolerance, area_tolerance)
+        counts[record['status']] += 1
+        for k in worst:
+            if record.get(k) is not None:
+                worst[k] = max(worst[k], record[k])
+        if record['issues']:
+            emit(record)
+
     try:
-        with open(original_path, 'r', encoding='utf-8') as f:
-            orig_data = json.load(f)
-            
-        with open(optimized_path, 'r', encoding='utf-8') as f:
-            opt_data = json.load(f)
-            
+        for f_orig, f_opt in zip_longest(iter_features(original_path), iter_features(optimized_path)):
+            for feature, seen, mine, other, side in (
+                    (f_orig, seen_orig, pending_orig, pending_opt, 'original'),
+                    (f_opt, seen_opt, pending_opt, pending_orig, 'optimized')):
+                if feature is None:
+                    continue
+                counts[side] += 1
+                idsls = _key(feature)
+                seen[idsls] += 1
+                shape = _Shape(feature.get('geometry'))
+                waiting = other.get(idsls)
+                if waiting:
+                    partner = waiting.popleft()
+                    if not waiting:
+                        del other[idsls]
+                    if side == 'original':
+                        check(idsls, shape, partner)
+                    else:
+                        check(idsls, partner, shape)
+                else:
+                    mine.setdefault(idsls, deque()).append(shape)
     except Exception as e:
         print(f"Error reading files: {e}")
-        return
+        out.close()
+        return EXIT_ERROR
+
+    # Leftovers: an idsls only one side has is missing/extra; one both sides
+    # have, but a different number of times, is a duplicate mismatch
+    for idsls in list(pending_orig) + list(pending_opt):
+        if seen_orig[idsls] and seen_opt[idsls]:
+            counts['duplicate'] += 1
+            emit({'idsls': idsls, 'status': 'fail', 'issues': ['duplicate_count_differs'],
+                  'original': seen_orig[idsls], 'optimized': seen_opt[idsls]})
+        elif idsls in pending_orig:
+            counts['missing'] += 1
+            emit({'idsls': idsls, 'status': 'fail', 'issues': ['missing_in_optimized']})
+        else:
+            counts['extra'] += 1
+            emit({'idsls': idsls, 'status': 'fail', 'issues': ['missing_in_original']})
+
+    failed = counts['fail'] + counts['missing'] + counts['extra'] + counts['duplicate']
+    summary = {'summary': True, **counts, **{f'worst_{k}': round(v, 6) for k, v in worst.items()},
+               'tolerance_m': tolerance, 'area_tolerance': area_tolerance, 'passed': failed == 0}
+    emit(summary)
+    out.close()
 
-    orig_features = orig_data.get('features', [])
-    opt_features = opt_data.get('features', [])
-    
     print(f"\n1. Feature Count Check:")
-    print(f"   Original: {len(orig_features)}")
-    print(f"   Optimized: {len(opt_features)}")
-    
-    if len(orig_features) != len(opt_features):
-        print("   ❌ COUNT MISMATCH!")
-    else:
-        print("   ✅ Count matches.")
+    print(f"   Original: {counts['original']}")
+    print(f"   Optimized: {counts['optimized']}")
+    print("   ✅ Count matches." if counts['original'] == counts['optimized'] else "   ❌ COUNT MISMATCH!")
 
     print(f"\n2. ID Completeness Check (idsls):")
-    orig_ids = set()
-    for f in orig_features:
-        props = f.get('properties', {})
-        if props and 'idsls' in props:
-            orig_ids.add(props['idsls'])
-            
-    opt_ids = set()
-    for f in opt_features:
-        props = f.get('properties', {})
-        if props and 'idsls' in props:
-            opt_ids.add(props['idsls'])
-            
-    missing_ids = orig_ids - opt_ids
-    if missing_ids:
-        print(f"   ❌ MISSING IDs in optimized file: {len(missing_ids)}")
-        print(f"   Example missing: {list(missing_ids)[:5]}")
+    if counts['missing'] or counts['extra'] or counts['duplicate']:
+        print(f"   ❌ Missing in optimized: {counts['missing']}, only in optimized: {counts['extra']}, "
+              f"repeated a different number of times: {counts['duplicate']}")
     else:
         print("   ✅ All IDs present.")
-        
-    print(f"\n3. Geometry Validity Check:")
-    invalid_geom_count = 0
-    for i, f in enumerate(opt_features):
-        geom = f.get('geometry')
-        if not geom or 'coordinates' not in geom or not geom['coordinates']:
-            # Check if original also had empty geometry
-            orig_geom = orig_features[i].get('geometry')
-            if orig_geom and 'coordinates' in orig_geom and orig_geom['coordinates']:
-                 print(f"   ❌ Feature {i} (ID: {f.get('properties', {}).get('idsls')}) has LOST geometry!")
-                 invalid_geom_count += 1
-            else:
-                 # Original was also empty, so this is expected
-                 pass
-                 
-    if invalid_geom_count == 0:
-        print("   ✅ All geometries preserved (or originally empty).")
+
+    print(f"\n3. Geometry Check (tolerance {tolerance} m, area {area_tolerance:.2%}):")
+    print(f"   Worst deviation: {worst['max_deviation_m']:.3f} m, worst area drift: {worst['area_drift']:.4%}")
+    if counts['fail']:
+        print(f"   ❌ {counts['fail']} features outside tolerance or with lost geometry.")
     else:
-        print(f"   ❌ {invalid_geom_count} geometries lost/corrupted.")
+        print("   ✅ All geometries within tolerance.")
+
+    print(f"\nDetails: {report_path}")
+    print("Verification " + ("passed." if failed == 0 else "FAILED."))
+    return EXIT_OK if failed == 0 else EXIT_FAILED
 
-    print("\nVerification Complete.")
 
 if __name__ == "__main__":
-    original = '/Users/nasrul/flutter/direktori/assets/geojson/final_sls.geojson'
-    optimized = '/Users/nasrul/flutter/direktori/assets/geojson/final_sls_optimized_v2.json'
-    verify_geojson(original, optimized)
+    parser = argparse.ArgumentParser(description="Compare optimized SLS GeoJSON with the original.")
+    parser.add_argument('original', nargs='?', default=DEFAULT_ORIGINAL)
+    parser.add_argument('optimized', nargs='?', default=DEFAULT_OPTIMIZED)
+    parser.add_argument('--report', default=DEFAULT_REPORT, help="JSON lines diff (default: %(default)s)")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="max vertex deviation in metres (default: %(default)s)")
+    parser.add_argument('--area-tolerance', type=float, default=DEFAULT_AREA_TOLERANCE,
+                        help="max relative area change (default: %(default)s)")
+    args = parser.parse_args()
+    sys.exit(verify_geojson(args.original, args.optimized, args.report, args.tolerance, args.area_tolerance))